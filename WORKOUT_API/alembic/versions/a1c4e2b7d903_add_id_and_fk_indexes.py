@@ -0,0 +1,39 @@
+"""add_id_and_fk_indexes
+
+Revision ID: a1c4e2b7d903
+Revises: f3edfd9ab41a
+Create Date: 2026-10-17 09:12:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c4e2b7d903'
+down_revision: Union[str, Sequence[str], None] = 'f3edfd9ab41a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY não pode rodar dentro de uma transação; evita travar as tabelas em produção
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_categorias_id'), 'categorias', ['id'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_centros_treinamento_id'), 'centros_treinamento', ['id'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_atletas_id'), 'atletas', ['id'], unique=True, postgresql_concurrently=True)
+        op.create_index(op.f('ix_atletas_categoria_id'), 'atletas', ['categoria_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_atletas_centro_treinamento_id'), 'atletas', ['centro_treinamento_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_atletas_centro_treinamento_id'), table_name='atletas', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_atletas_categoria_id'), table_name='atletas', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_atletas_id'), table_name='atletas', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_centros_treinamento_id'), table_name='centros_treinamento', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_categorias_id'), table_name='categorias', postgresql_concurrently=True)
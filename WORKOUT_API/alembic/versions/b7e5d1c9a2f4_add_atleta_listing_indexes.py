@@ -0,0 +1,46 @@
+"""add_atleta_listing_indexes
+
+Revision ID: b7e5d1c9a2f4
+Revises: a1c4e2b7d903
+Create Date: 2026-10-17 11:03:27.541902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e5d1c9a2f4'
+down_revision: Union[str, Sequence[str], None] = 'a1c4e2b7d903'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        # GIN trigram atende tanto o filtro por prefixo quanto o "contém" com ILIKE
+        op.create_index('ix_atletas_nome_trgm', 'atletas', ['nome'], unique=False, postgresql_using='gin', postgresql_ops={'nome': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_atletas_created_at_pk_id', 'atletas', ['created_at', 'pk_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_atletas_categoria_id_created_at', 'atletas', ['categoria_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_atletas_centro_treinamento_id_created_at', 'atletas', ['centro_treinamento_id', 'created_at'], unique=False, postgresql_concurrently=True)
+
+        # Os índices compostos acima começam pelas FKs e substituem os índices simples da revisão anterior
+        op.drop_index('ix_atletas_categoria_id', table_name='atletas', postgresql_concurrently=True)
+        op.drop_index('ix_atletas_centro_treinamento_id', table_name='atletas', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_atletas_centro_treinamento_id', 'atletas', ['centro_treinamento_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_atletas_categoria_id', 'atletas', ['categoria_id'], unique=False, postgresql_concurrently=True)
+
+        op.drop_index('ix_atletas_centro_treinamento_id_created_at', table_name='atletas', postgresql_concurrently=True)
+        op.drop_index('ix_atletas_categoria_id_created_at', table_name='atletas', postgresql_concurrently=True)
+        op.drop_index('ix_atletas_created_at_pk_id', table_name='atletas', postgresql_concurrently=True)
+        op.drop_index('ix_atletas_nome_trgm', table_name='atletas', postgresql_concurrently=True)
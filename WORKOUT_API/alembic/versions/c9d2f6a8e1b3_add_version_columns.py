@@ -0,0 +1,33 @@
+"""add_version_columns
+
+Revision ID: c9d2f6a8e1b3
+Revises: b7e5d1c9a2f4
+Create Date: 2026-10-17 14:05:12.640871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d2f6a8e1b3'
+down_revision: Union[str, Sequence[str], None] = 'b7e5d1c9a2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Com DEFAULT constante o PostgreSQL (11+) só altera o catálogo, sem reescrever a tabela
+    op.add_column('categorias', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('centros_treinamento', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('atletas', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('atletas', 'version')
+    op.drop_column('centros_treinamento', 'version')
+    op.drop_column('categorias', 'version')
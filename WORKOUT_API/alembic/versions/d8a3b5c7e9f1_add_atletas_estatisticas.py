@@ -0,0 +1,131 @@
+"""add_atletas_estatisticas
+
+Revision ID: d8a3b5c7e9f1
+Revises: c9d2f6a8e1b3
+Create Date: 2026-10-17 16:40:27.118904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a3b5c7e9f1'
+down_revision: Union[str, Sequence[str], None] = 'c9d2f6a8e1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FUNCAO_TRIGGER = """
+CREATE OR REPLACE FUNCTION atletas_estatisticas_aplica() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        -- O PostgreSQL não aceita UPDATE OF (colunas) com transition tables: o filtro fica aqui. Sem mudança
+        -- nas colunas do resumo (ex: só nome, cpf ou version), sai sem tocar nem bloquear as linhas do resumo
+        IF NOT EXISTS (
+            SELECT 1 FROM antigos a JOIN novos n USING (pk_id)
+            WHERE (a.categoria_id, a.centro_treinamento_id, a.idade, a.peso, a.altura, a.sexo)
+                IS DISTINCT FROM (n.categoria_id, n.centro_treinamento_id, n.idade, n.peso, n.altura, n.sexo)
+        ) THEN
+            RETURN NULL;
+        END IF;
+        -- Bloqueia os grupos de origem e de destino em ordem: lotes que movem atletas em sentidos opostos
+        -- esperam um pelo outro em vez de entrar em deadlock
+        PERFORM 1 FROM atletas_estatisticas e
+        WHERE (e.categoria_id, e.centro_treinamento_id) IN (
+            SELECT categoria_id, centro_treinamento_id FROM antigos
+            UNION SELECT categoria_id, centro_treinamento_id FROM novos
+        )
+        ORDER BY e.categoria_id, e.centro_treinamento_id
+        FOR UPDATE;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM 1 FROM atletas_estatisticas e
+        WHERE (e.categoria_id, e.centro_treinamento_id) IN (SELECT categoria_id, centro_treinamento_id FROM antigos)
+        ORDER BY e.categoria_id, e.centro_treinamento_id
+        FOR UPDATE;
+    END IF;
+
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO atletas_estatisticas AS e
+            (categoria_id, centro_treinamento_id, total, soma_idade, soma_peso, soma_altura, total_masculino, total_feminino)
+        SELECT categoria_id, centro_treinamento_id, count(*), sum(idade), sum(peso::numeric), sum(altura::numeric),
+               count(*) FILTER (WHERE sexo = 'M'), count(*) FILTER (WHERE sexo = 'F')
+        FROM novos GROUP BY categoria_id, centro_treinamento_id ORDER BY categoria_id, centro_treinamento_id
+        ON CONFLICT (categoria_id, centro_treinamento_id) DO UPDATE SET
+            total = e.total + EXCLUDED.total,
+            soma_idade = e.soma_idade + EXCLUDED.soma_idade,
+            soma_peso = e.soma_peso + EXCLUDED.soma_peso,
+            soma_altura = e.soma_altura + EXCLUDED.soma_altura,
+            total_masculino = e.total_masculino + EXCLUDED.total_masculino,
+            total_feminino = e.total_feminino + EXCLUDED.total_feminino;
+    END IF;
+
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE atletas_estatisticas AS e SET
+            total = e.total - a.total,
+            soma_idade = e.soma_idade - a.soma_idade,
+            soma_peso = e.soma_peso - a.soma_peso,
+            soma_altura = e.soma_altura - a.soma_altura,
+            total_masculino = e.total_masculino - a.total_masculino,
+            total_feminino = e.total_feminino - a.total_feminino
+        FROM (
+            SELECT categoria_id, centro_treinamento_id, count(*) AS total, sum(idade) AS soma_idade,
+                   sum(peso::numeric) AS soma_peso, sum(altura::numeric) AS soma_altura,
+                   count(*) FILTER (WHERE sexo = 'M') AS total_masculino, count(*) FILTER (WHERE sexo = 'F') AS total_feminino
+            FROM antigos GROUP BY categoria_id, centro_treinamento_id
+        ) AS a
+        WHERE e.categoria_id = a.categoria_id AND e.centro_treinamento_id = a.centro_treinamento_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'atletas_estatisticas',
+        sa.Column('categoria_id', sa.Integer(), nullable=False),
+        sa.Column('centro_treinamento_id', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('soma_idade', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('soma_peso', sa.Numeric(), server_default='0', nullable=False),
+        sa.Column('soma_altura', sa.Numeric(), server_default='0', nullable=False),
+        sa.Column('total_masculino', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('total_feminino', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('categoria_id', 'centro_treinamento_id'),
+    )
+    op.execute(FUNCAO_TRIGGER)
+    op.execute(
+        "CREATE TRIGGER atletas_estatisticas_insert AFTER INSERT ON atletas "
+        "REFERENCING NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_estatisticas_aplica()"
+    )
+    op.execute(
+        "CREATE TRIGGER atletas_estatisticas_update AFTER UPDATE ON atletas "
+        "REFERENCING OLD TABLE AS antigos NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_estatisticas_aplica()"
+    )
+    op.execute(
+        "CREATE TRIGGER atletas_estatisticas_delete AFTER DELETE ON atletas "
+        "REFERENCING OLD TABLE AS antigos FOR EACH STATEMENT EXECUTE FUNCTION atletas_estatisticas_aplica()"
+    )
+    # CREATE TRIGGER bloqueia escritas em atletas até o fim da transação, então a carga inicial fica consistente
+    op.execute("""
+        INSERT INTO atletas_estatisticas
+            (categoria_id, centro_treinamento_id, total, soma_idade, soma_peso, soma_altura, total_masculino, total_feminino)
+        SELECT categoria_id, centro_treinamento_id, count(*), sum(idade), sum(peso::numeric), sum(altura::numeric),
+               count(*) FILTER (WHERE sexo = 'M'), count(*) FILTER (WHERE sexo = 'F')
+        FROM atletas GROUP BY categoria_id, centro_treinamento_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS atletas_estatisticas_delete ON atletas")
+    op.execute("DROP TRIGGER IF EXISTS atletas_estatisticas_update ON atletas")
+    op.execute("DROP TRIGGER IF EXISTS atletas_estatisticas_insert ON atletas")
+    op.execute("DROP FUNCTION IF EXISTS atletas_estatisticas_aplica()")
+    op.drop_table('atletas_estatisticas')
@@ -0,0 +1,53 @@
+"""add_jobs
+
+Revision ID: e4b6c8d0f2a5
+Revises: d8a3b5c7e9f1
+Create Date: 2026-10-17 19:12:48.305617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b6c8d0f2a5'
+down_revision: Union[str, Sequence[str], None] = 'd8a3b5c7e9f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tabela da fila de jobs (JOBS_BACKEND=database); com o backend memory ela fica vazia
+    op.create_table('jobs',
+    sa.Column('pk_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=12), nullable=False),
+    sa.Column('parametros', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+    sa.Column('feito', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('tentativas', sa.Integer(), nullable=False),
+    sa.Column('resultado', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+    sa.Column('erro', sa.Text(), nullable=True),
+    sa.Column('cancelamento_solicitado', sa.Boolean(), nullable=False),
+    sa.Column('retomada', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=True),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_em', sa.DateTime(), nullable=True),
+    sa.Column('concluido_em', sa.DateTime(), nullable=True),
+    sa.Column('disponivel_em', sa.DateTime(), nullable=False),
+    sa.Column('heartbeat_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('pk_id')
+    )
+    op.create_index(op.f('ix_jobs_id'), 'jobs', ['id'], unique=True)
+    op.create_index('ix_jobs_status_disponivel_em', 'jobs', ['status', 'disponivel_em'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status_disponivel_em', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_id'), table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,40 @@
+"""add_alteracoes
+
+Revision ID: f6c8e0a2b4d7
+Revises: e4b6c8d0f2a5
+Create Date: 2026-10-17 21:03:36.482190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c8e0a2b4d7'
+down_revision: Union[str, Sequence[str], None] = 'e4b6c8d0f2a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Registro das alterações lido pelo feed GET /alteracoes/stream; pk_id (bigserial) é o cursor dos consumidores
+    op.create_table('alteracoes',
+    sa.Column('pk_id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('recurso', sa.String(length=20), nullable=False),
+    sa.Column('acao', sa.String(length=10), nullable=False),
+    sa.Column('payload', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+    sa.Column('criado_em', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('pk_id'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_alteracoes_criado_em', 'alteracoes', ['criado_em'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alteracoes_criado_em', table_name='alteracoes')
+    op.drop_table('alteracoes')
@@ -0,0 +1,83 @@
+"""Micro-benchmark da serialização de páginas LimitOffsetPage[AtletaOut].
+
+Compara, sem banco de dados, o CPU gasto por requisição em cada caminho de resposta:
+
+  - padrao:    validação pelo response_model + json.dumps (JSONResponse do FastAPI)
+  - orjson:    validação pelo response_model + FastJSONResponse (routers atuais)
+  - confiavel: trusted_response (validação única + serialização pelo pydantic-core)
+
+Uso (na pasta WORKOUT_API):  python -m benchmarks.serializacao [--repeticoes 200]
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from time import process_time
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from fastapi_pagination import LimitOffsetPage
+
+from workout_api.atleta.models import AtletaModel
+from workout_api.atleta.schemas import AtletaOut
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+from workout_api.configs.settings import settings
+from workout_api.contrib.responses import FastJSONResponse, trusted_response
+
+
+def monta_pagina(tamanho: int) -> LimitOffsetPage:
+    # Objetos do ORM transitórios, como os devolvidos pelo paginate (itens ainda não validados)
+    categoria = CategoriaModel(pk_id=1, id=uuid4(), nome="Scale")
+    centro = CentroTreinamentoModel(pk_id=1, id=uuid4(), nome="CT King", endereco="Rua x, Q02", proprietario="Marcos")
+    atletas = [
+        AtletaModel(
+            pk_id=i, id=uuid4(), created_at=datetime.now(), cpf=f"{i:011d}", nome=f"Atleta {i}",
+            idade=20 + i % 30, peso=75.5, altura=1.70, sexo="M", categoria=categoria, centro_treinamento=centro,
+        )
+        for i in range(tamanho)
+    ]
+    return LimitOffsetPage.model_construct(items=atletas, total=tamanho * 10, limit=tamanho, offset=0)
+
+
+async def padrao(pagina, campo, classe):
+    conteudo = await serialize_response(field=campo, response_content=pagina)
+    return classe(conteudo).body
+
+
+async def confiavel(pagina, campo, classe):
+    return trusted_response(pagina, response_model=LimitOffsetPage[AtletaOut]).body
+
+
+async def mede(funcao, pagina, campo, classe, repeticoes: int) -> float:
+    await funcao(pagina, campo, classe)  # aquecimento (caches do TypeAdapter/serializador)
+    inicio = process_time()
+    for _ in range(repeticoes):
+        await funcao(pagina, campo, classe)
+    return (process_time() - inicio) / repeticoes * 1000
+
+
+async def main(repeticoes: int) -> None:
+    settings.JSON_TRUSTED_OUTPUT = True
+    campo = create_model_field(name="Response_atletas", type_=LimitOffsetPage[AtletaOut], mode="serialization")
+    caminhos = [
+        ("padrao", padrao, JSONResponse),
+        ("orjson", padrao, FastJSONResponse),
+        ("confiavel", confiavel, FastJSONResponse),
+    ]
+
+    print(f"{'itens':>6} {'caminho':>10} {'ms CPU/req':>11} {'economia':>9}")
+    for tamanho in (100, 1000):
+        pagina = monta_pagina(tamanho)
+        base = None
+        for nome, funcao, classe in caminhos:
+            ms = await mede(funcao, pagina, campo, classe, repeticoes)
+            base = base or ms
+            print(f"{tamanho:>6} {nome:>10} {ms:>11.3f} {(1 - ms / base) * 100:>8.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=200)
+    asyncio.run(main(parser.parse_args().repeticoes))
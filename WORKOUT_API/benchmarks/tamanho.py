@@ -0,0 +1,75 @@
+"""Mede os bytes trafegados por página de atletas, com e sem compressão.
+
+Compara, sem banco de dados, o tamanho do corpo de cada formato de listagem em cada codificação
+oferecida pelo CompressionMiddleware (zstd/br só aparecem com zstandard/brotli instalados):
+
+  - padrao:   LimitOffsetPage[AtletaOut] (GET /atleta/), categoria e centro repetidos em cada item
+  - compacto: AtletaPaginaCompacta (GET /atleta/compacto), categorias/centros em tabelas laterais
+
+Uso (na pasta WORKOUT_API):  python -m benchmarks.tamanho [--categorias 5] [--centros 20]
+"""
+import argparse
+import random
+from collections import namedtuple
+from datetime import datetime, timedelta
+from time import process_time
+from uuid import uuid4
+
+from fastapi_pagination import LimitOffsetPage
+
+from workout_api.atleta.projecao import CAMPOS_COMPACTOS, linha_para_dict, pagina_compacta
+from workout_api.atleta.schemas import AtletaOut
+from workout_api.contrib.compression import ENCODERS, compress
+from workout_api.contrib.responses import FastJSONResponse, _adapter
+
+Linha = namedtuple("Linha", CAMPOS_COMPACTOS)
+
+
+def monta_linhas(tamanho: int, categorias: int, centros: int) -> list:
+    # Mesmo formato das linhas devolvidas por consulta_projecao(CAMPOS_COMPACTOS)
+    inicio = datetime(2025, 1, 1)
+    return [
+        Linha(
+            id=uuid4(), created_at=inicio + timedelta(minutes=i), cpf=f"{i:011d}", nome=f"Atleta {i}",
+            idade=18 + i % 40, peso=round(random.uniform(50, 110), 1), altura=round(random.uniform(1.5, 2.0), 2),
+            sexo=random.choice("MF"), categoria=f"Cat {random.randrange(categorias)}",
+            centro_treinamento=f"CT {random.randrange(centros)}",
+        )
+        for i in range(tamanho)
+    ]
+
+
+def corpo_padrao(linhas: list) -> bytes:
+    itens = [linha_para_dict(linha, CAMPOS_COMPACTOS) for linha in linhas]
+    pagina = {"items": itens, "total": len(itens) * 10, "limit": len(itens), "offset": 0}
+    modelo = _adapter(LimitOffsetPage[AtletaOut]).validate_python(pagina)
+    return FastJSONResponse(modelo).body
+
+
+def corpo_compacto(linhas: list) -> bytes:
+    return FastJSONResponse({**pagina_compacta(linhas), "total": len(linhas) * 10, "limit": len(linhas), "offset": 0}).body
+
+
+def main(categorias: int, centros: int) -> None:
+    random.seed(42)
+    print(f"{'itens':>6} {'formato':>9} {'codificação':>12} {'bytes':>9} {'vs padrão':>10} {'ms CPU':>7}")
+    for tamanho in (50, 500):
+        linhas = monta_linhas(tamanho, categorias, centros)
+        base = None
+        for formato, monta in (("padrao", corpo_padrao), ("compacto", corpo_compacto)):
+            corpo = monta(linhas)
+            base = base or len(corpo)
+            print(f"{tamanho:>6} {formato:>9} {'identity':>12} {len(corpo):>9} {(1 - len(corpo) / base) * 100:>9.1f}% {'-':>7}")
+            for encoding in ENCODERS:
+                inicio = process_time()
+                comprimido = compress(encoding, corpo)
+                ms = (process_time() - inicio) * 1000
+                print(f"{tamanho:>6} {formato:>9} {encoding:>12} {len(comprimido):>9} {(1 - len(comprimido) / base) * 100:>9.1f}% {ms:>7.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--categorias", type=int, default=5)
+    parser.add_argument("--centros", type=int, default=20)
+    args = parser.parse_args()
+    main(args.categorias, args.centros)
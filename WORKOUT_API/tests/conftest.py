@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+# Sem TEST_DB_URL os testes rodam em um SQLite temporário; a configuração é lida na importação do app
+_DB_DIR = tempfile.mkdtemp(prefix="workout_api_tests_")
+os.environ["DB_URL"] = os.environ.get("TEST_DB_URL", f"sqlite+aiosqlite:///{_DB_DIR}/workout.sqlite")
+
+import httpx
+import pytest
+from sqlalchemy import event, text
+
+from workout_api.configs.database import engine
+from workout_api.contrib.cache import categoria_cache, centro_treinamento_cache
+from workout_api.contrib.models import BaseModel
+from workout_api.contrib.object_cache import atleta_object_cache, categoria_object_cache, centro_treinamento_object_cache
+from workout_api.main import app
+import workout_api.contrib.repository.models  # noqa: F401
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _ativa_foreign_keys(dbapi_connection, connection_record):
+    # O SQLite só valida as FKs com o pragma ligado; sem ele os testes não veem as violações que o PostgreSQL vê
+    if engine.dialect.name == "sqlite":
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+#Recria o schema a cada teste e entrega um cliente HTTP ligado ao app
+@pytest.fixture
+async def client():
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # O índice GIN de nome usa gin_trgm_ops (na migração b7e5d1c9a2f4 a extensão é criada antes)
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(BaseModel.metadata.drop_all)
+        await conn.run_sync(BaseModel.metadata.create_all)
+    categoria_cache.clear()
+    centro_treinamento_cache.clear()
+    for cache in (atleta_object_cache, categoria_object_cache, centro_treinamento_object_cache):
+        await cache.clear()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as cl:
+        yield cl
+    await engine.dispose()
+
+
+#Cadastra uma categoria, um centro e `quantidade` atletas vinculados a eles
+async def cria_atletas(cl: httpx.AsyncClient, quantidade: int) -> None:
+    r = await cl.post("/categorias/", json={"nome": "Scale"})
+    assert r.status_code == 201, r.text
+    r = await cl.post(
+        "/centro_treinamento/", json={"nome": "CT King", "endereco": "Rua X, 10", "proprietario": "Marcos"}
+    )
+    assert r.status_code == 201, r.text
+    for i in range(quantidade):
+        r = await cl.post("/atleta/", json={
+            "nome": f"Atleta {i}", "cpf": f"{i:011d}", "idade": 25, "peso": 75.5, "altura": 1.7, "sexo": "M",
+            "categoria": {"nome": "Scale"}, "centro_treinamento": {"nome": "CT King"},
+        })
+        assert r.status_code == 201, r.text
@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta
+from time import monotonic
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, select
+
+from workout_api.alteracoes import feed
+from workout_api.alteracoes.feed import FeedAlteracoes, limpa_alteracoes
+from workout_api.alteracoes.models import AlteracaoModel
+from workout_api.configs.database import async_session
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def _registra(*seqs: int, criado_em: datetime | None = None) -> None:
+    async with async_session() as db_session:
+        await db_session.execute(insert(AlteracaoModel), [
+            {"pk_id": seq, "recurso": "atleta", "acao": "criado", "payload": {"id": str(uuid4()), "version": 1},
+             "criado_em": criado_em or datetime.now()}
+            for seq in seqs
+        ])
+        await db_session.commit()
+
+
+#Feed parado em ultimo=0 com a lacuna em 1 já esperando além do ALTERACOES_GAP_TIMEOUT
+def _feed_com_lacuna_expirada() -> FeedAlteracoes:
+    alteracoes = FeedAlteracoes()
+    alteracoes._lacuna = (1, monotonic() - 3600)
+    return alteracoes
+
+
+async def test_escrita_registra_alteracao_com_id_e_versao(client):
+    r = await client.post("/categorias/", json={"nome": "Scale"})
+
+    eventos = await feed._consulta(0)
+
+    assert len(eventos) == 1
+    assert eventos[0].recurso == "categoria"
+    assert f'"id":"{r.json()["id"]}"'.encode() in eventos[0].mensagem
+    assert b'"version":1' in eventos[0].mensagem
+
+
+async def test_lacuna_confirmada_antes_de_pular_e_entregue_em_ordem(client, monkeypatch):
+    await _registra(2)
+    consulta = feed._consulta
+    leituras = []
+
+    async def consulta_com_commit_tardio(depois_de, ate=None):
+        leituras.append(depois_de)
+        if len(leituras) == 2:
+            await _registra(1)  # Commit da transação atrasada entre a leitura e a decisão de pular
+        return await consulta(depois_de, ate)
+
+    monkeypatch.setattr(feed, "_consulta", consulta_com_commit_tardio)
+    alteracoes = _feed_com_lacuna_expirada()
+
+    await alteracoes._busca()
+
+    assert [evento.seq for evento in alteracoes._buffer] == [1, 2]
+    assert alteracoes.lacunas_puladas == 0
+
+
+async def test_lacuna_ainda_faltando_e_pulada_apos_o_timeout(client):
+    await _registra(2, 3, 5)
+    alteracoes = _feed_com_lacuna_expirada()
+
+    await alteracoes._busca()
+
+    # Pula só a lacuna vencida; a seguinte (4) começa a própria espera
+    assert [evento.seq for evento in alteracoes._buffer] == [2, 3]
+    assert alteracoes.lacunas_puladas == 1
+    assert await alteracoes._busca() is False
+    assert alteracoes.ultimo == 3
+
+
+async def test_limpeza_remove_so_alteracoes_fora_da_retencao(client, monkeypatch):
+    monkeypatch.setattr(feed.settings, "ALTERACOES_RETENCAO_DIAS", 7)
+    await _registra(1, 2, criado_em=datetime.now() - timedelta(days=8))
+    await _registra(3)
+
+    assert await limpa_alteracoes() == 2
+
+    async with async_session() as db_session:
+        restantes = (await db_session.execute(select(AlteracaoModel.pk_id))).scalars().all()
+    assert restantes == [3]
+
+
+async def test_publicacao_antes_de_o_consumidor_esperar_nao_se_perde(monkeypatch):
+    alteracoes = FeedAlteracoes()
+    monkeypatch.setattr(alteracoes, "inicia", lambda: asyncio.sleep(0))
+    wait_for = asyncio.wait_for
+
+    async def wait_for_em_outra_tarefa(aguardavel, timeout):
+        # Como no Python 3.10/3.11: a espera só começa quando a tarefa interna do wait_for roda
+        await asyncio.sleep(0)
+        return await wait_for(aguardavel, timeout)
+
+    monkeypatch.setattr(asyncio, "wait_for", wait_for_em_outra_tarefa)
+    eventos = alteracoes.eventos(None)
+    await anext(eventos)
+    proximo = asyncio.create_task(anext(eventos))
+    await asyncio.sleep(0)
+
+    # O consumidor já viu que está em dia, mas ainda não começou a esperar
+    alteracoes._publica([feed.Evento(1, "atleta", b"id: 1\n\n")])
+
+    assert await wait_for(proximo, 1) == b"id: 1\n\n"
+    await eventos.aclose()
@@ -0,0 +1,69 @@
+import pytest
+
+from tests.conftest import cria_atletas
+from workout_api.contrib.cache import categoria_cache, centro_treinamento_cache
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def _primeiro_atleta(client) -> dict:
+    r = await client.get("/atleta/", params={"limit": 1})
+    return r.json()["items"][0]
+
+
+async def test_patch_com_categoria_obsoleta_no_cache_retorna_400(client):
+    await cria_atletas(client, 1)
+    atleta = await _primeiro_atleta(client)
+    # pk_id de uma categoria removida depois de entrar no cache
+    categoria_cache.set("Removida", 999)
+
+    r = await client.patch(f"/atleta/{atleta['id']}", json={"categoria": {"nome": "Removida"}})
+
+    assert r.status_code == 400, r.text
+    assert "Removida" in r.json()["detail"]
+    assert categoria_cache.get("Removida") is None
+
+
+async def test_patch_com_centro_obsoleto_no_cache_retorna_400(client):
+    await cria_atletas(client, 1)
+    atleta = await _primeiro_atleta(client)
+    centro_treinamento_cache.set("CT Fechado", 999)
+
+    r = await client.patch(f"/atleta/{atleta['id']}", json={"centro_treinamento": {"nome": "CT Fechado"}})
+
+    assert r.status_code == 400, r.text
+    assert centro_treinamento_cache.get("CT Fechado") is None
+
+    # A sessão foi desfeita: a próxima edição funciona normalmente
+    r = await client.patch(f"/atleta/{atleta['id']}", json={"nome": "Novo Nome"})
+    assert r.status_code == 200, r.text
+    assert r.json()["nome"] == "Novo Nome"
+
+
+@pytest.mark.parametrize("filtro", ["nome", "nome_contem"])
+async def test_filtros_de_nome_exigem_tres_caracteres(client, filtro):
+    await cria_atletas(client, 2)
+
+    assert (await client.get("/atleta/", params={filtro: "At"})).status_code == 422
+    r = await client.get("/atleta/", params={filtro: "eta 1" if filtro == "nome_contem" else "Atl"})
+    assert r.status_code == 200, r.text
+    assert r.json()["total"] == (1 if filtro == "nome_contem" else 2)
+
+
+@pytest.mark.parametrize("if_match, esperado", [
+    ('"1.1.1"', 200),
+    ('"9.1.1", "1.1.1"', 200),
+    ('*', 200),
+    ('W/"1.1.1"', 412),
+    ('"9.1.1"', 412),
+    ('"outro-servidor"', 412),
+    ('1.1.1', 400),
+])
+async def test_if_match_usa_comparacao_forte(client, if_match, esperado):
+    await cria_atletas(client, 1)
+    atleta = await _primeiro_atleta(client)
+
+    r = await client.patch(f"/atleta/{atleta['id']}", json={"idade": 30}, headers={"If-Match": if_match})
+
+    assert r.status_code == esperado, r.text
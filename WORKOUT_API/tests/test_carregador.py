@@ -0,0 +1,93 @@
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from tests.conftest import cria_atletas
+from workout_api.atleta.carregador import AtletaLoader
+from workout_api.atleta.models import AtletaModel
+from workout_api.configs.database import async_session
+from workout_api.configs.settings import settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def ids(client, monkeypatch):
+    monkeypatch.setattr(settings, "ID_BATCH_ENABLED", True)
+    monkeypatch.setattr(settings, "ID_BATCH_WINDOW_MS", 50)
+    await cria_atletas(client, 3)
+    async with async_session() as db_session:
+        return list((await db_session.scalars(select(AtletaModel.id).order_by(AtletaModel.pk_id))).all())
+
+
+#Carrega um atleta com uma sessão própria, como cada requisição faz
+async def _carrega(loader: AtletaLoader, id):
+    async with async_session() as db_session:
+        return await loader.load(db_session, id)
+
+
+async def test_requisicoes_simultaneas_usam_uma_consulta(ids):
+    loader = AtletaLoader()
+
+    resultados = await asyncio.gather(*(_carrega(loader, id) for id in ids + ids[:1]))
+
+    assert all(str(id).encode() in r.body for r, id in zip(resultados, ids + ids[:1]))
+    assert loader.stats() == {"lotes": 1, "ids_agrupados": 3}
+
+
+async def test_id_inexistente_volta_none_sem_afetar_o_lote(ids):
+    loader = AtletaLoader()
+
+    encontrado, inexistente = await asyncio.gather(_carrega(loader, ids[0]), _carrega(loader, uuid4()))
+
+    assert str(ids[0]).encode() in encontrado.body
+    assert inexistente is None
+    assert loader.stats() == {"lotes": 1, "ids_agrupados": 2}
+
+
+async def test_lider_cancelado_nao_derruba_as_demais(ids):
+    loader = AtletaLoader()
+    lider = asyncio.create_task(_carrega(loader, ids[0]))
+    await asyncio.sleep(0)
+    seguidora = asyncio.create_task(_carrega(loader, ids[1]))
+    await asyncio.sleep(0.01)
+
+    # Cliente do líder desconectou durante a janela: a seguidora refaz a consulta com a própria sessão
+    lider.cancel()
+    resultado = await seguidora
+
+    assert lider.cancelled()
+    assert str(ids[1]).encode() in resultado.body
+    assert loader._abertos == {}
+    assert loader.stats() == {"lotes": 1, "ids_agrupados": 1}
+
+
+async def test_janela_atrasa_so_a_requisicao_sozinha(ids, monkeypatch):
+    monkeypatch.setattr(settings, "ID_BATCH_WINDOW_MS", 200)
+    monkeypatch.setattr(settings, "ID_BATCH_MAX_SIZE", 2)
+    loader = AtletaLoader()
+
+    # Sozinha, a requisição espera a janela inteira por outros IDs
+    inicio = time.monotonic()
+    await _carrega(loader, ids[0])
+    assert time.monotonic() - inicio >= 0.2
+
+    # Com o lote cheio (ID_BATCH_MAX_SIZE), a consulta sai sem esperar o fim da janela
+    inicio = time.monotonic()
+    await asyncio.gather(_carrega(loader, ids[1]), _carrega(loader, ids[2]))
+    assert time.monotonic() - inicio < 0.2
+
+
+async def test_sem_agrupamento_consulta_direto(ids, monkeypatch):
+    monkeypatch.setattr(settings, "ID_BATCH_ENABLED", False)
+    monkeypatch.setattr(settings, "ID_BATCH_WINDOW_MS", 10_000)
+    loader = AtletaLoader()
+
+    resultado = await asyncio.wait_for(_carrega(loader, ids[0]), 5)
+
+    assert str(ids[0]).encode() in resultado.body
+    assert loader.stats() == {"lotes": 0, "ids_agrupados": 0}
@@ -0,0 +1,50 @@
+import zlib
+
+import pytest
+
+from workout_api.contrib import compression
+from workout_api.contrib.compression import ENCODERS, CompressionMiddleware
+
+
+pytestmark = pytest.mark.anyio
+
+PEDACOS = [b'{"nome": "Atleta %d"}\n' % i * 20 for i in range(3)]
+
+
+def _descompressor(encoding: str):
+    if encoding == "gzip":
+        return zlib.decompressobj(31).decompress
+    if encoding == "br":
+        return compression.brotli.Decompressor().process
+    return compression.zstandard.ZstdDecompressor().decompressobj().decompress
+
+
+#Roda o middleware sobre uma resposta em streaming e devolve as mensagens de corpo enviadas
+async def _stream(encoding: str) -> list[dict]:
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        for pedaco in PEDACOS:
+            await send({"type": "http.response.body", "body": pedaco, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    enviadas = []
+
+    async def send(message):
+        enviadas.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", encoding.encode())]}
+    await CompressionMiddleware(app)(scope, None, send)
+    assert dict(enviadas[0]["headers"])[b"content-encoding"] == encoding.encode()
+    return enviadas[1:]
+
+
+@pytest.mark.parametrize("encoding", list(ENCODERS))
+async def test_streaming_cada_pedaco_decodificavel_ao_chegar(encoding):
+    descomprime = _descompressor(encoding)
+
+    mensagens = await _stream(encoding)
+
+    # Cada pedaço enviado pelo app já chega inteiro ao cliente, sem esperar o fim da resposta
+    for pedaco, mensagem in zip(PEDACOS, mensagens):
+        assert descomprime(mensagem["body"]) == pedaco
+    assert mensagens[-1]["more_body"] is False
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import select, text
+
+from tests.conftest import cria_atletas
+from workout_api.atleta.estatisticas import _agregado_atletas, atletas_estatisticas
+from workout_api.configs.database import engine
+
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(engine.dialect.name != "postgresql", reason="Triggers do resumo só existem no PostgreSQL"),
+]
+
+
+#Resumo mantido pelos triggers (sem grupos zerados) e o mesmo agregado calculado direto em atletas
+async def _resumo_e_agregado() -> tuple[list, list]:
+    async with engine.connect() as conn:
+        resumo = (await conn.execute(
+            select(atletas_estatisticas)
+            .where(atletas_estatisticas.c.total > 0)
+            .order_by(atletas_estatisticas.c.categoria_id, atletas_estatisticas.c.centro_treinamento_id)
+        )).all()
+        agregado = (await conn.execute(
+            _agregado_atletas().order_by(text("categoria_id"), text("centro_treinamento_id"))
+        )).all()
+    # Somas de peso/altura: numeric no resumo, double precision no agregado
+    def normaliza(linhas):
+        return [tuple(round(float(valor), 6) for valor in linha) for linha in linhas]
+
+    return normaliza(resumo), normaliza(agregado)
+
+
+async def _xmin_do_resumo() -> list:
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT xmin::text FROM atletas_estatisticas ORDER BY 1"))).scalars().all()
+
+
+async def _atletas(client) -> list[dict]:
+    r = await client.get("/atleta/", params={"limit": 100})
+    assert r.status_code == 200, r.text
+    return r.json()["items"]
+
+
+async def test_resumo_acompanha_insert_update_e_delete(client):
+    await cria_atletas(client, 4)
+    resumo, agregado = await _resumo_e_agregado()
+    assert resumo == agregado and resumo[0][2] == 4
+
+    atletas = await _atletas(client)
+    r = await client.patch(f"/atleta/{atletas[0]['id']}", json={"idade": 40, "peso": 90.0})
+    assert r.status_code == 200, r.text
+    assert (await client.post("/categorias/", json={"nome": "RX"})).status_code == 201
+    r = await client.patch(f"/atleta/{atletas[1]['id']}", json={"categoria": {"nome": "RX"}})
+    assert r.status_code == 200, r.text
+    resumo, agregado = await _resumo_e_agregado()
+    assert resumo == agregado and len(resumo) == 2
+
+    assert (await client.delete(f"/atleta/{atletas[2]['id']}")).status_code == 204
+    resumo, agregado = await _resumo_e_agregado()
+    assert resumo == agregado and sum(linha[2] for linha in resumo) == 3
+
+
+async def test_update_sem_colunas_do_resumo_nao_toca_o_resumo(client):
+    await cria_atletas(client, 2)
+    atletas = await _atletas(client)
+    antes = await _xmin_do_resumo()
+
+    r = await client.patch(f"/atleta/{atletas[0]['id']}", json={"nome": "Renomeado"})
+    assert r.status_code == 200, r.text
+
+    assert await _xmin_do_resumo() == antes
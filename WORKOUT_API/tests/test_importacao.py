@@ -0,0 +1,90 @@
+import codecs
+
+import pytest
+
+from tests.conftest import cria_atletas
+from workout_api.atleta import importacao
+from workout_api.contrib.cache import categoria_cache
+
+
+pytestmark = pytest.mark.anyio
+
+CSV = 'nome,cpf,idade,peso,altura,sexo,categoria,centro_treinamento\n'
+
+
+def _linha_csv(nome: str, cpf: str, categoria: str = "Scale") -> str:
+    return f'{nome},{cpf},30,80.5,1.8,M,{categoria},CT King\n'
+
+
+#Envia o corpo em pedaços do tamanho dado, como chega de um upload em streaming
+async def _importa(client, corpo: bytes, tamanho: int = 7, content_type: str = "text/csv"):
+    async def pedacos():
+        for inicio in range(0, len(corpo), tamanho):
+            yield corpo[inicio:inicio + tamanho]
+
+    r = await client.post("/atleta/importar", content=pedacos(), headers={"content-type": content_type})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+async def test_csv_com_bom_multibyte_e_quebra_de_linha_entre_aspas(client):
+    await cria_atletas(client, 0)
+    corpo = codecs.BOM_UTF8 + (CSV + '"José\nda Conceição",00000000001,30,80.5,1.8,M,Scale,CT King\r\n'
+                               + _linha_csv("Ñandú", "00000000002")).encode()
+
+    # Pedaços de 1 e 7 bytes cortam o BOM e os caracteres multibyte ao meio
+    for tamanho in (1, 7):
+        await _importa(client, corpo, tamanho)
+
+    r = await client.get("/atleta/", params={"limit": 10})
+    nomes = sorted(atleta["nome"] for atleta in r.json()["items"])
+    assert nomes == ["José\nda Conceição", "Ñandú"]
+
+
+async def test_linha_com_utf8_invalido_vira_erro_da_linha(client):
+    await cria_atletas(client, 0)
+    corpo = (CSV + _linha_csv("Ana", "00000000001")).encode() + b"Bad\xff,00000000002\n" + _linha_csv("Bia", "00000000003").encode()
+
+    relatorio = await _importa(client, corpo)
+
+    assert relatorio["inseridos"] == 2
+    assert [(erro["linha"], "codificação inválida" in erro["detalhe"]) for erro in relatorio["erros"]] == [(3, True)]
+
+
+async def test_linha_acima_do_limite_vira_erro_da_linha(client, monkeypatch):
+    await cria_atletas(client, 0)
+    monkeypatch.setattr(importacao, "MAX_BYTES_LINHA", 200)
+    corpo = (CSV + _linha_csv("A" * 300, "00000000001") + _linha_csv("Bia", "00000000002")).encode()
+
+    relatorio = await _importa(client, corpo)
+
+    assert relatorio["inseridos"] == 1
+    assert relatorio["erros"][0]["linha"] == 2
+    assert "limite" in relatorio["erros"][0]["detalhe"]
+
+
+async def test_ndjson_linha_acima_do_limite(client, monkeypatch):
+    await cria_atletas(client, 0)
+    monkeypatch.setattr(importacao, "MAX_BYTES_LINHA", 50)
+    corpo = b'{"nome": "' + b"x" * 100 + b'"}\n{"nome": 1}\n'
+
+    relatorio = await _importa(client, corpo, content_type="application/x-ndjson")
+
+    assert relatorio["total_erros"] == 2
+    assert "limite" in relatorio["erros"][0]["detalhe"]
+    assert relatorio["erros"][1]["linha"] == 2
+
+
+async def test_pk_id_obsoleto_no_cache_nao_interrompe_a_importacao(client):
+    await cria_atletas(client, 0)
+    # Simula categorias removidas (e recriadas) depois de entrarem no cache
+    categoria_cache.set("Scale", 999)
+    categoria_cache.set("Removida", 998)
+    corpo = (CSV + _linha_csv("Ana", "00000000001") + _linha_csv("Bia", "00000000002", "Removida")).encode()
+
+    relatorio = await _importa(client, corpo)
+
+    assert relatorio["inseridos"] == 1
+    assert [erro["linha"] for erro in relatorio["erros"]] == [3]
+    assert "Removida" in relatorio["erros"][0]["detalhe"]
+    assert categoria_cache.get("Scale") != 999
@@ -0,0 +1,60 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from tests.conftest import cria_atletas
+from workout_api.atleta.filtros import AtletaFiltros, condicoes_filtros
+from workout_api.atleta.models import AtletaModel
+from workout_api.configs.database import engine
+
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(engine.dialect.name != "postgresql", reason="EXPLAIN com os índices do PostgreSQL"),
+]
+
+QUANTIDADE = 5000
+
+
+#Plano de execução da consulta; enable_seqscan=off faz o planner escolher um índice sempre que houver um utilizável
+async def _plano(stmt) -> str:
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        linhas = (await conn.exec_driver_sql(f"EXPLAIN {sql}")).scalars().all()
+    return "\n".join(linhas)
+
+
+def _assert_usa_indice(plano: str) -> None:
+    # "Index Scan" também casa com Bitmap Index Scan
+    assert "Seq Scan on atletas" not in plano, plano
+    assert "Index Scan" in plano or "Index Only Scan" in plano, plano
+
+
+@pytest.fixture
+async def atletas(client):
+    await cria_atletas(client, 1)
+    async with engine.begin() as conn:
+        referencia = dict((await conn.execute(select(AtletaModel.__table__))).mappings().one())
+        valores = {chave: valor for chave, valor in referencia.items() if chave != "pk_id"}
+        await conn.execute(insert(AtletaModel), [
+            {**valores, "id": uuid4(), "cpf": f"{i:011d}", "nome": f"Carga {i}"} for i in range(1, QUANTIDADE)
+        ])
+        await conn.execute(text("ANALYZE atletas"))
+    return referencia
+
+
+async def test_busca_por_id_usa_indice(atletas):
+    _assert_usa_indice(await _plano(select(AtletaModel).filter_by(id=atletas["id"])))
+
+
+@pytest.mark.parametrize("filtros", [
+    AtletaFiltros(categoria="Scale"),
+    AtletaFiltros(centro_treinamento="CT King"),
+    AtletaFiltros(nome="Carga 12"),
+    AtletaFiltros(nome_contem="rga 12"),
+])
+async def test_filtros_de_referencia_usam_indice(atletas, filtros):
+    stmt = select(AtletaModel).where(*condicoes_filtros(filtros)).order_by(AtletaModel.created_at)
+    _assert_usa_indice(await _plano(stmt))
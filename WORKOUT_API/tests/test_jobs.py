@@ -0,0 +1,210 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from tests.conftest import cria_atletas
+from workout_api.alteracoes.models import AlteracaoModel
+from workout_api.atleta.models import AtletaModel
+from workout_api.configs.database import async_session, jobs_engine, jobs_session
+from workout_api.configs.settings import settings
+from workout_api.contrib.object_cache import atleta_object_cache
+from workout_api.jobs.fila import DatabaseJobStore, Job, JobQueue, MemoryJobStore, job_queue
+from workout_api.jobs.models import JobModel
+
+
+pytestmark = pytest.mark.anyio
+
+
+#Fila com o backend memory e uma tarefa 'teste' que executa `funcao`
+def _fila(funcao) -> JobQueue:
+    fila = JobQueue()
+    fila.store = MemoryJobStore()
+    fila.tarefa("teste")(funcao)
+    return fila
+
+
+async def _espera(condicao, limite: float = 5.0) -> None:
+    async with asyncio.timeout(limite):
+        while not condicao():
+            await asyncio.sleep(0.01)
+
+
+async def test_worker_sobrevive_a_falha_ao_registrar_o_desfecho(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_CONCURRENCY", 1)
+    executados = []
+
+    async def tarefa(contexto, parametros):
+        executados.append(parametros["n"])
+        return {}
+
+    fila = _fila(tarefa)
+    atualiza = fila.store.atualiza
+
+    async def atualiza_falha_no_primeiro(id, **campos):
+        if campos.get("status") == "concluido" and len(executados) == 1:
+            raise ConnectionError("banco fora do ar")
+        await atualiza(id, **campos)
+
+    monkeypatch.setattr(fila.store, "atualiza", atualiza_falha_no_primeiro)
+    await fila.start()
+    try:
+        await fila.enfileira("teste", {"n": 1})
+        segundo = await fila.enfileira("teste", {"n": 2})
+        await _espera(lambda: segundo.status == "concluido")
+    finally:
+        await fila.stop()
+
+    assert executados == [1, 2]
+
+
+# --- Jobs em lote no backend database: retomada, cancelamento e lease ---
+@pytest.fixture
+async def fila_database(client, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_CHUNK_SIZE", 2)
+    monkeypatch.setattr(job_queue, "store", DatabaseJobStore(jobs_session))
+    monkeypatch.setattr(job_queue, "execucoes", dict.fromkeys(job_queue.execucoes, 0))
+    yield job_queue
+    await jobs_engine.dispose()
+
+
+#Executa `funcao` depois que cada bloco é confirmado (no ponto em que o cache dos atletas é invalidado)
+def _apos_cada_bloco(monkeypatch, funcao) -> None:
+    invalidate = atleta_object_cache.invalidate
+    blocos = []
+
+    async def apos_bloco(*ids):
+        await invalidate(*ids)
+        blocos.append(ids)
+        await funcao(len(blocos))
+
+    monkeypatch.setattr(atleta_object_cache, "invalidate", apos_bloco)
+
+
+async def _enfileira_atualizacao(fila) -> Job:
+    return await fila.enfileira(
+        "atletas.lote.atualizar", {"ids": None, "filtros": {}, "alteracoes": {"idade": 30}}
+    )
+
+
+async def _versoes_e_eventos() -> tuple[list[int], int]:
+    async with async_session() as db_session:
+        versoes = (await db_session.scalars(select(AtletaModel.version).order_by(AtletaModel.pk_id))).all()
+        eventos = (
+            await db_session.execute(select(func.count()).where(AlteracaoModel.acao == "alterado"))
+        ).scalar_one()
+    return list(versoes), eventos
+
+
+async def test_nova_tentativa_continua_do_ultimo_bloco_confirmado(client, fila_database, monkeypatch):
+    await cria_atletas(client, 5)
+    monkeypatch.setattr(settings, "JOBS_RETRY_BACKOFF", 0)
+
+    async def falha_no_segundo_bloco(bloco):
+        if bloco == 2:
+            raise ConnectionError("conexão perdida")
+
+    _apos_cada_bloco(monkeypatch, falha_no_segundo_bloco)
+    job = await _enfileira_atualizacao(fila_database)
+
+    await fila_database._executa(await fila_database.store.claim())
+    pendente = await fila_database.obtem(job.id)
+    assert (pendente.status, pendente.feito, pendente.retomada["ultimo_pk"]) == ("pendente", 2, 4)
+
+    await fila_database._executa(await fila_database.store.claim())
+    concluido = await fila_database.obtem(job.id)
+
+    assert (concluido.status, concluido.tentativas, concluido.resultado) == ("concluido", 2, {"total": 5})
+    assert await _versoes_e_eventos() == ([2] * 5, 5)
+
+
+async def test_cancelamento_para_apos_o_bloco_atual(client, fila_database, monkeypatch):
+    await cria_atletas(client, 5)
+    job = await _enfileira_atualizacao(fila_database)
+
+    async def cancela_no_primeiro_bloco(bloco):
+        if bloco == 1:
+            await fila_database.cancela(job.id)
+
+    _apos_cada_bloco(monkeypatch, cancela_no_primeiro_bloco)
+    await fila_database._executa(await fila_database.store.claim())
+    cancelado = await fila_database.obtem(job.id)
+
+    assert (cancelado.status, cancelado.feito) == ("cancelado", 2)
+    assert await _versoes_e_eventos() == ([2, 2, 1, 1, 1], 2)
+    assert fila_database.execucoes["cancelado"] == 1
+
+
+async def test_job_assumido_por_outro_worker_nao_grava_de_novo(client, fila_database, monkeypatch):
+    await cria_atletas(client, 5)
+    monkeypatch.setattr(settings, "JOBS_LEASE_TIMEOUT", 60)
+    job = await _enfileira_atualizacao(fila_database)
+    reassumidos = []
+
+    async def expira_lease_no_primeiro_bloco(bloco):
+        if bloco == 1 and not reassumidos:
+            # Sem sinal de vida além do JOBS_LEASE_TIMEOUT: o claim de outro worker assume o job
+            async with jobs_session() as db_session:
+                await db_session.execute(
+                    update(JobModel).where(JobModel.id == job.id).values(heartbeat_em=datetime.now() - timedelta(hours=1))
+                )
+                await db_session.commit()
+            reassumidos.append(await fila_database.store.claim())
+
+    _apos_cada_bloco(monkeypatch, expira_lease_no_primeiro_bloco)
+    await fila_database._executa(await fila_database.store.claim())
+    assert fila_database.execucoes["perdido"] == 1
+    assert (await fila_database.obtem(job.id)).status == "executando"
+
+    await fila_database._executa(reassumidos[0])
+    concluido = await fila_database.obtem(job.id)
+
+    assert (concluido.status, concluido.tentativas, concluido.resultado) == ("concluido", 2, {"total": 5})
+    assert await _versoes_e_eventos() == ([2] * 5, 5)
+
+
+# --- Heartbeat: a execução é interrompida quando o lease não pode ser mantido ---
+async def test_heartbeat_interrompe_job_assumido_por_outro_worker(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_LEASE_TIMEOUT", 0.3)
+    interrompido = asyncio.Event()
+
+    async def tarefa(contexto, parametros):
+        try:
+            await asyncio.sleep(60)
+        finally:
+            interrompido.set()
+
+    fila = _fila(tarefa)
+    job = await fila.enfileira("teste", {})
+    await fila.store.claim()
+    # Outro worker assumiu: a tentativa registrada não é mais a desta execução
+    executando = asyncio.create_task(fila._executa(Job(tipo="teste", parametros={}, id=job.id, tentativas=0)))
+
+    async with asyncio.timeout(5):
+        await executando
+    assert interrompido.is_set()
+    assert fila.execucoes["perdido"] == 1
+    assert job.status == "executando"
+
+
+async def test_heartbeat_com_falhas_interrompe_antes_do_lease_expirar(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_LEASE_TIMEOUT", 0.3)
+
+    async def tarefa(contexto, parametros):
+        await asyncio.sleep(60)
+
+    fila = _fila(tarefa)
+    await fila.enfileira("teste", {})
+
+    async def heartbeat_falha(id, tentativa):
+        raise ConnectionError("banco fora do ar")
+
+    monkeypatch.setattr(fila.store, "heartbeat", heartbeat_falha)
+    inicio = time.monotonic()
+    async with asyncio.timeout(5):
+        await fila._executa(await fila.store.claim())
+
+    assert time.monotonic() - inicio < settings.JOBS_LEASE_TIMEOUT
+    assert fila.execucoes["perdido"] == 1
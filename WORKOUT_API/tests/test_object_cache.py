@@ -0,0 +1,82 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+from sqlalchemy import update
+
+from tests.conftest import cria_atletas
+from workout_api.atleta.models import AtletaModel
+from workout_api.configs.database import engine
+from workout_api.contrib.object_cache import CachedObject, MemoryBackend, ObjectCache
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_falhas_simultaneas_viram_uma_unica_carga():
+    cache = ObjectCache("teste", MemoryBackend())
+    cargas = 0
+    liberar = asyncio.Event()
+
+    async def loader():
+        nonlocal cargas
+        cargas += 1
+        await liberar.wait()
+        return CachedObject(b'{"id": 1}', '"1"')
+
+    tarefas = [asyncio.create_task(cache.get_or_load(1, loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    liberar.set()
+    itens = await asyncio.gather(*tarefas)
+
+    assert cargas == 1
+    assert cache.coalesced == 9
+    assert {item.body for item in itens} == {b'{"id": 1}'}
+    # Gravado nas duas camadas: a próxima leitura não chama o loader
+    assert await cache.backend.get("teste:1") is not None
+    assert (await cache.get_or_load(1, loader)).etag == '"1"'
+    assert cargas == 1
+
+
+async def test_escrita_durante_a_carga_nao_vai_para_o_cache():
+    cache = ObjectCache("teste", MemoryBackend())
+
+    async def loader():
+        await cache.invalidate(1)  # PATCH concluído enquanto a leitura estava em andamento
+        return CachedObject(b"velho", '"1"')
+
+    assert (await cache.get_or_load(1, loader)).body == b"velho"
+    assert cache.local.get("teste:1") is None
+    assert await cache.backend.get("teste:1") is None
+
+
+async def _primeiro_atleta(client) -> str:
+    return (await client.get("/atleta/", params={"limit": 1})).json()["items"][0]["id"]
+
+
+async def test_patch_e_delete_invalidam_o_cache(client):
+    await cria_atletas(client, 1)
+    id = await _primeiro_atleta(client)
+    assert (await client.get(f"/atleta/{id}")).json()["nome"] == "Atleta 0"
+
+    r = await client.patch(f"/atleta/{id}", json={"nome": "Renomeado"})
+    assert r.status_code == 200, r.text
+    r = await client.get(f"/atleta/{id}")
+    assert r.json()["nome"] == "Renomeado"
+    assert r.headers["etag"].startswith('"2')  # Versão do atleta (a de categoria e centro vem junto)
+
+    assert (await client.delete(f"/atleta/{id}")).status_code == 204
+    assert (await client.get(f"/atleta/{id}")).status_code == 404
+
+
+async def test_read_primary_ignora_o_cache(client):
+    await cria_atletas(client, 1)
+    id = await _primeiro_atleta(client)
+    await client.get(f"/atleta/{id}")
+    # Escrita feita por fora da API (ex: outro worker): o LRU local ainda tem a versão anterior
+    async with engine.begin() as conn:
+        await conn.execute(update(AtletaModel).where(AtletaModel.id == UUID(id)).values(nome="Direto no banco"))
+
+    assert (await client.get(f"/atleta/{id}")).json()["nome"] == "Atleta 0"
+    r = await client.get(f"/atleta/{id}", headers={"X-Read-Primary": "true"})
+    assert r.json()["nome"] == "Direto no banco"
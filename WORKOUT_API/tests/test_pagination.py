@@ -0,0 +1,75 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import select
+
+from tests.conftest import cria_atletas
+from workout_api.atleta.models import AtletaModel
+from workout_api.atleta.projecao import CAMPOS_COMPACTOS, consulta_projecao
+from workout_api.configs.settings import settings
+from workout_api.contrib import pagination
+from workout_api.contrib.pagination import _tabela_base
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_cursor_percorre_paginas(client):
+    await cria_atletas(client, 5)
+
+    r = await client.get("/atleta/cursor", params={"size": 3})
+    assert r.status_code == 200
+    primeira = r.json()
+    assert len(primeira["items"]) == 3 and primeira["next_cursor"]
+
+    r = await client.get("/atleta/cursor", params={"size": 3, "cursor": primeira["next_cursor"]})
+    assert r.status_code == 200
+    assert len(r.json()["items"]) == 2
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "a", "AA"])
+async def test_cursor_malformado_retorna_400(client, cursor):
+    r = await client.get("/atleta/cursor", params={"cursor": cursor})
+    assert r.status_code == 400
+    assert "Cursor de paginação inválido" in r.json()["detail"]
+
+
+def test_tabela_base_de_projecao_com_join():
+    query = consulta_projecao(CAMPOS_COMPACTOS)
+    assert query.get_final_froms()[0] is not AtletaModel.__table__  # JOIN com categorias e centros
+    assert _tabela_base(query).fullname == "atletas"
+    assert _tabela_base(select(AtletaModel)).fullname == "atletas"
+    assert _tabela_base(select(select(AtletaModel.pk_id).subquery())) is None
+
+
+@pytest.mark.parametrize("rota", ["/atleta/projecao", "/atleta/compacto"])
+async def test_total_estimado_em_listagem_com_join(client, rota):
+    await cria_atletas(client, 3)
+
+    r = await client.get(rota, params={"total_mode": "estimated", "fields": "nome,categoria,centro_treinamento"})
+
+    assert r.status_code == 200, r.text
+    # No PostgreSQL o total vem de pg_class.reltuples e pode ser só aproximado (ou 0 antes do ANALYZE)
+    assert r.json()["total"] is not None
+
+
+async def test_falha_ao_atualizar_total_em_cache_e_registrada(client, monkeypatch, caplog):
+    await cria_atletas(client, 2)
+    pagination._totais.clear()
+    r = await client.get("/atleta/", params={"total_mode": "cached"})
+    assert r.json()["total"] == 2
+
+    def sessao_indisponivel():
+        raise ConnectionError("banco fora do ar")
+
+    monkeypatch.setattr(settings, "LISTING_TOTAL_CACHE_TTL", 0)
+    monkeypatch.setattr(pagination, "async_session", sessao_indisponivel)
+    with caplog.at_level(logging.ERROR, logger=pagination.__name__):
+        r = await client.get("/atleta/", params={"total_mode": "cached"})
+        await asyncio.gather(*pagination._atualizacoes.values(), return_exceptions=True)
+
+    # O total anterior continua servido, e a falha da atualização em segundo plano fica no log
+    assert r.json()["total"] == 2
+    assert "Falha ao recalcular o total em cache" in caplog.text
+    assert "banco fora do ar" in caplog.text
@@ -0,0 +1,86 @@
+import pytest
+
+from tests.conftest import cria_atletas
+
+
+pytestmark = pytest.mark.anyio
+
+# Categorias e centros de treinamento compartilham a edição e a remoção (contrib/referencias.py)
+RECURSOS = [
+    pytest.param("/categorias", {"nome": "RX"}, "Scale", "categoria", id="categoria"),
+    pytest.param(
+        "/centro_treinamento",
+        {"nome": "CT Queen", "endereco": "Rua Y, 20", "proprietario": "Ana"},
+        "CT King",
+        "centro_treinamento",
+        id="centro_treinamento",
+    ),
+]
+
+
+async def _ids(client, url: str) -> dict[str, str]:
+    r = await client.get(f"{url}/", params={"limit": 10})
+    assert r.status_code == 200, r.text
+    return {item["nome"]: item["id"] for item in r.json()["items"]}
+
+
+@pytest.mark.parametrize("url, novo, existente, campo", RECURSOS)
+async def test_patch_com_nome_repetido_retorna_409(client, url, novo, existente, campo):
+    await cria_atletas(client, 0)
+    assert (await client.post(f"{url}/", json=novo)).status_code == 201
+    ids = await _ids(client, url)
+
+    r = await client.patch(f"{url}/{ids[novo['nome']]}", json={"nome": existente})
+
+    assert r.status_code == 409, r.text
+    assert f"com o nome '{existente}'" in r.json()["detail"]
+    # A sessão foi desfeita: a mesma requisição segue respondendo normalmente
+    r = await client.patch(f"{url}/{ids[novo['nome']]}", json={"nome": "Outro"})
+    assert r.status_code == 200, r.text
+
+
+@pytest.mark.parametrize("url, novo, existente, campo", RECURSOS)
+async def test_patch_com_nome_nulo_retorna_422(client, url, novo, existente, campo):
+    await cria_atletas(client, 0)
+    ids = await _ids(client, url)
+
+    r = await client.patch(f"{url}/{ids[existente]}", json={"nome": None})
+
+    assert r.status_code == 422, r.text
+
+
+@pytest.mark.parametrize("url, novo, existente, campo", RECURSOS)
+async def test_patch_com_versao_desatualizada_retorna_412(client, url, novo, existente, campo):
+    await cria_atletas(client, 0)
+    ids = await _ids(client, url)
+
+    r = await client.patch(f"{url}/{ids[existente]}", json={"nome": "Renomeado"}, headers={"If-Match": '"99"'})
+
+    assert r.status_code == 412, r.text
+    assert r.json()["detail"].endswith("Consulte-a novamente e reenvie a alteração." if campo == "categoria"
+                                       else "Consulte-o novamente e reenvie a alteração.")
+
+
+@pytest.mark.parametrize("url, novo, existente, campo", RECURSOS)
+async def test_delete_com_atletas_vinculados_retorna_409(client, url, novo, existente, campo):
+    await cria_atletas(client, 2)
+    ids = await _ids(client, url)
+
+    r = await client.delete(f"{url}/{ids[existente]}")
+
+    assert r.status_code == 409, r.text
+    assert "existem 2 atleta(s)" in r.json()["detail"]
+
+
+@pytest.mark.parametrize("url, novo, existente, campo", RECURSOS)
+async def test_delete_movendo_atletas_para_o_destino(client, url, novo, existente, campo):
+    await cria_atletas(client, 2)
+    assert (await client.post(f"{url}/", json=novo)).status_code == 201
+    ids = await _ids(client, url)
+
+    r = await client.delete(f"{url}/{ids[existente]}", params={"mover_atletas_para": ids[novo["nome"]]})
+
+    assert r.status_code == 204, r.text
+    assert (await client.get(f"{url}/{ids[existente]}")).status_code == 404
+    atletas = (await client.get("/atleta/", params={"limit": 10})).json()["items"]
+    assert [atleta[campo]["nome"] for atleta in atletas] == [novo["nome"]] * 2
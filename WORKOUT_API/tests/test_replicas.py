@@ -0,0 +1,84 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from workout_api.configs import database
+from workout_api.configs.database import get_read_session, read_sessionmaker
+
+
+pytestmark = pytest.mark.anyio
+
+
+#Duas réplicas SQLite: a 0 responde, a 1 aponta para um diretório inexistente
+@pytest.fixture
+async def replicas(monkeypatch):
+    diretorio = tempfile.mkdtemp(prefix="workout_api_replicas_")
+    urls = [
+        f"sqlite+aiosqlite:///{diretorio}/replica.sqlite",
+        f"sqlite+aiosqlite:///{os.path.join(diretorio, 'inexistente', 'replica.sqlite')}",
+    ]
+    engines = [database._create_engine(url) for url in urls]
+    for indice, replica in enumerate(engines):
+        event.listen(replica.sync_engine, "handle_error", database._marca_replica_indisponivel(indice))
+    monkeypatch.setattr(database, "replica_engines", engines)
+    monkeypatch.setattr(database, "replica_sessions", [
+        sessionmaker(replica, class_=AsyncSession, expire_on_commit=False) for replica in engines
+    ])
+    monkeypatch.setattr(database, "replica_saudavel", [True, True])
+    yield engines
+    for replica in engines:
+        await replica.dispose()
+
+
+def _request(headers: dict | None = None) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+    })
+
+
+async def test_verificacao_tira_do_rodizio_a_replica_que_nao_responde(replicas):
+    assert await database._verifica_replica(0) is True
+    assert await database._verifica_replica(1) is False
+
+
+async def test_leitura_usa_so_replicas_disponiveis_e_cai_para_o_primario(replicas):
+    database.replica_saudavel[1] = False
+    assert {read_sessionmaker() for _ in range(4)} == {database.replica_sessions[0]}
+
+    database.replica_saudavel[0] = False
+    assert read_sessionmaker() is database.async_session
+
+
+async def test_falha_de_conexao_marca_a_replica_indisponivel(replicas):
+    with pytest.raises(SQLAlchemyError):
+        async with replicas[1].connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await asyncio.sleep(0.05)  # Deixa a thread do aiosqlite da conexão recusada terminar antes de o loop fechar
+
+    assert database.replica_saudavel == [True, False]
+
+
+async def test_sessao_de_leitura_nao_sonda_a_replica(replicas):
+    database.replica_saudavel[1] = False
+    dependencia = get_read_session(_request())
+    session = await anext(dependencia)
+
+    assert session.bind is replicas[0]
+    assert replicas[0].pool.checkedout() == 0
+    await dependencia.aclose()
+
+
+async def test_read_your_writes_le_do_primario(replicas):
+    dependencia = get_read_session(_request({"X-Read-Primary": "true"}))
+    session = await anext(dependencia)
+
+    assert session.bind is database.engine
+    await dependencia.aclose()
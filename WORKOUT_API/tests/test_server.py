@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from workout_api import server
+from workout_api.configs.database import pool_por_worker
+from workout_api.configs.settings import settings
+
+
+def test_recusa_jobs_em_memoria_com_varios_workers(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 4)
+    monkeypatch.setattr(settings, "JOBS_BACKEND", "memory")
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: pytest.fail("não deveria subir"))
+
+    with pytest.raises(SystemExit, match="JOBS_BACKEND=memory"):
+        server.main()
+
+
+def test_jobs_em_memoria_com_um_worker(monkeypatch):
+    chamadas = []
+    monkeypatch.setenv("SERVER_WORKERS", "0")
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 1)
+    monkeypatch.setattr(settings, "JOBS_BACKEND", "memory")
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: chamadas.append(kwargs["workers"]))
+
+    server.main()
+
+    assert chamadas == [1]
+
+
+def test_pool_derivado_do_orcamento_de_conexoes(monkeypatch):
+    monkeypatch.setattr(settings, "DB_URL", "postgresql+asyncpg://u:p@db/workout")
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 90)
+    monkeypatch.setattr(settings, "JOBS_CONCURRENCY", 2)
+
+    # Por worker: 90 // workers, menos o pool dos jobs (2 + 2) e a conexão do LISTEN
+    assert pool_por_worker(1) == (20, 10)
+    assert pool_por_worker(4) == (11, 6)
+    assert pool_por_worker(8) == (4, 2)
+
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    assert pool_por_worker(4) == (11, 0)
+
+
+def test_lancador_repassa_o_numero_de_workers(monkeypatch):
+    chamadas = []
+    monkeypatch.setenv("SERVER_WORKERS", "0")
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 0)
+    monkeypatch.setattr(server, "cpus_disponiveis", lambda: 4)
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: chamadas.append(kwargs["workers"]))
+
+    server.main()
+
+    assert chamadas == [4]
+    assert os.environ["SERVER_WORKERS"] == "4"
+
+
+def test_recusa_workers_acima_do_orcamento_de_conexoes(monkeypatch):
+    monkeypatch.setattr(settings, "DB_URL", "postgresql+asyncpg://u:p@db/workout")
+    monkeypatch.setattr(settings, "SERVER_WORKERS", 16)
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 90)
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: pytest.fail("não deveria subir"))
+
+    with pytest.raises(SystemExit, match="DB_MAX_CONNECTIONS=90"):
+        server.main()
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from workout_api.alteracoes.feed import alteracoes_feed
+from workout_api.alteracoes.schemas import RecursoAlteracao
+from workout_api.configs.settings import settings
+
+
+router = APIRouter()
+
+#Transmite as alterações (criação, edição e remoção) de atletas, categorias e centros como Server-Sent Events
+@router.get(
+    "/stream",
+    summary="Acompanhar alterações (Server-Sent Events)",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_alteracoes(
+    desde: Optional[int] = Query(None, ge=0, description='Retoma após esta seq; sem ele, só as próximas alterações'),
+    recursos: Optional[list[RecursoAlteracao]] = Query(None, description='Filtra os tipos de registro (repetido)'),
+    last_event_id: Optional[str] = Header(None, description='Enviado pelo EventSource ao reconectar; tem prioridade sobre desde'),
+) -> StreamingResponse:
+    if not settings.ALTERACOES_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="O feed de alterações está desativado (ALTERACOES_ENABLED).",
+        )
+
+    if last_event_id:
+        try:
+            desde = int(last_event_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Last-Event-ID inválido: {last_event_id}",
+            )
+
+    # Falhas de banco viram erro HTTP aqui, antes de a resposta em streaming começar
+    await alteracoes_feed.inicia()
+    return StreamingResponse(
+        alteracoes_feed.eventos(desde, set(recursos) if recursos else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
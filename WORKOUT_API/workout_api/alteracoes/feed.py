@@ -0,0 +1,303 @@
+import asyncio
+import bisect
+import logging
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import AsyncIterator, Iterable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, event, func, insert, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+from workout_api.alteracoes.models import AlteracaoModel
+from workout_api.alteracoes.schemas import AlteracaoOut
+from workout_api.configs.database import async_session, query_stats
+from workout_api.configs.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+CANAL = "workout_alteracoes"
+LOTE_LEITURA = 500
+
+
+#Registra as alterações na transação da escrita (chamar depois do UPDATE/DELETE/INSERT e antes do commit).
+#itens: pares (id, version) dos registros afetados; a version é None quando não se aplica
+async def registra_alteracoes(
+    db_session: AsyncSession, recurso: str, acao: str, itens: Iterable[tuple[UUID, Optional[int]]]
+) -> None:
+    if not settings.ALTERACOES_ENABLED:
+        return
+    linhas = [
+        {"recurso": recurso, "acao": acao, "payload": {"id": str(id), "version": version}} for id, version in itens
+    ]
+    if not linhas:
+        return
+
+    await db_session.execute(insert(AlteracaoModel), linhas)
+    if settings.ALTERACOES_NOTIFY and db_session.get_bind().dialect.name == "postgresql":
+        # Entregue aos outros workers só no commit (e descartada no rollback)
+        await db_session.execute(text("SELECT pg_notify(:canal, '')"), {"canal": CANAL})
+    db_session.sync_session.info["alteracoes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apos_commit(session: Session) -> None:
+    # Acorda o feed deste worker sem esperar o próximo ciclo de consulta
+    if session.info.pop("alteracoes", False):
+        alteracoes_feed.sinaliza()
+
+
+@event.listens_for(Session, "after_rollback")
+def _apos_rollback(session: Session) -> None:
+    session.info.pop("alteracoes", None)
+
+
+class Evento(NamedTuple):
+    seq: int
+    recurso: str
+    mensagem: bytes
+
+
+def _evento(linha) -> Evento:
+    dados = AlteracaoOut(
+        seq=linha.pk_id,
+        recurso=linha.recurso,
+        acao=linha.acao,
+        id=linha.payload["id"],
+        version=linha.payload.get("version"),
+        criado_em=linha.criado_em,
+    ).model_dump_json()
+    # Formato text/event-stream: o id vira o Last-Event-ID da reconexão
+    return Evento(
+        linha.pk_id,
+        linha.recurso,
+        f"id: {linha.pk_id}\nevent: {linha.recurso}.{linha.acao}\ndata: {dados}\n\n".encode(),
+    )
+
+
+async def _consulta(depois_de: int, ate: Optional[int] = None) -> list[Evento]:
+    query = select(AlteracaoModel.__table__).where(AlteracaoModel.pk_id > depois_de)
+    if ate is not None:
+        query = query.where(AlteracaoModel.pk_id <= ate)
+    async with async_session() as db_session:
+        linhas = (await db_session.execute(query.order_by(AlteracaoModel.pk_id).limit(LOTE_LEITURA))).all()
+    return [_evento(linha) for linha in linhas]
+
+
+#Prefixo dos eventos que seguem a sequência sem lacunas a partir de esperado
+def _em_sequencia(eventos: list[Evento], esperado: int) -> list[Evento]:
+    for posicao, evento in enumerate(eventos):
+        if evento.seq != esperado + posicao:
+            return eventos[:posicao]
+    return eventos
+
+
+#Remove as alterações fora do período de retenção; devolve quantas foram removidas
+async def limpa_alteracoes() -> int:
+    corte = datetime.now() - timedelta(days=settings.ALTERACOES_RETENCAO_DIAS)
+    async with async_session() as db_session:
+        resultado = await db_session.execute(
+            delete(AlteracaoModel)
+            .where(AlteracaoModel.criado_em < corte)
+            .execution_options(synchronize_session=False)
+        )
+        await db_session.commit()
+    return resultado.rowcount
+
+
+# --- Distribuição das alterações para os consumidores SSE deste worker ---
+class FeedAlteracoes:
+    """Uma única tarefa por worker lê a tabela alteracoes (acordada pelo commit local, por NOTIFY ou a cada
+    ALTERACOES_POLL_INTERVAL), serializa cada evento uma vez e guarda os recentes em memória. Os consumidores
+    leem desse buffer e só consultam o banco quando retomam de um cursor mais antigo que ele."""
+
+    def __init__(self) -> None:
+        self.ultimo = 0  # Maior seq já publicada; tudo até ela foi entregue ao buffer (ou pulado como lacuna)
+        self.total_eventos = 0
+        self.lacunas_puladas = 0
+        self.assinantes = 0
+        self._base = 0  # O buffer tem todos os eventos com seq em (_base, ultimo]
+        self._buffer: list[Evento] = []
+        self._lacuna: Optional[tuple[int, float]] = None
+        self._sinal = asyncio.Event()
+        # Um Event por consumidor, limpo por ele mesmo antes de esperar: um set()/clear() compartilhado perde o
+        # aviso para quem ainda não começou a esperar (no Python 3.10/3.11 o wait_for roda a espera em outra tarefa)
+        self._novidades: set[asyncio.Event] = set()
+        self._tarefa: Optional[asyncio.Task] = None
+        self._limpeza: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def sinaliza(self) -> None:
+        if self._tarefa is not None:
+            self._sinal.set()
+
+    #Garante a tarefa de leitura rodando; a primeira chamada parte do fim atual da sequência
+    async def inicia(self) -> None:
+        async with self._lock:
+            if self._tarefa is not None:
+                return
+            async with async_session() as db_session:
+                ultimo = (await db_session.execute(select(func.max(AlteracaoModel.pk_id)))).scalar() or 0
+            self.ultimo = self._base = ultimo
+            self._buffer = []
+            self._lacuna = None
+            self._tarefa = asyncio.create_task(self._executa())
+
+    async def stop(self) -> None:
+        tarefas = [tarefa for tarefa in (self._tarefa, self._limpeza) if tarefa is not None]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        self._limpeza = None
+
+    #Inicia a remoção periódica das alterações antigas (ALTERACOES_RETENCAO_DIAS=0 mantém todas)
+    def inicia_limpeza(self) -> None:
+        if settings.ALTERACOES_ENABLED and settings.ALTERACOES_RETENCAO_DIAS > 0 and self._limpeza is None:
+            self._limpeza = asyncio.create_task(self._limpa_periodicamente())
+
+    async def _limpa_periodicamente(self) -> None:
+        query_stats.set(None)
+        while True:
+            try:
+                removidas = await limpa_alteracoes()
+                if removidas:
+                    logger.info("%d alterações fora da retenção removidas", removidas)
+            except Exception:
+                logger.exception("Falha ao remover as alterações antigas")
+            await asyncio.sleep(settings.ALTERACOES_LIMPEZA_INTERVAL)
+
+    async def _escuta(self):
+        # LISTEN em uma conexão própria do asyncpg, fora dos pools (ela fica ociosa esperando notificações)
+        if not settings.ALTERACOES_NOTIFY or not settings.DB_URL.startswith("postgresql+asyncpg"):
+            return None
+        import asyncpg
+
+        try:
+            url = make_url(settings.DB_URL).set(drivername="postgresql")
+            conexao = await asyncpg.connect(url.render_as_string(hide_password=False))
+            await conexao.add_listener(CANAL, lambda *args: self._sinal.set())
+            return conexao
+        except Exception as e:
+            logger.warning("LISTEN %s indisponível, o feed segue só por consulta periódica: %s", CANAL, e)
+            return None
+
+    async def _executa(self) -> None:
+        # A tarefa herda o contexto da requisição que a criou: suas consultas não entram no Server-Timing dela
+        query_stats.set(None)
+        conexao = None
+        try:
+            conexao = await self._escuta()
+            # Para quando o último consumidor sai; o próximo reinicia a partir do fim da sequência
+            while self.assinantes:
+                self._sinal.clear()
+                try:
+                    if await self._busca():
+                        continue
+                except Exception:
+                    logger.exception("Falha ao ler o feed de alterações")
+                try:
+                    await asyncio.wait_for(self._sinal.wait(), settings.ALTERACOES_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Sem await antes desta linha: um consumidor que chegue agora já encontra a tarefa parada e a reinicia
+            self._tarefa = None
+            if conexao is not None:
+                await conexao.close()
+
+    async def _busca(self) -> bool:
+        novos = await _consulta(self.ultimo)
+        publicados = _em_sequencia(novos, self.ultimo + 1)
+        self._publica(publicados)
+        if len(publicados) == len(novos):
+            # Página cheia: há mais para ler sem esperar
+            return len(novos) == LOTE_LEITURA
+
+        # Lacuna em ultimo + 1: uma transação com seq menor ainda não fez commit (ou foi desfeita, e o número nunca aparece)
+        agora = monotonic()
+        if self._lacuna is None or self._lacuna[0] != self.ultimo + 1:
+            self._lacuna = (self.ultimo + 1, agora)
+        if agora - self._lacuna[1] < settings.ALTERACOES_GAP_TIMEOUT:
+            return False
+
+        # Antes de pular, relê a faixa do banco: um commit feito depois da leitura acima ainda sai em ordem.
+        # Uma transação que só confirme depois disso não é entregue (ver ALTERACOES_GAP_TIMEOUT no README)
+        novos = await _consulta(self.ultimo)
+        if novos and novos[0].seq != self.ultimo + 1:
+            self.lacunas_puladas += novos[0].seq - self.ultimo - 1
+            logger.warning(
+                "Feed de alterações: seq %d a %d sem commit após %ss, considerada desfeita",
+                self.ultimo + 1, novos[0].seq - 1, settings.ALTERACOES_GAP_TIMEOUT,
+            )
+        if novos:
+            self._publica(_em_sequencia(novos, novos[0].seq))
+        return True
+
+    def _publica(self, publicados: list[Evento]) -> None:
+        if not publicados:
+            return
+        self._buffer.extend(publicados)
+        self.ultimo = publicados[-1].seq
+        self.total_eventos += len(publicados)
+        if len(self._buffer) > 2 * settings.ALTERACOES_BUFFER:
+            # Corta em blocos (e não a cada evento) para manter o buffer como lista, com busca binária por seq
+            corte = len(self._buffer) - settings.ALTERACOES_BUFFER
+            self._base = self._buffer[corte - 1].seq
+            del self._buffer[:corte]
+        for novidade in self._novidades:
+            novidade.set()
+
+    #Eventos SSE a partir do cursor (None = só as próximas alterações)
+    async def eventos(self, desde: Optional[int], recursos: Optional[set[str]] = None) -> AsyncIterator[bytes]:
+        self.assinantes += 1
+        novidade = asyncio.Event()
+        self._novidades.add(novidade)
+        try:
+            # A tarefa pode ter parado entre o inicia() da rota e a entrada deste consumidor
+            await self.inicia()
+            cursor = self.ultimo if desde is None else desde
+            yield f"retry: 3000\n: cursor {cursor}\n\n".encode()
+            while True:
+                if cursor >= self.ultimo:
+                    # Limpa junto com a verificação (sem await entre elas): uma publicação depois daqui deixa o evento ligado
+                    novidade.clear()
+                    try:
+                        await asyncio.wait_for(novidade.wait(), settings.ALTERACOES_HEARTBEAT)
+                    except asyncio.TimeoutError:
+                        # Comentário SSE: mantém a conexão viva em proxies sem gerar evento no cliente
+                        yield b": ping\n\n"
+                    continue
+
+                ate = self.ultimo
+                if cursor >= self._base:
+                    inicio = bisect.bisect_right(self._buffer, cursor, key=lambda evento: evento.seq)
+                    pendentes = [evento for evento in self._buffer[inicio:] if evento.seq <= ate]
+                    proximo = ate
+                else:
+                    # Cursor anterior ao buffer (reconexão após muito tempo): lê do banco em páginas
+                    pendentes = await _consulta(cursor, ate)
+                    proximo = pendentes[-1].seq if len(pendentes) == LOTE_LEITURA else ate
+
+                for evento in pendentes:
+                    if recursos is None or evento.recurso in recursos:
+                        yield evento.mensagem
+                cursor = proximo
+        finally:
+            self._novidades.discard(novidade)
+            self.assinantes -= 1
+            self.sinaliza()
+
+    def stats(self) -> dict:
+        return {
+            "assinantes": self.assinantes,
+            "eventos": self.total_eventos,
+            "lacunas": self.lacunas_puladas,
+            "ultimo": self.ultimo,
+        }
+
+
+alteracoes_feed = FeedAlteracoes()
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from workout_api.contrib.models import Base
+
+
+# --- Registro das alterações de atletas, categorias e centros (ver migração f6c8e0a2b4d7) ---
+# Base sem id/version: as linhas só são inseridas e removidas pela retenção, nunca editadas
+class AlteracaoModel(Base):
+    __tablename__ = 'alteracoes'
+    __table_args__ = (
+        # Remoção das alterações fora do período de retenção (ALTERACOES_RETENCAO_DIAS)
+        Index('ix_alteracoes_criado_em', 'criado_em'),
+        # No SQLite, AUTOINCREMENT impede que a sequência reutilize números (inclusive após a limpeza)
+        {'sqlite_autoincrement': True},
+    )
+
+    # Sequência crescente: é o cursor (Last-Event-ID) dos consumidores do feed
+    pk_id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True)
+    recurso: Mapped[str] = mapped_column(String(20), nullable=False)
+    acao: Mapped[str] = mapped_column(String(10), nullable=False)
+    # id e version do registro alterado
+    payload: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, 'postgresql'), nullable=False)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
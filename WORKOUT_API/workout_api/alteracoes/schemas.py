@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Annotated, Literal, Optional
+
+from pydantic import UUID4, Field
+
+from workout_api.contrib.schemas import BaseSchema
+
+
+RecursoAlteracao = Literal['atleta', 'categoria', 'centro_treinamento']
+AcaoAlteracao = Literal['criado', 'alterado', 'removido']
+
+
+# --- Schema de Saída (campo data de cada evento do feed) ---
+class AlteracaoOut(BaseSchema):
+    seq: Annotated[int, Field(description='Posição na sequência de alterações (id do evento SSE)', example=1042)]
+    recurso: Annotated[RecursoAlteracao, Field(description='Tipo do registro alterado', example='atleta')]
+    acao: Annotated[AcaoAlteracao, Field(description='O que aconteceu com o registro', example='alterado')]
+    id: Annotated[UUID4, Field(description='Identificador do registro alterado')]
+    version: Annotated[Optional[int], Field(None, description='Versão do registro após a alteração (ETag do GET)', example=3)]
+    criado_em: Annotated[datetime, Field(description='Data da alteração')]
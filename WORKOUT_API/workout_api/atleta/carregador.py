@@ -0,0 +1,125 @@
+import asyncio
+from typing import Optional
+
+from pydantic import UUID4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from workout_api.atleta.filtros import condicao_ids
+from workout_api.atleta.models import AtletaModel
+from workout_api.atleta.schemas import AtletaOut
+from workout_api.configs.settings import settings
+from workout_api.contrib.http_cache import version_etag
+from workout_api.contrib.object_cache import CachedObject
+
+
+#Representação serializada do GET /atleta/{id} (corpo + ETag com as versões de atleta, categoria e centro)
+def representacao(atleta: AtletaModel) -> CachedObject:
+    return CachedObject(
+        AtletaOut.model_validate(atleta).model_dump_json().encode(),
+        version_etag(atleta.version, atleta.categoria.version, atleta.centro_treinamento.version),
+    )
+
+
+#Busca vários atletas em uma consulta (id = ANY(:ids) no PostgreSQL); categoria/centro vêm pelo selectin, uma vez por lote
+async def consulta_atletas(db_session: AsyncSession, ids) -> dict[UUID4, CachedObject]:
+    query = select(AtletaModel).where(condicao_ids(list(ids), db_session.get_bind().dialect.name))
+    atletas = (await db_session.execute(query)).scalars().all()
+    return {atleta.id: representacao(atleta) for atleta in atletas}
+
+
+def _futuro() -> asyncio.Future:
+    futuro = asyncio.get_running_loop().create_future()
+    # Evita o aviso de exceção não lida quando o lote falha e ninguém mais está esperando
+    futuro.add_done_callback(lambda f: f.cancelled() or f.exception())
+    return futuro
+
+
+class _Lote:
+    def __init__(self) -> None:
+        self.futuros: dict[UUID4, asyncio.Future] = {}
+        self.cheio = asyncio.Event()
+
+
+# --- Agrupamento (DataLoader) das consultas de atleta por ID que chegam juntas no mesmo worker ---
+class AtletaLoader:
+    """A primeira requisição de uma janela vira líder: espera ID_BATCH_WINDOW_MS (ou o lote encher),
+    faz uma única consulta com a própria sessão e entrega o resultado às demais, que não usam conexão."""
+
+    def __init__(self) -> None:
+        # Um lote aberto por engine: leituras no primário (read-your-writes) não se misturam com as da réplica
+        self._abertos: dict[object, _Lote] = {}
+        self.lotes = 0
+        self.ids_agrupados = 0
+
+    def _fecha(self, chave: object, lote: _Lote) -> None:
+        if self._abertos.get(chave) is lote:
+            del self._abertos[chave]
+        lote.cheio.set()
+
+    async def _executa(self, db_session: AsyncSession, chave: object, lote: _Lote) -> None:
+        try:
+            try:
+                await asyncio.wait_for(lote.cheio.wait(), settings.ID_BATCH_WINDOW_MS / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._fecha(chave, lote)
+            encontrados = await consulta_atletas(db_session, lote.futuros)
+        except BaseException as e:
+            self._fecha(chave, lote)
+            for futuro in lote.futuros.values():
+                if futuro.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    futuro.cancel()
+                else:
+                    futuro.set_exception(e)
+            raise
+
+        self.lotes += 1
+        self.ids_agrupados += len(lote.futuros)
+        for id, futuro in lote.futuros.items():
+            futuro.set_result(encontrados.get(id))
+
+    #Carrega vários atletas pelo ID (None para os inexistentes), juntando-se ao lote aberto se houver
+    async def load_many(self, db_session: AsyncSession, ids: list) -> dict[UUID4, Optional[CachedObject]]:
+        if not settings.ID_BATCH_ENABLED:
+            encontrados = await consulta_atletas(db_session, ids)
+            return {id: encontrados.get(id) for id in ids}
+
+        chave = db_session.bind
+        lote = self._abertos.get(chave)
+        lider = lote is None
+        if lider:
+            lote = self._abertos[chave] = _Lote()
+
+        futuros = {}
+        for id in ids:
+            if id not in lote.futuros:
+                lote.futuros[id] = _futuro()
+            futuros[id] = lote.futuros[id]
+        if len(lote.futuros) >= settings.ID_BATCH_MAX_SIZE:
+            self._fecha(chave, lote)
+
+        if lider:
+            await self._executa(db_session, chave, lote)
+
+        resultado = {}
+        for id, futuro in futuros.items():
+            try:
+                resultado[id] = await asyncio.shield(futuro)
+            except asyncio.CancelledError:
+                if not futuro.cancelled():
+                    raise
+                # O líder foi cancelado (ex: cliente desconectou): consulta com a própria sessão
+                return await self.load_many(db_session, ids)
+        return resultado
+
+    async def load(self, db_session: AsyncSession, id: UUID4) -> Optional[CachedObject]:
+        return (await self.load_many(db_session, [id]))[id]
+
+    def stats(self) -> dict:
+        return {"lotes": self.lotes, "ids_agrupados": self.ids_agrupados}
+
+
+atleta_loader = AtletaLoader()
@@ -1,20 +1,106 @@
 from datetime import datetime
+from typing import Literal, Optional
 from uuid import uuid4
-from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import LimitOffsetPage, paginate, LimitOffsetParams 
-from fastapi_pagination.ext.sqlalchemy import paginate
 from pydantic import UUID4
+from sqlalchemy import delete, insert, join, literal, true, update
 from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError # Importa IntegrityError para tratamento de erros específico
 
+from workout_api.alteracoes.feed import registra_alteracoes
 from workout_api.centro_treinamento.models import CentroTreinamentoModel
 from workout_api.categorias.models import CategoriaModel
 from workout_api.atleta.models import AtletaModel
-from workout_api.atleta.schemas import AtletaIn, AtletaOut, AtletaUpdate 
-from workout_api.contrib.dependencies import DatabaseDependency
+from workout_api.atleta.carregador import atleta_loader
+from workout_api.atleta.projecao import CAMPOS_COMPACTOS, consulta_projecao, linha_para_dict, pagina_compacta, parse_campos
+from workout_api.atleta.exportacao import exporta
+from workout_api.atleta.filtros import AtletaFiltros, aplica_filtros, condicao_ids, condicoes_filtros
+from workout_api.atleta.importacao import TAMANHO_LOTE, importar_lote, iter_registros
+from workout_api.atleta import tarefas  # noqa: F401 (registra as tarefas de atleta na fila de jobs)
+from workout_api.atleta.schemas import (
+    MAX_IDS_BATCH, AtletaBatchOut, AtletaIn, AtletaLoteIn, AtletaLoteUpdate, AtletaOut, AtletaPaginaCompacta, AtletaUpdate,
+    ImportacaoOut, LoteOut, ResultadoLote
+)
+from workout_api.contrib.cache import categoria_cache, centro_treinamento_cache, resolve_pk_id
+from workout_api.contrib.dependencies import DatabaseDependency, ReadDatabaseDependency, ReadPrimaryDependency
+from workout_api.contrib.http_cache import parse_if_match, version_etag
+from workout_api.contrib.object_cache import atleta_object_cache, cached_object, cached_objects
+from workout_api.contrib.responses import FastJSONResponse, trusted_response
+from workout_api.contrib.pagination import CursorPage, CursorParams, ListingParams, cursor_paginate, listing_total, paginate_listing
+from workout_api.jobs.fila import job_aceito, job_queue
+from workout_api.jobs.schemas import JobOut
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
+
+#Troca os nomes de categoria/centro de treinamento de uma alteração pelos pk_id (cache antes do banco)
+async def _resolve_referencias(db_session: AsyncSession, update_data: dict) -> None:
+    # Lida com a atualização de categoria
+    if "categoria" in update_data:
+        categoria_data = update_data.pop("categoria")
+        categoria_nome = categoria_data.get("nome") 
+        
+        # Verifica se o nome foi realmente fornecido dentro do objeto categoria
+        if not categoria_nome:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nome da categoria não fornecido para alteração."
+            )
+        
+        #Verifica se a categoria existe, se não retorna o Erro
+        categoria_pk = await resolve_pk_id(db_session, CategoriaModel, categoria_cache, categoria_nome)
+        if categoria_pk is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A nova categoria '{categoria_nome}' não foi encontrada.",
+            )
+        update_data["categoria_id"] = categoria_pk # Atualiza a chave estrangeira
+    
+    # Lida com a atualização de centro_treinamento
+    if "centro_treinamento" in update_data:
+        centro_treinamento_data = update_data.pop("centro_treinamento")
+        centro_treinamento_nome = centro_treinamento_data.get("nome")
+        
+        #Boloco de validação de Erro
+        if not centro_treinamento_nome:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nome do centro de treinamento não fornecido para alteração."
+            )
+
+        centro_treinamento_pk = await resolve_pk_id(
+            db_session, CentroTreinamentoModel, centro_treinamento_cache, centro_treinamento_nome
+        )
+        if centro_treinamento_pk is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"O novo centro de treinamento '{centro_treinamento_nome}' não foi encontrado.",
+            )
+        update_data["centro_treinamento_id"] = centro_treinamento_pk # Atualiza a chave estrangeira
+
+#Identifica a constraint de atletas violada: 'cpf', 'categoria_id', 'centro_treinamento_id', 'foreign_key'
+#(FK sem nome, como no SQLite) ou None
+def _constraint_violada(e: IntegrityError) -> Optional[str]:
+    # asyncpg guarda o nome na exceção original (__cause__); psycopg, em diag
+    nome = getattr(e.orig.__cause__, "constraint_name", None) or getattr(
+        getattr(e.orig, "diag", None), "constraint_name", None
+    )
+    if nome:
+        # Nomes padrão do PostgreSQL: atletas_cpf_key, atletas_categoria_id_fkey, atletas_centro_treinamento_id_fkey
+        for coluna in ("cpf", "categoria_id", "centro_treinamento_id"):
+            if nome.startswith(f"atletas_{coluna}_"):
+                return coluna
+        return None
+
+    mensagem = str(e.orig).lower()
+    if "atletas.cpf" in mensagem:
+        return "cpf"
+    if "foreign key" in mensagem:
+        return "foreign_key"
+    return None
 
 #Cria dados de novos atletas
 @router.post(
@@ -28,75 +114,245 @@ async def post(db_session: DatabaseDependency, atleta_in: AtletaIn = Body(...))
     categoria_nome = atleta_in.categoria.nome
     centro_treinamento_nome = atleta_in.centro_treinamento.nome
 
-    # 2. Busque a categoria pelo nome
-    categoria = (
-        await db_session.execute(
-            select(CategoriaModel).filter_by(nome=categoria_nome)
-        )
-    ).scalars().first()
+    # 2. Monte os valores do atleta (o CPF único é garantido pela constraint do banco)
+    valores = {
+        "id": uuid4(),
+        "created_at": datetime.now(),
+        # Exclui os objetos aninhados do dump
+        **atleta_in.model_dump(exclude={"categoria", "centro_treinamento"}),
+    }
+
+    # 3. Usa os pk_id do cache quando disponíveis; o que faltar é resolvido pelo próprio INSERT ... SELECT
+    categoria_pk = categoria_cache.get(categoria_nome)
+    centro_treinamento_pk = centro_treinamento_cache.get(centro_treinamento_nome)
+
+    colunas = AtletaModel.__table__.c
+    origem = select(
+        *(literal(valor, colunas[nome].type) for nome, valor in valores.items()),
+        CategoriaModel.pk_id if categoria_pk is None else literal(categoria_pk, colunas.categoria_id.type),
+        CentroTreinamentoModel.pk_id if centro_treinamento_pk is None else literal(centro_treinamento_pk, colunas.centro_treinamento_id.type),
+    )
+    if categoria_pk is None:
+        origem = origem.where(CategoriaModel.nome == categoria_nome)
+    if centro_treinamento_pk is None:
+        origem = origem.where(CentroTreinamentoModel.nome == centro_treinamento_nome)
+    if categoria_pk is None and centro_treinamento_pk is None:
+        # Cada nome é único, então o produto cruzado tem no máximo uma linha
+        origem = origem.select_from(join(CategoriaModel, CentroTreinamentoModel, true()))
 
-    if not categoria:
+    stmt = (
+        insert(AtletaModel)
+        .from_select([*valores, "categoria_id", "centro_treinamento_id"], origem)
+        .returning(AtletaModel.categoria_id, AtletaModel.centro_treinamento_id)
+    )
+
+    try:
+        inserido = (await db_session.execute(stmt)).first()
+        if inserido is not None:
+            await registra_alteracoes(db_session, "atleta", "criado", [(valores["id"], 1)])
+        await db_session.commit()
+    except IntegrityError as e: # Captura erros de integridade (como CPF único)
+        await db_session.rollback()
+        if "foreign key" not in str(e.orig).lower():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, 
+                detail=f"Já existe um atleta cadastrado com o CPF: {atleta_in.cpf}"
+            )
+        # pk_id em cache não existe mais (removido por outro processo): descarta e diagnostica abaixo
+        categoria_cache.invalidate(categoria_nome)
+        centro_treinamento_cache.invalidate(centro_treinamento_nome)
+        inserido = None
+    except Exception as e: # Captura outros erros inesperados
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"A categoria '{categoria_nome}' não foi encontrada.",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ocorreu um erro interno inesperado ao criar o atleta: {e}",
         )
 
-    # 3. Busque o centro de treinamento pelo nome
-    centro_treinamento = (
-        await db_session.execute(
-            select(CentroTreinamentoModel).filter_by(nome=centro_treinamento_nome)
-        )
-    ).scalars().first()
+    # 4. Nenhuma linha inserida: a categoria ou o centro de treinamento não existe
+    if inserido is None:
+        categoria_existe, centro_treinamento_existe = (
+            await db_session.execute(
+                select(
+                    select(CategoriaModel.pk_id).filter_by(nome=categoria_nome).exists(),
+                    select(CentroTreinamentoModel.pk_id).filter_by(nome=centro_treinamento_nome).exists(),
+                )
+            )
+        ).one()
 
-    if not centro_treinamento:
+        if not categoria_existe:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A categoria '{categoria_nome}' não foi encontrada.",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"O centro de treinamento '{centro_treinamento_nome}' não foi encontrado.",
         )
-    
-    # 4. Verifique se o CPF já existe
-    atleta_existente = (
-        await db_session.execute(
-            select(AtletaModel).filter_by(cpf=atleta_in.cpf)
-        )
-    ).scalars().first()
 
-    if atleta_existente:
+    categoria_cache.set(categoria_nome, inserido.categoria_id)
+    centro_treinamento_cache.set(centro_treinamento_nome, inserido.centro_treinamento_id)
+
+    # 5. Retorne o AtletaOut a partir dos dados já conhecidos, sem reler a linha do banco
+    return AtletaOut(
+        **valores,
+        categoria=atleta_in.categoria,
+        centro_treinamento=atleta_in.centro_treinamento,
+    )
+
+#Importa atletas em lote a partir de um corpo NDJSON ou CSV enviado em streaming
+@router.post(
+    "/importar",
+    summary="Importar Atletas em lote (NDJSON ou CSV)",
+    status_code=status.HTTP_200_OK,
+    response_model=ImportacaoOut,
+)
+async def importar_atletas(request: Request, db_session: DatabaseDependency) -> ImportacaoOut:
+    content_type = request.headers.get("content-type", "")
+    formato = "csv" if "csv" in content_type else "ndjson"
+
+    relatorio = ImportacaoOut()
+    lote = []
+    # Processa o corpo em lotes de tamanho fixo para manter a memória limitada
+    async for numero, registro in iter_registros(request.stream(), formato):
+        lote.append((numero, registro))
+        if len(lote) >= TAMANHO_LOTE:
+            await importar_lote(db_session, lote, relatorio)
+            lote = []
+
+    if lote:
+        await importar_lote(db_session, lote, relatorio)
+
+    return relatorio
+
+#Seleção das operações em lote: lista de IDs e/ou filtros de query (ao menos um é obrigatório)
+def _condicoes_lote(db_session: AsyncSession, lote: Optional[AtletaLoteIn], filtros: AtletaFiltros) -> list:
+    condicoes = condicoes_filtros(filtros)
+    if lote is not None and lote.ids is not None:
+        condicoes.append(condicao_ids(lote.ids, db_session.get_bind().dialect.name))
+
+    if not condicoes:
         raise HTTPException(
-            status_code=status.HTTP_303_SEE_OTHER, # Ou HTTP_409_CONFLICT
-            detail=f"Já existe um atleta cadastrado com o CPF: {atleta_in.cpf}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe a lista de ids ou ao menos um filtro para a operação em lote.",
         )
+    return condicoes
 
-    try:
-        # 5. Crie a instância do modelo Atleta
-        atleta_model = AtletaModel(
-            id=uuid4(),
-            created_at=datetime.now(),
-            # Exclui os objetos aninhados do dump
-            **atleta_in.model_dump(exclude={"categoria", "centro_treinamento"})
-        )
-        
-        # Atribui os IDs das chaves estrangeiras (pk_id do SQLAlchemy)
-        atleta_model.categoria_id = categoria.pk_id
-        atleta_model.centro_treinamento_id = centro_treinamento.pk_id
 
-        db_session.add(atleta_model)
-        await db_session.commit()
-        await db_session.refresh(atleta_model) # REFRESH: Garante que o modelo tem os dados mais recentes do DB
+def _resultado_lote(afetados: list, lote: Optional[AtletaLoteIn], status_afetado: str) -> LoteOut:
+    # Com lista de IDs, responde na ordem pedida e marca os que não foram encontrados (ou não passaram nos filtros)
+    if lote is None or lote.ids is None:
+        resultados = [ResultadoLote(id=id, status=status_afetado) for id in afetados]
+    else:
+        afetados = set(afetados)
+        resultados = [
+            ResultadoLote(id=id, status=status_afetado if id in afetados else "nao_encontrado")
+            for id in dict.fromkeys(lote.ids)
+        ]
+    return LoteOut(total=len(afetados), resultados=resultados)
 
-        # 6. Retorne o AtletaOut validando a instância do modelo, que agora tem todos os dados
-        return AtletaOut.model_validate(atleta_model)
 
-    except IntegrityError: # Captura erros de integridade (como CPF único)
+#Envia a operação em lote para a fila de jobs (a seleção é guardada como JSON e refeita pelo job em blocos)
+async def _enfileira_lote(tipo: str, lote: Optional[AtletaLoteIn], filtros: AtletaFiltros, **parametros):
+    job = await job_queue.enfileira(
+        tipo,
+        {
+            "ids": None if lote is None or lote.ids is None else [str(id) for id in lote.ids],
+            "filtros": filtros.model_dump(mode="json", exclude_defaults=True),
+            **parametros,
+        },
+    )
+    return job_aceito(job)
+
+#Atualiza vários atletas com um único UPDATE em lote (ex: mover um time inteiro de categoria)
+@router.patch(
+    "/lote",
+    summary="Editar Atletas em lote",
+    status_code=status.HTTP_200_OK,
+    response_model=LoteOut,
+    responses={202: {"model": JobOut, "description": "Enviado para a fila (assincrono=true)"}},
+)
+async def patch_atletas_lote(
+    db_session: DatabaseDependency,
+    lote: AtletaLoteUpdate = Body(...),
+    filtros: AtletaFiltros = Depends(),
+    assincrono: bool = Query(False, description='Executa em segundo plano e responde 202 com o job'),
+) -> LoteOut:
+    condicoes = _condicoes_lote(db_session, lote, filtros)
+
+    update_data = lote.alteracoes.model_dump(exclude_unset=True)
+    if not update_data:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, 
-            detail=f"Já existe um atleta cadastrado com o CPF: {atleta_in.cpf}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhuma alteração informada para os atletas.",
         )
-    except Exception as e: # Captura outros erros inesperados
+    await _resolve_referencias(db_session, update_data)
+    if assincrono:
+        return await _enfileira_lote("atletas.lote.atualizar", lote, filtros, alteracoes=update_data)
+
+    stmt = (
+        update(AtletaModel)
+        .where(*condicoes)
+        .values(**update_data, version=AtletaModel.version + 1)
+        .returning(AtletaModel.id, AtletaModel.version)
+        .execution_options(synchronize_session=False)
+    )
+
+    try:
+        linhas = (await db_session.execute(stmt)).all()
+        await registra_alteracoes(db_session, "atleta", "alterado", linhas)
+        await db_session.commit()
+    except IntegrityError as e:
+        await db_session.rollback()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ocorreu um erro interno inesperado ao criar o atleta: {e}",
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Erro de integridade ao editar os atletas: {e.orig}",
         )
+    atualizados = [linha.id for linha in linhas]
+    await atleta_object_cache.invalidate(*atualizados)
+
+    return _resultado_lote(atualizados, lote, "atualizado")
+
+#Deleta vários atletas com um único DELETE em lote
+@router.delete(
+    "/lote",
+    summary="Deletar Atletas em lote",
+    status_code=status.HTTP_200_OK,
+    response_model=LoteOut,
+    responses={202: {"model": JobOut, "description": "Enviado para a fila (assincrono=true)"}},
+)
+async def delete_atletas_lote(
+    db_session: DatabaseDependency,
+    lote: Optional[AtletaLoteIn] = Body(None),
+    filtros: AtletaFiltros = Depends(),
+    assincrono: bool = Query(False, description='Executa em segundo plano e responde 202 com o job'),
+) -> LoteOut:
+    condicoes = _condicoes_lote(db_session, lote, filtros)
+    if assincrono:
+        return await _enfileira_lote("atletas.lote.remover", lote, filtros)
+
+    stmt = (
+        delete(AtletaModel)
+        .where(*condicoes)
+        .returning(AtletaModel.id, AtletaModel.version)
+        .execution_options(synchronize_session=False)
+    )
+    linhas = (await db_session.execute(stmt)).all()
+    await registra_alteracoes(db_session, "atleta", "removido", linhas)
+    await db_session.commit()
+    removidos = [linha.id for linha in linhas]
+    await atleta_object_cache.invalidate(*removidos)
+
+    return _resultado_lote(removidos, lote, "removido")
+
+#Reconstrói a tabela-resumo das estatísticas em segundo plano (ex: após carga direta no banco, sem os triggers)
+@router.post(
+    "/estatisticas/recalcular",
+    summary="Recalcular estatísticas dos Atletas",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobOut,
+)
+async def recalcular_estatisticas() -> JobOut:
+    return job_aceito(await job_queue.enfileira("estatisticas.recalcular", {}))
 
 #Consulta Geral do Banco de dados
 @router.get(
@@ -105,34 +361,143 @@ async def post(db_session: DatabaseDependency, atleta_in: AtletaIn = Body(...))
     status_code=status.HTTP_200_OK,
     response_model=LimitOffsetPage[AtletaOut],
 )
-async def query_all_atletas(db_session: DatabaseDependency, params: LimitOffsetParams = Depends()
+async def query_all_atletas(
+    db_session: ReadDatabaseDependency, params: ListingParams = Depends(), filtros: AtletaFiltros = Depends()
 ) -> LimitOffsetPage[AtletaOut]:
-    query = select(AtletaModel)
+    query = aplica_filtros(select(AtletaModel), filtros)
+
+    return trusted_response(
+        await paginate_listing(db_session, query, params), response_model=LimitOffsetPage[AtletaOut]
+    )
+
+#Consulta Geral paginada por cursor (keyset), sem OFFSET e com contagem opcional
+@router.get(
+    "/cursor",
+    summary="Consultar todos os Atletas (paginação por cursor)",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[AtletaOut],
+)
+async def query_all_atletas_cursor(
+    db_session: ReadDatabaseDependency, params: CursorParams = Depends(), filtros: AtletaFiltros = Depends()
+) -> CursorPage[AtletaOut]:
+    query = aplica_filtros(select(AtletaModel), filtros)
+
+    return await cursor_paginate(db_session, query, params)
+
+#Consulta enxuta: só as colunas pedidas, em uma única consulta com JOIN e sem hidratar objetos do ORM
+@router.get(
+    "/projecao",
+    summary="Consultar Atletas (projeção enxuta de campos)",
+    status_code=status.HTTP_200_OK,
+    response_class=FastJSONResponse,
+)
+async def query_atletas_projecao(
+    db_session: ReadDatabaseDependency,
+    params: ListingParams = Depends(),
+    filtros: AtletaFiltros = Depends(),
+    fields: Optional[str] = Query(None, description='Campos separados por vírgula (ex: id,nome,categoria)'),
+) -> FastJSONResponse:
+    campos = parse_campos(fields)
+    query = aplica_filtros(consulta_projecao(campos), filtros)
+
+    linhas = (await db_session.execute(query.limit(params.limit).offset(params.offset))).all()
+    total = await listing_total(db_session, query, params.resolved_total_mode)
+
+    return FastJSONResponse({
+        "items": [linha_para_dict(linha, campos) for linha in linhas],
+        "total": total,
+        "limit": params.limit,
+        "offset": params.offset,
+    })
+
+#Listagem compacta: mesmos filtros e paginação, sem repetir categoria/centro em cada atleta
+@router.get(
+    "/compacto",
+    summary="Consultar todos os Atletas (formato compacto)",
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaPaginaCompacta,
+)
+async def query_atletas_compacto(
+    db_session: ReadDatabaseDependency, params: ListingParams = Depends(), filtros: AtletaFiltros = Depends()
+) -> FastJSONResponse:
+    query = aplica_filtros(consulta_projecao(CAMPOS_COMPACTOS), filtros)
+
+    linhas = (await db_session.execute(query.limit(params.limit).offset(params.offset))).all()
+    total = await listing_total(db_session, query, params.resolved_total_mode)
+
+    return FastJSONResponse({
+        **pagina_compacta(linhas),
+        "total": total,
+        "limit": params.limit,
+        "offset": params.offset,
+    })
+
+#Exporta todos os atletas (com filtros opcionais) em streaming, lendo o banco por cursor no servidor
+@router.get(
+    "/exportar",
+    summary="Exportar Atletas (NDJSON ou CSV)",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def exportar_atletas(
+    filtros: AtletaFiltros = Depends(),
+    formato: Literal['ndjson', 'csv'] = Query('ndjson', description='Formato do arquivo'),
+    fields: Optional[str] = Query(None, description='Campos separados por vírgula (ex: id,nome,categoria)'),
+) -> StreamingResponse:
+    campos = parse_campos(fields)
+    query = aplica_filtros(consulta_projecao(campos), filtros)
 
-    return await paginate(db_session, query, params)
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        exporta(query, campos, formato),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="atletas.{formato}"'},
+    )
 
-#Consulta Atleta, retorna Erro se não encontrado
+#Consulta vários Atletas pelo ID: cache primeiro, e os que faltarem em uma única consulta agrupada
+@router.get(
+    "/batch",
+    summary="Consultar vários Atletas pelo ID",
+    status_code=status.HTTP_200_OK,
+    response_model=AtletaBatchOut,
+)
+async def get_atletas_batch(
+    db_session: DatabaseDependency,
+    ler_primario: ReadPrimaryDependency,
+    ids: list[UUID4] = Query(..., max_length=MAX_IDS_BATCH, description='IDs dos atletas (repita o parâmetro: ?ids=...&ids=...)'),
+) -> Response:
+    ids = list(dict.fromkeys(ids))
+    itens = await cached_objects(
+        atleta_object_cache, ids, lambda faltantes: atleta_loader.load_many(db_session, faltantes), ler_primario
+    )
+
+    # Junta os corpos já serializados do cache, sem desserializar e serializar de novo
+    encontrados = b",".join(itens[id].body for id in ids if itens[id] is not None)
+    nao_encontrados = ",".join(f'"{id}"' for id in ids if itens[id] is None)
+    return Response(
+        content=b'{"items":[' + encontrados + b'],"nao_encontrados":[' + nao_encontrados.encode() + b"]}",
+        media_type="application/json",
+    )
+
+#Consulta Atleta pelo cache (LRU local + compartilhado); no miss, a consulta é agrupada com as de outras requisições
 @router.get(
     "/{id}",
     summary="Consultar Atleta pelo ID",
     status_code=status.HTTP_200_OK,
     response_model=AtletaOut,
 )
-async def get_atleta_by_id(id: UUID4, db_session: DatabaseDependency) -> AtletaOut:
-    atleta: AtletaModel | None = ( 
-        await db_session.execute(select(AtletaModel).filter_by(id=id))
-    ).scalars().first()
-
-    if not atleta:
+async def get_atleta_by_id(id: UUID4, db_session: DatabaseDependency, ler_primario: ReadPrimaryDependency) -> Response:
+    # Miss lido do primário (a sessão só pega conexão se consultar): nunca grava no cache uma versão da réplica
+    item = await cached_object(atleta_object_cache, id, lambda: atleta_loader.load(db_session, id), ler_primario)
+    if item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Atleta não encontrado no id: {id}",
         )
 
-    
-    return AtletaOut.model_validate(atleta)
+    return item.response()
 
-#Atualiza dados existentes no Banco, E retorna erro caso não encontrado
+#Atualiza dados existentes no Banco com um único UPDATE ... RETURNING, E retorna erro caso não encontrado
 @router.patch(
     "/{id}",
     summary="Editar um Atleta pelo ID",
@@ -140,91 +505,103 @@ async def get_atleta_by_id(id: UUID4, db_session: DatabaseDependency) -> AtletaO
     response_model=AtletaOut,
 )
 async def patch_atleta_by_id( 
-    id: UUID4, db_session: DatabaseDependency, atleta_up: AtletaUpdate = Body(...)
+    id: UUID4,
+    db_session: DatabaseDependency,
+    response: Response,
+    atleta_up: AtletaUpdate = Body(...),
+    if_match: Optional[str] = Header(None, description='ETag obtido no GET; responde 412 se o atleta foi alterado'),
 ) -> AtletaOut:
-
-    atleta: AtletaModel | None = ( 
-        await db_session.execute(select(AtletaModel).filter_by(id=id))
-    ).scalars().first()
-
-    if not atleta:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Atleta não encontrado no id: {id}",
-        )
-
+    versoes = parse_if_match(if_match)
     update_data = atleta_up.model_dump(exclude_unset=True) 
     
-    # Lida com a atualização de categoria
-    if "categoria" in update_data:
-        categoria_data = update_data.pop("categoria")
-        categoria_nome = categoria_data.get("nome") 
-        
-        # Verifica se o nome foi realmente fornecido dentro do objeto categoria
-        if not categoria_nome:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Nome da categoria não fornecido para alteração."
-            )
-        
-        #Verifica se a categoria existe, se não retorna o Erro
-        categoria = (
-            await db_session.execute(
-                select(CategoriaModel).filter_by(nome=categoria_nome)
-            )
-        ).scalars().first()
-        if not categoria:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"A nova categoria '{categoria_nome}' não foi encontrada.",
-            )
-        atleta.categoria_id = categoria.pk_id # Atualiza a chave estrangeira
-    
-    # Lida com a atualização de centro_treinamento
-    if "centro_treinamento" in update_data:
-        centro_treinamento_data = update_data.pop("centro_treinamento")
-        centro_treinamento_nome = centro_treinamento_data.get("nome")
-        
-        #Boloco de validação de Erro
-        if not centro_treinamento_nome:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Nome do centro de treinamento não fornecido para alteração."
-            )
+    await _resolve_referencias(db_session, update_data)
 
-        centro_treinamento = (
-            await db_session.execute(
-                select(CentroTreinamentoModel).filter_by(nome=centro_treinamento_nome)
-            )
-        ).scalars().first()
-        if not centro_treinamento:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"O novo centro de treinamento '{centro_treinamento_nome}' não foi encontrado.",
-            )
-        atleta.centro_treinamento_id = centro_treinamento.pk_id # Atualiza a chave estrangeira
+    # Um único UPDATE condicionado à versão (If-Match), que já devolve a linha e os dados de categoria/centro
+    categoria = select(CategoriaModel).where(CategoriaModel.pk_id == AtletaModel.categoria_id)
+    centro_treinamento = select(CentroTreinamentoModel).where(
+        CentroTreinamentoModel.pk_id == AtletaModel.centro_treinamento_id
+    )
+    stmt = (
+        update(AtletaModel)
+        .where(AtletaModel.id == id)
+        .values(**update_data, version=AtletaModel.version + 1)
+        .returning(
+            *AtletaModel.__table__.c,
+            categoria.with_only_columns(CategoriaModel.nome).scalar_subquery().label("categoria_nome"),
+            categoria.with_only_columns(CategoriaModel.version).scalar_subquery().label("categoria_version"),
+            centro_treinamento.with_only_columns(CentroTreinamentoModel.nome).scalar_subquery().label("centro_treinamento_nome"),
+            centro_treinamento.with_only_columns(CentroTreinamentoModel.version).scalar_subquery().label("centro_treinamento_version"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if versoes is not None:
+        stmt = stmt.where(AtletaModel.version.in_(versoes))
 
-    # Atualiza os campos primitivos restantes
-    for key, value in update_data.items(): 
-        setattr(atleta, key, value)
-    
     #Bloco de validação de Erro
     try:
+        atleta = (await db_session.execute(stmt)).first()
+        if atleta is not None:
+            await registra_alteracoes(db_session, "atleta", "alterado", [(id, atleta.version)])
         await db_session.commit()
-        await db_session.refresh(atleta) 
-
-        return AtletaOut.model_validate(atleta)
     except IntegrityError as e:
-         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT, 
-            detail=f"Já existe um atleta cadastrado com o CPF informado." 
-        )
+        await db_session.rollback()
+        constraint = _constraint_violada(e)
+        if constraint == "cpf":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, 
+                detail=f"Já existe um atleta cadastrado com o CPF informado." 
+            )
+        if constraint is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Erro de integridade ao editar o atleta: {e.orig}",
+            )
+        # pk_id em cache não existe mais (categoria/centro removido por outro processo): descarta a entrada
+        categoria_nome = atleta_up.categoria.nome if atleta_up.categoria else None
+        centro_treinamento_nome = atleta_up.centro_treinamento.nome if atleta_up.centro_treinamento else None
+        if constraint == "foreign_key" and (categoria_nome is None or centro_treinamento_nome is None):
+            # FK sem nome: só uma das referências foi alterada, então é ela
+            constraint = "centro_treinamento_id" if categoria_nome is None else "categoria_id"
+        if constraint == "categoria_id":
+            categoria_cache.invalidate(categoria_nome)
+            detalhe = f"A nova categoria '{categoria_nome}' não foi encontrada."
+        elif constraint == "centro_treinamento_id":
+            centro_treinamento_cache.invalidate(centro_treinamento_nome)
+            detalhe = f"O novo centro de treinamento '{centro_treinamento_nome}' não foi encontrado."
+        else:
+            categoria_cache.invalidate(categoria_nome)
+            centro_treinamento_cache.invalidate(centro_treinamento_nome)
+            detalhe = "A nova categoria ou o novo centro de treinamento não foi encontrado."
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detalhe)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ocorreu um erro inesperado ao editar o atleta: {e}",
         )
 
+    # Nenhuma linha atualizada: o atleta não existe ou a versão informada está desatualizada
+    if atleta is None:
+        existe = (
+            await db_session.execute(select(select(AtletaModel.pk_id).filter_by(id=id).exists()))
+        ).scalar()
+        if not existe:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Atleta não encontrado no id: {id}",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"O atleta {id} foi alterado por outra requisição. Consulte-o novamente e reenvie a alteração.",
+        )
+    await atleta_object_cache.invalidate(id)
+
+    response.headers["ETag"] = version_etag(atleta.version, atleta.categoria_version, atleta.centro_treinamento_version)
+    return AtletaOut(
+        **{campo: valor for campo, valor in atleta._mapping.items() if campo in AtletaOut.model_fields},
+        categoria={"nome": atleta.categoria_nome},
+        centro_treinamento={"nome": atleta.centro_treinamento_nome},
+    )
+
 #Deleta atleta do banco pleo ID Informado
 @router.delete(
     "/{id}", summary="Deletar um Atleta pelo ID", status_code=status.HTTP_204_NO_CONTENT
@@ -242,4 +619,6 @@ async def delete_atleta_by_id(id: UUID4, db_session: DatabaseDependency) -> None
         )
 
     await db_session.delete(atleta)
-    await db_session.commit()
\ No newline at end of file
+    await registra_alteracoes(db_session, "atleta", "removido", [(id, atleta.version)])
+    await db_session.commit()
+    await atleta_object_cache.invalidate(id)
\ No newline at end of file
@@ -0,0 +1,163 @@
+from sqlalchemy import DDL, BigInteger, Column, Float, Integer, Numeric, Table, cast, delete, event, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from workout_api.atleta.models import AtletaModel
+from workout_api.contrib.models import BaseModel
+
+
+# --- Resumo por (categoria, centro): mantido por triggers no PostgreSQL (ver migração d8a3b5c7e9f1) ---
+atletas_estatisticas = Table(
+    'atletas_estatisticas',
+    BaseModel.metadata,
+    Column('categoria_id', Integer, primary_key=True),
+    Column('centro_treinamento_id', Integer, primary_key=True),
+    Column('total', Integer, nullable=False, server_default='0'),
+    Column('soma_idade', BigInteger, nullable=False, server_default='0'),
+    Column('soma_peso', Numeric, nullable=False, server_default='0'),
+    Column('soma_altura', Numeric, nullable=False, server_default='0'),
+    Column('total_masculino', Integer, nullable=False, server_default='0'),
+    Column('total_feminino', Integer, nullable=False, server_default='0'),
+)
+
+# Triggers por comando (transition tables): um INSERT/UPDATE/DELETE em lote gera um upsert por grupo, não por linha
+# A linha de cada grupo fica bloqueada até o commit da escrita: escritas no mesmo grupo se serializam (ver README)
+FUNCAO_TRIGGER = """
+CREATE OR REPLACE FUNCTION atletas_estatisticas_aplica() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        -- O PostgreSQL não aceita UPDATE OF (colunas) com transition tables: o filtro fica aqui. Sem mudança
+        -- nas colunas do resumo (ex: só nome, cpf ou version), sai sem tocar nem bloquear as linhas do resumo
+        IF NOT EXISTS (
+            SELECT 1 FROM antigos a JOIN novos n USING (pk_id)
+            WHERE (a.categoria_id, a.centro_treinamento_id, a.idade, a.peso, a.altura, a.sexo)
+                IS DISTINCT FROM (n.categoria_id, n.centro_treinamento_id, n.idade, n.peso, n.altura, n.sexo)
+        ) THEN
+            RETURN NULL;
+        END IF;
+        -- Bloqueia os grupos de origem e de destino em ordem: lotes que movem atletas em sentidos opostos
+        -- esperam um pelo outro em vez de entrar em deadlock
+        PERFORM 1 FROM atletas_estatisticas e
+        WHERE (e.categoria_id, e.centro_treinamento_id) IN (
+            SELECT categoria_id, centro_treinamento_id FROM antigos
+            UNION SELECT categoria_id, centro_treinamento_id FROM novos
+        )
+        ORDER BY e.categoria_id, e.centro_treinamento_id
+        FOR UPDATE;
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM 1 FROM atletas_estatisticas e
+        WHERE (e.categoria_id, e.centro_treinamento_id) IN (SELECT categoria_id, centro_treinamento_id FROM antigos)
+        ORDER BY e.categoria_id, e.centro_treinamento_id
+        FOR UPDATE;
+    END IF;
+
+    IF TG_OP <> 'DELETE' THEN
+        INSERT INTO atletas_estatisticas AS e
+            (categoria_id, centro_treinamento_id, total, soma_idade, soma_peso, soma_altura, total_masculino, total_feminino)
+        SELECT categoria_id, centro_treinamento_id, count(*), sum(idade), sum(peso::numeric), sum(altura::numeric),
+               count(*) FILTER (WHERE sexo = 'M'), count(*) FILTER (WHERE sexo = 'F')
+        FROM novos GROUP BY categoria_id, centro_treinamento_id ORDER BY categoria_id, centro_treinamento_id
+        ON CONFLICT (categoria_id, centro_treinamento_id) DO UPDATE SET
+            total = e.total + EXCLUDED.total,
+            soma_idade = e.soma_idade + EXCLUDED.soma_idade,
+            soma_peso = e.soma_peso + EXCLUDED.soma_peso,
+            soma_altura = e.soma_altura + EXCLUDED.soma_altura,
+            total_masculino = e.total_masculino + EXCLUDED.total_masculino,
+            total_feminino = e.total_feminino + EXCLUDED.total_feminino;
+    END IF;
+
+    IF TG_OP <> 'INSERT' THEN
+        UPDATE atletas_estatisticas AS e SET
+            total = e.total - a.total,
+            soma_idade = e.soma_idade - a.soma_idade,
+            soma_peso = e.soma_peso - a.soma_peso,
+            soma_altura = e.soma_altura - a.soma_altura,
+            total_masculino = e.total_masculino - a.total_masculino,
+            total_feminino = e.total_feminino - a.total_feminino
+        FROM (
+            SELECT categoria_id, centro_treinamento_id, count(*) AS total, sum(idade) AS soma_idade,
+                   sum(peso::numeric) AS soma_peso, sum(altura::numeric) AS soma_altura,
+                   count(*) FILTER (WHERE sexo = 'M') AS total_masculino, count(*) FILTER (WHERE sexo = 'F') AS total_feminino
+            FROM antigos GROUP BY categoria_id, centro_treinamento_id
+        ) AS a
+        WHERE e.categoria_id = a.categoria_id AND e.centro_treinamento_id = a.centro_treinamento_id;
+    END IF;
+
+    RETURN NULL;
+END;
+$$
+"""
+
+TRIGGERS = [
+    "CREATE TRIGGER atletas_estatisticas_insert AFTER INSERT ON atletas "
+    "REFERENCING NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_estatisticas_aplica()",
+    "CREATE TRIGGER atletas_estatisticas_update AFTER UPDATE ON atletas "
+    "REFERENCING OLD TABLE AS antigos NEW TABLE AS novos FOR EACH STATEMENT EXECUTE FUNCTION atletas_estatisticas_aplica()",
+    "CREATE TRIGGER atletas_estatisticas_delete AFTER DELETE ON atletas "
+    "REFERENCING OLD TABLE AS antigos FOR EACH STATEMENT EXECUTE FUNCTION atletas_estatisticas_aplica()",
+]
+
+# Mantém o create_all (ex: benchmarks) equivalente à migração no PostgreSQL; roda depois de criar todas as tabelas
+event.listen(BaseModel.metadata, 'after_create', DDL(FUNCAO_TRIGGER).execute_if(dialect='postgresql'))
+for _trigger in TRIGGERS:
+    event.listen(BaseModel.metadata, 'after_create', DDL(_trigger).execute_if(dialect='postgresql'))
+
+
+def _agregado_atletas():
+    # Mesmo formato do resumo, calculado na hora a partir de atletas (bancos sem os triggers)
+    return (
+        select(
+            AtletaModel.categoria_id,
+            AtletaModel.centro_treinamento_id,
+            func.count().label('total'),
+            func.sum(AtletaModel.idade).label('soma_idade'),
+            func.sum(AtletaModel.peso).label('soma_peso'),
+            func.sum(AtletaModel.altura).label('soma_altura'),
+            func.count().filter(AtletaModel.sexo == 'M').label('total_masculino'),
+            func.count().filter(AtletaModel.sexo == 'F').label('total_feminino'),
+        )
+        .group_by(AtletaModel.categoria_id, AtletaModel.centro_treinamento_id)
+    )
+
+
+#Estatísticas dos atletas por categoria ou centro: lê o resumo (uma linha por grupo), nunca a tabela de atletas
+async def estatisticas_por(db_session: AsyncSession, grupo_model, coluna: str) -> list[dict]:
+    if db_session.get_bind().dialect.name == 'postgresql':
+        fonte = atletas_estatisticas
+    else:
+        fonte = _agregado_atletas().subquery()
+
+    total = func.coalesce(func.sum(fonte.c.total), 0)
+
+    def media(coluna_soma):
+        # Converte antes de dividir: bigint / bigint seria divisão inteira
+        return cast(func.sum(coluna_soma), Float) / func.nullif(total, 0)
+
+    query = (
+        select(
+            grupo_model.id,
+            grupo_model.nome,
+            total.label('total'),
+            media(fonte.c.soma_idade).label('idade_media'),
+            media(fonte.c.soma_peso).label('peso_medio'),
+            media(fonte.c.soma_altura).label('altura_media'),
+            func.coalesce(func.sum(fonte.c.total_masculino), 0).label('total_masculino'),
+            func.coalesce(func.sum(fonte.c.total_feminino), 0).label('total_feminino'),
+        )
+        .outerjoin(fonte, fonte.c[coluna] == grupo_model.pk_id)
+        .group_by(grupo_model.pk_id, grupo_model.id, grupo_model.nome)
+        .order_by(grupo_model.nome)
+    )
+    return [dict(linha._mapping) for linha in await db_session.execute(query)]
+
+
+#Reconstrói o resumo a partir de atletas (reparo/auditoria dos triggers); devolve a quantidade de grupos
+async def recalcula_estatisticas(db_session: AsyncSession) -> int:
+    # SHARE bloqueia escritas em atletas (os triggers) até o commit, mas não as leituras
+    await db_session.execute(text("LOCK TABLE atletas IN SHARE MODE"))
+    await db_session.execute(delete(atletas_estatisticas))
+    resultado = await db_session.execute(
+        insert(atletas_estatisticas).from_select([coluna.name for coluna in atletas_estatisticas.c], _agregado_atletas())
+    )
+    await db_session.commit()
+    return resultado.rowcount
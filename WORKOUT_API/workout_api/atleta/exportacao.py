@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy.sql import Select
+
+from workout_api.atleta.projecao import linha_para_dict
+from workout_api.configs.database import read_sessionmaker
+
+
+TAMANHO_CHUNK = 1000
+
+
+def _ndjson(linhas: Iterable, campos: list[str]) -> str:
+    return "".join(json.dumps(linha_para_dict(linha, campos), ensure_ascii=False) + "\n" for linha in linhas)
+
+
+def _csv(linhas: Iterable, campos: list[str]) -> str:
+    # No CSV categoria e centro_treinamento saem apenas com o nome
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for linha in linhas:
+        item = linha_para_dict(linha, campos)
+        writer.writerow(valor["nome"] if isinstance(valor, dict) else valor for valor in item.values())
+    return buffer.getvalue()
+
+
+#Gera o arquivo em pedaços a partir de um cursor no servidor; a memória fica constante independente do tamanho da tabela
+async def exporta(query: Select, campos: list[str], formato: str) -> AsyncIterator[str]:
+    serializa = _csv if formato == "csv" else _ndjson
+    if formato == "csv":
+        # Cabeçalho sai imediatamente, antes mesmo da primeira leitura no banco
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(campos)
+        yield buffer.getvalue()
+
+    # A sessão é aberta aqui (e não via Depends) porque precisa durar todo o envio da resposta
+    async with read_sessionmaker()() as session:
+        resultado = await session.stream(query.execution_options(yield_per=TAMANHO_CHUNK))
+        async for linhas in resultado.partitions(TAMANHO_CHUNK):
+            yield serializa(linhas, campos)
@@ -0,0 +1,83 @@
+from typing import Literal, Optional
+
+from fastapi import Query
+from pydantic import BaseModel
+from sqlalchemy import any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.future import select
+from sqlalchemy.sql import ColumnElement, Select
+
+from workout_api.atleta.models import AtletaModel
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+
+
+OrdemAtleta = Literal['created_at', '-created_at', 'nome', '-nome', 'idade', '-idade', 'peso', '-peso']
+
+
+# --- Filtros e ordenação da listagem de atletas (parâmetros de query) ---
+class AtletaFiltros(BaseModel):
+    nome: Optional[str] = Query(None, min_length=3, max_length=50, description='Nome começa com (sem diferenciar maiúsculas; índice trigram)')
+    nome_contem: Optional[str] = Query(None, min_length=3, max_length=50, description='Nome contém o trecho (índice trigram)')
+    cpf: Optional[str] = Query(None, max_length=11, description='CPF exato')
+    categoria: Optional[str] = Query(None, max_length=50, description='Nome da categoria')
+    centro_treinamento: Optional[str] = Query(None, max_length=50, description='Nome do centro de treinamento')
+    sexo: Optional[str] = Query(None, max_length=1, description='Sexo do atleta')
+    idade_min: Optional[int] = Query(None, ge=0, description='Idade mínima')
+    idade_max: Optional[int] = Query(None, ge=0, description='Idade máxima')
+    peso_min: Optional[float] = Query(None, ge=0, description='Peso mínimo')
+    peso_max: Optional[float] = Query(None, ge=0, description='Peso máximo')
+    ordem: OrdemAtleta = Query('created_at', description='Campo de ordenação; prefixo "-" para decrescente')
+
+
+def _escape_like(valor: str) -> str:
+    return valor.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+#Monta as condições WHERE dos filtros, reutilizáveis em SELECT, UPDATE e DELETE
+def condicoes_filtros(filtros: AtletaFiltros) -> list[ColumnElement[bool]]:
+    condicoes = []
+    if filtros.nome:
+        condicoes.append(AtletaModel.nome.ilike(f"{_escape_like(filtros.nome)}%", escape='\\'))
+    if filtros.nome_contem:
+        condicoes.append(AtletaModel.nome.ilike(f"%{_escape_like(filtros.nome_contem)}%", escape='\\'))
+    if filtros.cpf:
+        condicoes.append(AtletaModel.cpf == filtros.cpf)
+    if filtros.categoria:
+        # Subconsulta escalar: o nome vira pk_id no próprio banco e o filtro usa o índice (categoria_id, created_at)
+        condicoes.append(
+            AtletaModel.categoria_id == select(CategoriaModel.pk_id).where(CategoriaModel.nome == filtros.categoria).scalar_subquery()
+        )
+    if filtros.centro_treinamento:
+        condicoes.append(
+            AtletaModel.centro_treinamento_id == select(CentroTreinamentoModel.pk_id).where(CentroTreinamentoModel.nome == filtros.centro_treinamento).scalar_subquery()
+        )
+    if filtros.sexo:
+        condicoes.append(AtletaModel.sexo == filtros.sexo)
+    if filtros.idade_min is not None:
+        condicoes.append(AtletaModel.idade >= filtros.idade_min)
+    if filtros.idade_max is not None:
+        condicoes.append(AtletaModel.idade <= filtros.idade_max)
+    if filtros.peso_min is not None:
+        condicoes.append(AtletaModel.peso >= filtros.peso_min)
+    if filtros.peso_max is not None:
+        condicoes.append(AtletaModel.peso <= filtros.peso_max)
+    return condicoes
+
+
+#Condição "id está na lista"; no PostgreSQL a lista vai como um único parâmetro array (= ANY(:ids))
+def condicao_ids(ids: list, dialeto: str) -> ColumnElement[bool]:
+    if dialeto == 'postgresql':
+        return AtletaModel.id == any_(bindparam('ids', ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+    return AtletaModel.id.in_(ids)
+
+
+#Aplica os filtros e a ordenação na consulta; pk_id desempata a ordenação para manter a paginação estável
+def aplica_filtros(query: Select, filtros: AtletaFiltros) -> Select:
+    query = query.where(*condicoes_filtros(filtros))
+
+    descendente = filtros.ordem.startswith('-')
+    coluna = getattr(AtletaModel, filtros.ordem.lstrip('-'))
+    if descendente:
+        return query.order_by(coluna.desc(), AtletaModel.pk_id.desc())
+    return query.order_by(coluna, AtletaModel.pk_id)
@@ -0,0 +1,257 @@
+import codecs
+import csv
+import json
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from workout_api.alteracoes.feed import registra_alteracoes
+from workout_api.atleta.models import AtletaModel
+from workout_api.atleta.schemas import AtletaIn, ErroImportacao, ImportacaoOut
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+from workout_api.contrib.cache import categoria_cache, centro_treinamento_cache, resolve_pk_ids
+
+
+TAMANHO_LOTE = 1000 # 1000 linhas x 10 colunas fica abaixo do limite de 32767 parâmetros do asyncpg
+MAX_ERROS_RELATORIO = 1000 # Limita o relatório para manter a memória constante em arquivos grandes
+MAX_BYTES_LINHA = 64 * 1024 # Linhas (e registros CSV de várias linhas) maiores viram erro em vez de crescer o buffer
+
+
+async def _iter_linhas(corpo: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str | ValueError]]:
+    # Remonta as linhas (com o "\n" final) a partir dos pedaços do corpo, sem carregar o arquivo inteiro.
+    # Cortar nos bytes "\n" nunca divide um caractere multibyte; o decoder incremental remove o BOM só no início
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = bytearray()
+    numero = 0
+    descartando = False  # Linha acima do limite: já virou erro, ignora os bytes até o próximo "\n"
+    async for pedaco in corpo:
+        inicio = 0
+        while inicio < len(pedaco):
+            fim = pedaco.find(b"\n", inicio)
+            trecho = pedaco[inicio:] if fim == -1 else pedaco[inicio:fim + 1]
+            inicio += len(trecho)
+            if not descartando:
+                if len(resto) + len(trecho) > MAX_BYTES_LINHA:
+                    resto.clear()
+                    descartando = True
+                    yield numero + 1, ValueError(f"Linha maior que o limite de {MAX_BYTES_LINHA} bytes.")
+                else:
+                    resto += trecho
+            if fim == -1:
+                break
+            numero += 1
+            if descartando:
+                descartando = False
+            else:
+                linha = _decodifica(decoder, bytes(resto))
+                resto.clear()
+                yield numero, linha
+
+    if resto:
+        yield numero + 1, _decodifica(decoder, bytes(resto), final=True)
+
+
+def _decodifica(decoder: codecs.IncrementalDecoder, linha: bytes, final: bool = False) -> str | ValueError:
+    try:
+        return decoder.decode(linha, final)
+    except UnicodeDecodeError as e:
+        # Descarta o estado da linha inválida, sem voltar a procurar o BOM
+        decoder.setstate((b"", 0))
+        return ValueError(f"Linha com codificação inválida (esperado UTF-8): {e.reason}.")
+
+
+async def _iter_csv(corpo: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, list[str] | ValueError]]:
+    # Um único csv.reader consome as linhas decodificadas; um campo entre aspas pode conter quebras de linha,
+    # então as linhas ficam pendentes até as aspas do registro fecharem (contagem par)
+    pendentes: deque[str] = deque()
+    leitor = csv.reader(iter(pendentes.popleft, None), strict=True)
+    inicio = aspas = tamanho = 0
+    async for numero, linha in _iter_linhas(corpo):
+        if not pendentes:
+            inicio, aspas, tamanho = numero, 0, 0
+        if isinstance(linha, ValueError):
+            # Uma linha inválida invalida o registro inteiro em que aparece
+            pendentes.clear()
+            yield inicio, linha
+            continue
+        if not pendentes and not linha.strip():
+            continue
+
+        pendentes.append(linha)
+        aspas += linha.count('"')
+        tamanho += len(linha)
+        if tamanho > MAX_BYTES_LINHA:
+            pendentes.clear()
+            yield inicio, ValueError(f"Registro maior que o limite de {MAX_BYTES_LINHA} caracteres.")
+            continue
+        if aspas % 2:
+            continue
+
+        try:
+            valores = next(leitor)
+        except csv.Error as e:
+            valores = ValueError(f"CSV malformado: {e}.")
+        if pendentes:
+            # O csv.reader fechou o registro antes do previsto pelas aspas: as linhas restantes são descartadas
+            pendentes.clear()
+            valores = ValueError("CSV malformado: aspas sem fechamento.")
+        yield inicio, valores
+
+    if pendentes:
+        yield inicio, ValueError("CSV malformado: aspas sem fechamento no fim do arquivo.")
+
+
+async def iter_registros(corpo: AsyncIterator[bytes], formato: str) -> AsyncIterator[tuple[int, dict | Exception]]:
+    # Gera (número da linha, registro) a partir de NDJSON ou CSV (com cabeçalho)
+    if formato == "csv":
+        cabecalho = None
+        async for numero, valores in _iter_csv(corpo):
+            if isinstance(valores, ValueError):
+                yield numero, valores
+                continue
+            if cabecalho is None:
+                cabecalho = [coluna.strip() for coluna in valores]
+                continue
+            registro = dict(zip(cabecalho, valores))
+            for chave in ("categoria", "centro_treinamento"):
+                if chave in registro:
+                    registro[chave] = {"nome": registro[chave]}
+            yield numero, registro
+        return
+
+    async for numero, linha in _iter_linhas(corpo):
+        if isinstance(linha, ValueError):
+            yield numero, linha
+        elif linha.strip():
+            try:
+                yield numero, json.loads(linha)
+            except ValueError as e:
+                yield numero, e
+
+
+def _formata_erro(erro: Exception) -> str:
+    if isinstance(erro, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(parte) for parte in detalhe['loc'])}: {detalhe['msg']}" for detalhe in erro.errors()
+        )
+    return str(erro)
+
+
+async def importar_lote(
+    db_session: AsyncSession, lote: Iterable[tuple[int, dict | Exception]], relatorio: ImportacaoOut
+) -> None:
+    # 1. Valida as linhas do lote com o schema de entrada já existente
+    validos: list[tuple[int, AtletaIn]] = []
+    for numero, registro in lote:
+        try:
+            if isinstance(registro, Exception):
+                raise registro
+            validos.append((numero, AtletaIn.model_validate(registro)))
+        except (ValidationError, ValueError) as e:
+            _registra_erro(relatorio, numero, registro, _formata_erro(e))
+
+    if not validos:
+        return
+
+    # 2-4. Um pk_id em cache pode apontar para uma categoria/centro já removido: o INSERT falha na FK, o cache
+    # desses nomes é invalidado e o lote é refeito consultando o banco (a referência removida vira erro da linha)
+    nomes_categoria = {atleta.categoria.nome for _, atleta in validos}
+    nomes_centro = {atleta.centro_treinamento.nome for _, atleta in validos}
+    for tentativa in range(2):
+        erros, linhas, numeros_por_cpf = await _monta_linhas(db_session, validos, nomes_categoria, nomes_centro)
+        if not linhas:
+            break
+        try:
+            inseridos = await _insere_linhas(db_session, linhas)
+            break
+        except IntegrityError as e:
+            await db_session.rollback()
+            if "foreign key" not in str(e.orig).lower():
+                raise
+            categoria_cache.invalidate(*nomes_categoria)
+            centro_treinamento_cache.invalidate(*nomes_centro)
+            if tentativa:
+                # Removida de novo entre a consulta e o INSERT: rejeita o lote em vez de interromper a importação
+                erros += [
+                    (numero, None, "A categoria ou o centro de treinamento foi removido durante a importação.", cpf)
+                    for cpf, numero in numeros_por_cpf.items()
+                ]
+                linhas = []
+
+    for numero, registro, detalhe, cpf in erros:
+        _registra_erro(relatorio, numero, registro, detalhe, cpf=cpf)
+    if not linhas:
+        return
+
+    relatorio.inseridos += len(inseridos)
+    for cpf, numero in numeros_por_cpf.items():
+        if cpf not in inseridos:
+            _registra_erro(relatorio, numero, None, f"Já existe um atleta cadastrado com o CPF: {cpf}", cpf=cpf)
+
+
+async def _monta_linhas(
+    db_session: AsyncSession, validos: list[tuple[int, AtletaIn]], nomes_categoria: set[str], nomes_centro: set[str]
+) -> tuple[list[tuple], list[dict], dict[str, int]]:
+    # 2. Resolve os nomes de categoria e centro uma única vez por lote (consultando o cache antes do banco)
+    categorias = await resolve_pk_ids(db_session, CategoriaModel, categoria_cache, nomes_categoria)
+    centros = await resolve_pk_ids(db_session, CentroTreinamentoModel, centro_treinamento_cache, nomes_centro)
+
+    # 3. Monta as linhas do INSERT, descartando referências inexistentes e CPFs repetidos no lote
+    erros: list[tuple] = []
+    linhas: list[dict] = []
+    numeros_por_cpf: dict[str, int] = {}
+    for numero, atleta in validos:
+        if atleta.categoria.nome not in categorias:
+            erros.append((numero, atleta, f"A categoria '{atleta.categoria.nome}' não foi encontrada.", None))
+            continue
+        if atleta.centro_treinamento.nome not in centros:
+            erros.append((numero, atleta, f"O centro de treinamento '{atleta.centro_treinamento.nome}' não foi encontrado.", None))
+            continue
+        if atleta.cpf in numeros_por_cpf:
+            erros.append((numero, atleta, f"CPF repetido no arquivo (linha {numeros_por_cpf[atleta.cpf]}).", None))
+            continue
+
+        numeros_por_cpf[atleta.cpf] = numero
+        linhas.append({
+            "id": uuid4(),
+            "created_at": datetime.now(),
+            **atleta.model_dump(exclude={"categoria", "centro_treinamento"}),
+            "categoria_id": categorias[atleta.categoria.nome],
+            "centro_treinamento_id": centros[atleta.centro_treinamento.nome],
+        })
+    return erros, linhas, numeros_por_cpf
+
+
+async def _insere_linhas(db_session: AsyncSession, linhas: list[dict]) -> set[str]:
+    # 4. Um único INSERT multi-linha; CPFs já cadastrados são ignorados pela constraint única
+    stmt = (
+        pg_insert(AtletaModel)
+        .values(linhas)
+        .on_conflict_do_nothing(index_elements=[AtletaModel.cpf])
+        .returning(AtletaModel.cpf, AtletaModel.id, AtletaModel.version)
+    )
+    linhas_inseridas = (await db_session.execute(stmt)).all()
+    await registra_alteracoes(
+        db_session, "atleta", "criado", [(linha.id, linha.version) for linha in linhas_inseridas]
+    )
+    await db_session.commit()
+    return {linha.cpf for linha in linhas_inseridas}
+
+
+def _registra_erro(relatorio: ImportacaoOut, numero: int, registro, detalhe: str, cpf: str | None = None) -> None:
+    relatorio.total_erros += 1
+    if len(relatorio.erros) >= MAX_ERROS_RELATORIO:
+        return
+
+    if cpf is None:
+        cpf = getattr(registro, "cpf", None) or (registro.get("cpf") if isinstance(registro, dict) else None)
+    relatorio.erros.append(
+        ErroImportacao(linha=numero, cpf=str(cpf) if cpf is not None else None, detalhe=detalhe)
+    )
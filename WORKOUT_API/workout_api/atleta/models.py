@@ -1,11 +1,18 @@
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Float
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from workout_api.contrib.models import BaseModel
 
 # --- BaseModel para tabela Atleta (Usado para definir a estrutura principal) ---
 class AtletaModel(BaseModel):
     __tablename__ = 'atletas'
+    __table_args__ = (
+        # Índices das listagens com filtro/ordenação (ver migração b7e5d1c9a2f4)
+        Index('ix_atletas_nome_trgm', 'nome', postgresql_using='gin', postgresql_ops={'nome': 'gin_trgm_ops'}),
+        Index('ix_atletas_created_at_pk_id', 'created_at', 'pk_id'),
+        Index('ix_atletas_categoria_id_created_at', 'categoria_id', 'created_at'),
+        Index('ix_atletas_centro_treinamento_id_created_at', 'centro_treinamento_id', 'created_at'),
+    )
 
     pk_id: Mapped[int] = mapped_column(Integer, primary_key=True)
     nome: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -0,0 +1,87 @@
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.engine import Row
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from workout_api.atleta.models import AtletaModel
+from workout_api.categorias.models import CategoriaModel
+from workout_api.centro_treinamento.models import CentroTreinamentoModel
+
+
+# Campos disponíveis na projeção, com a coluna correspondente (categoria/centro vêm do JOIN)
+CAMPOS = {
+    "id": AtletaModel.id,
+    "created_at": AtletaModel.created_at,
+    "cpf": AtletaModel.cpf,
+    "nome": AtletaModel.nome,
+    "idade": AtletaModel.idade,
+    "peso": AtletaModel.peso,
+    "altura": AtletaModel.altura,
+    "sexo": AtletaModel.sexo,
+    "categoria": CategoriaModel.nome,
+    "centro_treinamento": CentroTreinamentoModel.nome,
+}
+
+
+def parse_campos(fields: Optional[str]) -> list[str]:
+    if not fields:
+        return list(CAMPOS)
+
+    campos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    invalidos = [campo for campo in campos if campo not in CAMPOS]
+    if invalidos or not campos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos em 'fields': {', '.join(invalidos)}. Disponíveis: {', '.join(CAMPOS)}",
+        )
+    return list(dict.fromkeys(campos))
+
+
+#Seleciona apenas as colunas pedidas, com um JOIN só quando categoria/centro forem solicitados
+def consulta_projecao(campos: Iterable[str]) -> Select:
+    campos = list(campos)
+    query = select(*(CAMPOS[campo].label(campo) for campo in campos)).select_from(AtletaModel)
+    if "categoria" in campos:
+        query = query.join(CategoriaModel, AtletaModel.categoria_id == CategoriaModel.pk_id)
+    if "centro_treinamento" in campos:
+        query = query.join(CentroTreinamentoModel, AtletaModel.centro_treinamento_id == CentroTreinamentoModel.pk_id)
+    return query
+
+
+#Converte a tupla do banco direto para o formato JSON do AtletaOut, sem ORM nem validação do Pydantic
+def linha_para_dict(linha: Row, campos: Iterable[str]) -> dict:
+    item = {}
+    for campo, valor in zip(campos, linha):
+        if campo in ("categoria", "centro_treinamento"):
+            valor = {"nome": valor}
+        elif campo == "id":
+            valor = str(valor)
+        elif campo == "created_at":
+            valor = valor.isoformat()
+        item[campo] = valor
+    return item
+
+
+# Referências que a listagem compacta tira de cada item e guarda uma vez por página
+REFERENCIAS = ("categoria", "centro_treinamento")
+CAMPOS_ATLETA = [campo for campo in CAMPOS if campo not in REFERENCIAS]
+CAMPOS_COMPACTOS = [*CAMPOS_ATLETA, *REFERENCIAS]
+
+
+#Monta a página compacta: cada categoria/centro aparece uma vez e os atletas guardam a posição na lista
+def pagina_compacta(linhas: Iterable[Row]) -> dict:
+    tabelas: dict[str, dict[str, int]] = {referencia: {} for referencia in REFERENCIAS}
+    itens = []
+    for linha in linhas:
+        item = linha_para_dict(linha, CAMPOS_ATLETA)
+        for referencia, tabela in tabelas.items():
+            item[referencia] = tabela.setdefault(getattr(linha, referencia), len(tabela))
+        itens.append(item)
+
+    return {
+        "items": itens,
+        "categorias": [{"nome": nome} for nome in tabelas["categoria"]],
+        "centros_treinamento": [{"nome": nome} for nome in tabelas["centro_treinamento"]],
+    }
@@ -1,4 +1,4 @@
-from typing import Annotated, Optional 
+from typing import Annotated, Literal, Optional 
 from pydantic import BaseModel, Field, PositiveFloat, UUID4 
 from datetime import datetime 
 
@@ -43,4 +43,63 @@ class AtletaUpdate(BaseSchema):
     # Campos para atualização de categoria e centro de treinamento (opcionais e aninhados)
     # Isso permite enviar APENAS a nova categoria ou centro de treinamento se desejar atualizá-los.
     categoria: Annotated[Optional[CategoriaAtleta], Field(None, description='Nova Categoria do atleta')]
-    centro_treinamento: Annotated[Optional[CentroTreinamentoAtleta], Field(None, description='Novo Centro de treinamento do atleta')]
\ No newline at end of file
+    centro_treinamento: Annotated[Optional[CentroTreinamentoAtleta], Field(None, description='Novo Centro de treinamento do atleta')]
+
+# --- Listagem compacta: categorias/centros em tabelas laterais, referenciados pela posição ---
+class AtletaCompactoOut(AtletaOut):
+    categoria: Annotated[int, Field(description='Posição da categoria em "categorias"', example=0)]
+    centro_treinamento: Annotated[int, Field(description='Posição do centro de treinamento em "centros_treinamento"', example=0)]
+
+class AtletaPaginaCompacta(BaseSchema):
+    items: Annotated[list[AtletaCompactoOut], Field(description='Atletas da página')]
+    categorias: Annotated[list[CategoriaAtleta], Field(description='Categorias referenciadas pelos atletas da página')]
+    centros_treinamento: Annotated[list[CentroTreinamentoAtleta], Field(description='Centros de treinamento referenciados pelos atletas da página')]
+    total: Annotated[Optional[int], Field(None, description='Total de registros (conforme total_mode)')]
+    limit: Annotated[int, Field(description='Limite da página')]
+    offset: Annotated[int, Field(description='Deslocamento da página')]
+
+# --- Consulta de vários atletas pelo ID (GET /atleta/batch) ---
+MAX_IDS_BATCH = 100
+
+class AtletaBatchOut(BaseSchema):
+    items: Annotated[list[AtletaOut], Field(description='Atletas encontrados, na ordem dos IDs pedidos')]
+    nao_encontrados: Annotated[list[UUID4], Field(description='IDs pedidos que não existem')]
+
+# --- Schemas do relatório de importação em lote ---
+class ErroImportacao(BaseSchema):
+    linha: Annotated[int, Field(description='Número da linha no arquivo enviado', example=3)]
+    cpf: Annotated[Optional[str], Field(None, description='CPF informado na linha, se houver', example='12345678900')]
+    detalhe: Annotated[str, Field(description='Motivo da rejeição da linha')]
+
+class ImportacaoOut(BaseSchema):
+    inseridos: Annotated[int, Field(0, description='Quantidade de atletas inseridos')]
+    total_erros: Annotated[int, Field(0, description='Quantidade de linhas rejeitadas')]
+    erros: Annotated[list[ErroImportacao], Field(default_factory=list, description='Linhas rejeitadas (limitado às primeiras 1000)')]
+
+# --- Schemas das operações em lote (PATCH/DELETE de vários atletas) ---
+MAX_IDS_LOTE = 10000
+
+class AtletaLoteIn(BaseSchema):
+    ids: Annotated[Optional[list[UUID4]], Field(None, description='IDs dos atletas; combinados com os filtros de query, se houver', max_length=MAX_IDS_LOTE)]
+
+class AtletaLoteUpdate(AtletaLoteIn):
+    alteracoes: Annotated[AtletaUpdate, Field(description='Campos alterados em todos os atletas selecionados')]
+
+class ResultadoLote(BaseSchema):
+    id: Annotated[UUID4, Field(description='Identificador do atleta')]
+    status: Annotated[Literal['atualizado', 'removido', 'nao_encontrado'], Field(description='Resultado da operação para o atleta')]
+
+class LoteOut(BaseSchema):
+    total: Annotated[int, Field(0, description='Quantidade de atletas atualizados ou removidos')]
+    resultados: Annotated[list[ResultadoLote], Field(default_factory=list, description='Resultado por ID')]
+
+# --- Estatísticas agregadas dos atletas por categoria/centro de treinamento ---
+class EstatisticaAtletasOut(BaseSchema):
+    id: Annotated[UUID4, Field(description='Identificador da categoria ou do centro de treinamento')]
+    nome: Annotated[str, Field(description='Nome da categoria ou do centro de treinamento', example='Scale')]
+    total: Annotated[int, Field(description='Quantidade de atletas', example=42)]
+    idade_media: Annotated[Optional[float], Field(None, description='Idade média (nula sem atletas)', example=27.5)]
+    peso_medio: Annotated[Optional[float], Field(None, description='Peso médio (nulo sem atletas)', example=74.2)]
+    altura_media: Annotated[Optional[float], Field(None, description='Altura média (nula sem atletas)', example=1.72)]
+    total_masculino: Annotated[int, Field(description='Atletas com sexo M', example=20)]
+    total_feminino: Annotated[int, Field(description='Atletas com sexo F', example=22)]
@@ -0,0 +1,109 @@
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql import ColumnElement
+
+from workout_api.alteracoes.feed import registra_alteracoes
+from workout_api.atleta.estatisticas import recalcula_estatisticas
+from workout_api.atleta.filtros import AtletaFiltros, condicao_ids, condicoes_filtros
+from workout_api.atleta.models import AtletaModel
+from workout_api.configs.settings import settings
+from workout_api.contrib.object_cache import atleta_object_cache
+from workout_api.jobs.fila import ContextoJob, job_queue
+
+
+def _condicoes(db_session: AsyncSession, parametros: dict) -> list[ColumnElement[bool]]:
+    # Mesma seleção das rotas /atleta/lote: filtros de query e/ou lista de IDs, guardados como JSON no job
+    condicoes = condicoes_filtros(AtletaFiltros(**parametros["filtros"]))
+    if parametros.get("ids") is not None:
+        ids = [UUID(id) for id in parametros["ids"]]
+        condicoes.append(condicao_ids(ids, db_session.get_bind().dialect.name))
+    return condicoes
+
+
+#Aplica a operação em blocos de JOBS_CHUNK_SIZE atletas (um commit por bloco), percorrendo por pk_id.
+#Uma nova tentativa continua do último bloco confirmado, sem alterar de novo (nem gerar novos eventos) os anteriores
+async def _processa_em_blocos(contexto: ContextoJob, parametros: dict, monta: Callable, acao: str) -> dict:
+    async with contexto.session() as db_session:
+        condicoes = _condicoes(db_session, parametros)
+        if contexto.retomada is not None:
+            total, afetados, ultimo_pk = (contexto.retomada[k] for k in ("total", "afetados", "ultimo_pk"))
+        else:
+            total = (
+                await db_session.execute(select(func.count()).select_from(AtletaModel).where(*condicoes))
+            ).scalar_one()
+            await db_session.commit()
+            afetados = 0
+            ultimo_pk = 0
+        await contexto.progresso(afetados, max(total, afetados))
+
+        while True:
+            # O keyset por pk_id garante que cada atleta é visitado uma vez, mesmo que a alteração mude os filtros
+            bloco = (
+                select(AtletaModel.pk_id)
+                .where(*condicoes, AtletaModel.pk_id > ultimo_pk)
+                .order_by(AtletaModel.pk_id)
+                .limit(settings.JOBS_CHUNK_SIZE)
+            )
+            stmt = (
+                monta(AtletaModel.pk_id.in_(bloco))
+                .returning(AtletaModel.pk_id, AtletaModel.id, AtletaModel.version)
+                .execution_options(synchronize_session=False)
+            )
+            linhas = (await db_session.execute(stmt)).all()
+            if not linhas:
+                await db_session.commit()
+                break
+
+            await registra_alteracoes(db_session, "atleta", acao, [(linha.id, linha.version) for linha in linhas])
+            ultimo_pk = max(linha.pk_id for linha in linhas)
+            afetados += len(linhas)
+            await contexto.registra_retomada(
+                db_session, {"total": total, "afetados": afetados, "ultimo_pk": ultimo_pk}
+            )
+            await db_session.commit()
+            await atleta_object_cache.invalidate(*(linha.id for linha in linhas))
+            if len(linhas) < settings.JOBS_CHUNK_SIZE:
+                break
+            await contexto.progresso(afetados, max(total, afetados))
+
+    await contexto.progresso(afetados, max(total, afetados), cancelavel=False)
+    return {"total": afetados}
+
+
+#Versão em segundo plano do PATCH /atleta/lote (alteracoes já com categoria_id/centro_treinamento_id resolvidos)
+@job_queue.tarefa("atletas.lote.atualizar")
+async def atualizar_lote(contexto: ContextoJob, parametros: dict) -> dict:
+    return await _processa_em_blocos(
+        contexto,
+        parametros,
+        lambda selecao: update(AtletaModel)
+        .where(selecao)
+        .values(**parametros["alteracoes"], version=AtletaModel.version + 1),
+        "alterado",
+    )
+
+
+#Versão em segundo plano do DELETE /atleta/lote
+@job_queue.tarefa("atletas.lote.remover")
+async def remover_lote(contexto: ContextoJob, parametros: dict) -> dict:
+    return await _processa_em_blocos(
+        contexto, parametros, lambda selecao: delete(AtletaModel).where(selecao), "removido"
+    )
+
+
+#Reconstrói o resumo atletas_estatisticas (só existe no PostgreSQL; nos demais bancos é calculado na consulta)
+@job_queue.tarefa("estatisticas.recalcular")
+async def recalcular_estatisticas(contexto: ContextoJob, parametros: dict) -> dict:
+    async with contexto.session() as db_session:
+        if db_session.get_bind().dialect.name != "postgresql":
+            return {"recalculado": False, "grupos": 0}
+
+        await contexto.progresso(0, 1)
+        grupos = await recalcula_estatisticas(db_session)
+
+    await contexto.progresso(1, 1, cancelavel=False)
+    return {"recalculado": True, "grupos": grupos}
@@ -1,18 +1,32 @@
+from typing import Optional
 from uuid import uuid4
-from fastapi import APIRouter, Body, Depends, status, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, Query, Response, status, HTTPException
 from fastapi_pagination import LimitOffsetPage, paginate, LimitOffsetParams 
-from fastapi_pagination.ext.sqlalchemy import paginate
 from pydantic import UUID4
 
-from workout_api.atleta.models import AtletaModel
+from workout_api.alteracoes.feed import registra_alteracoes
+from workout_api.atleta.estatisticas import estatisticas_por
+from workout_api.atleta.schemas import EstatisticaAtletasOut
 from workout_api.categorias.models import CategoriaModel
 from workout_api.categorias.schemas import CategoriaIn, CategoriaOut, CategoriaUpdate
-from workout_api.contrib.dependencies import DatabaseDependency
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import categoria_cache
+from workout_api.contrib.dependencies import DatabaseDependency, ReadDatabaseDependency, ReadPrimaryDependency
+from workout_api.contrib.http_cache import parse_if_match, version_etag
+from workout_api.contrib.object_cache import CachedObject, cached_object, categoria_object_cache
+from workout_api.contrib.responses import FastJSONResponse, trusted_response
+from workout_api.contrib.pagination import CursorPage, CursorParams, ListingParams, cursor_paginate, paginate_listing
+from workout_api.contrib.referencias import Referencia, atualiza_referencia, deleta_referencia
 from sqlalchemy.future import select
-from sqlalchemy.exc import SQLAlchemyError
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
+
+#Edição e remoção compartilhadas com as demais tabelas de referência dos atletas
+CATEGORIA = Referencia(
+    model=CategoriaModel, entidade="categoria", descricao="categoria", feminino=True,
+    cache=categoria_cache, object_cache=categoria_object_cache,
+)
 
 #Cria nova categoria no banco de dados
 @router.post(
@@ -29,7 +43,9 @@ async def post(
         categoria_model = CategoriaModel(id=categoria_id, **categoria_in.model_dump())
 
         db_session.add(categoria_model)
+        await registra_alteracoes(db_session, "categoria", "criado", [(categoria_id, 1)])
         await db_session.commit()
+        categoria_cache.invalidate(categoria_model.nome)
         await db_session.refresh(
             categoria_model
         )  # Atualiza para obter valores padrão gerados pelo DB (ex: created_at)
@@ -50,36 +66,72 @@ async def post(
     status_code=status.HTTP_200_OK,
     response_model=LimitOffsetPage[CategoriaOut],
 )
-async def query_all_categories(db_session: DatabaseDependency, params: LimitOffsetParams = Depends()
+async def query_all_categories(db_session: ReadDatabaseDependency, params: ListingParams = Depends()
 ) -> LimitOffsetPage[CategoriaOut]:
     query = select(CategoriaModel)
 
-    return await paginate(db_session, query, params)
+    return trusted_response(
+        await paginate_listing(db_session, query, params), response_model=LimitOffsetPage[CategoriaOut]
+    )
 
-#realiza consulta especifica pelo ID
+#Consulta paginada por cursor (keyset), sem OFFSET e com contagem opcional
+@router.get(
+    "/cursor",
+    summary="Consultar todas as Categorias (paginação por cursor)",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[CategoriaOut],
+)
+async def query_all_categories_cursor(db_session: ReadDatabaseDependency, params: CursorParams = Depends()
+) -> CursorPage[CategoriaOut]:
+    query = select(CategoriaModel).order_by(CategoriaModel.pk_id)
+
+    return await cursor_paginate(db_session, query, params)
+
+#Estatísticas dos atletas por categoria (quantidade, médias e divisão por sexo), lidas do resumo pré-calculado
+@router.get(
+    "/estatisticas",
+    summary="Consultar estatísticas dos atletas por categoria",
+    status_code=status.HTTP_200_OK,
+    response_model=list[EstatisticaAtletasOut],
+)
+async def query_estatisticas_categoria(
+    db_session: ReadDatabaseDependency, response: Response
+) -> list[EstatisticaAtletasOut]:
+    # Muda a cada escrita em atletas: não herda o Cache-Control longo dos dados de referência
+    response.headers["Cache-Control"] = settings.CACHE_CONTROL_DEFAULT
+
+    return await estatisticas_por(db_session, CategoriaModel, "categoria_id")
+
+#realiza consulta especifica pelo ID (pelo cache; o banco só é consultado no miss)
 @router.get(
     "/{id}",
     summary="Consultar Categoria por ID",
     status_code=status.HTTP_200_OK,
     response_model=CategoriaOut,
 )
-async def get_category_by_id(id: UUID4, db_session: DatabaseDependency) -> CategoriaOut:
+async def get_category_by_id(id: UUID4, db_session: DatabaseDependency, ler_primario: ReadPrimaryDependency) -> Response:
+    # Miss lido do primário: o resultado vai para o cache compartilhado
+    async def carrega() -> Optional[CachedObject]:
+        categoria: CategoriaModel | None = (
+            (await db_session.execute(select(CategoriaModel).filter_by(id=id)))
+            .scalars()
+            .first()
+        )
+        if not categoria:
+            return None
 
-    categoria: CategoriaModel | None = (
-        (await db_session.execute(select(CategoriaModel).filter_by(id=id)))
-        .scalars()
-        .first()
-    )
+        return CachedObject(CategoriaOut.model_validate(categoria).model_dump_json().encode(), version_etag(categoria.version))
 
-    if not categoria:
+    item = await cached_object(categoria_object_cache, id, carrega, ler_primario)
+    if item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Categoria não encontrada no id: {id}",
         )
 
-    return CategoriaOut.model_validate(categoria) 
+    return item.response()
 
-#Realiza edição de uma categoria pelo ID
+#Realiza edição de uma categoria pelo ID com um único UPDATE ... RETURNING
 @router.patch(
     "/{id}",
     summary="Editar uma Categoria pelo ID",
@@ -87,33 +139,15 @@ async def get_category_by_id(id: UUID4, db_session: DatabaseDependency) -> Categ
     response_model=CategoriaOut,
 )
 async def patch_categoria_by_id(
-    id: UUID4, db_session: DatabaseDependency, categoria_up: CategoriaUpdate = Body(...)
+    id: UUID4,
+    db_session: DatabaseDependency,
+    response: Response,
+    categoria_up: CategoriaUpdate = Body(...),
+    if_match: Optional[str] = Header(None, description='ETag obtido no GET; responde 412 se a categoria foi alterada'),
 ) -> CategoriaOut:
-
-    categoria: CategoriaModel | None = (
-        await db_session.execute(select(CategoriaModel).filter_by(id=id))
-    ).scalars().first()
-
-    if not categoria:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Categoria não encontrado no id: {id}",
-        )
-
-    
-    categoria_update_data = categoria_up.model_dump(exclude_unset=True)
-    for key, value in categoria_update_data.items():
-        
-        if key == "categoria" and isinstance(value, dict) and "nome" in value:
-            
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Alteração de categoria por nome não implementada diretamente aqui.")
-        
-        else:
-            setattr(categoria, key, value)
-
-    await db_session.commit()
-    await db_session.refresh(categoria)
-
+    categoria = await atualiza_referencia(
+        CATEGORIA, db_session, response, id, categoria_up.model_dump(exclude_unset=True), parse_if_match(if_match)
+    )
     return CategoriaOut.model_validate(categoria)
 
 #Deleta categorias por ID
@@ -122,48 +156,11 @@ async def patch_categoria_by_id(
     summary="Deletar uma Categoria pelo ID", 
     status_code=status.HTTP_204_NO_CONTENT
 )
-async def delete_categoria_by_id(id: UUID4, db_session: DatabaseDependency) -> None:
-    # 1. Busca a categoria pelo ID
-    categoria: CategoriaModel | None = (
-        await db_session.execute(select(CategoriaModel).filter_by(id=id))
-    ).scalars().first()
-
-    # Verifica se a categoria existe
-    if not categoria:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Categoria não encontrada no id: {id}",
-        )
-
-    # 2. Verifica se existem atletas vinculados a esta categoria
-    atletas_vinculados = (
-        await db_session.execute(
-            select(AtletaModel).filter_by(categoria_id=categoria.pk_id) # Usamos pk_id da categoria para a consulta
-        )
-    ).scalars().all()
-
-    # 3. Se houver atletas vinculados, retorna um erro 409 Conflict
-    if atletas_vinculados:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Não é possível deletar a categoria '{categoria.nome}' "
-                   f"pois existem {len(atletas_vinculados)} atleta(s) vinculado(s) a ela. "
-                   "Por favor, mova todos os atletas para outra categoria antes de tentar deletar esta."
-        )
-
-    # 4. Se não houver atletas, procede com a deleção
-    try:
-        await db_session.delete(categoria)
-        await db_session.commit()
-    except SQLAlchemyError as e:
-        # Captura erros relacionados ao SQLAlchemy (ex: problemas de conexão, deadlock)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro no banco de dados ao deletar a categoria: {e}"
-        )
-    except Exception as e:
-        # Captura qualquer outra exceção inesperada
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ocorreu um erro inesperado ao deletar a categoria: {e}"
-        )
\ No newline at end of file
+async def delete_categoria_by_id(
+    id: UUID4,
+    db_session: DatabaseDependency,
+    mover_atletas_para: Optional[UUID4] = Query(
+        None, description='Move os atletas para esta categoria antes de deletar'
+    ),
+) -> None:
+    await deleta_referencia(CATEGORIA, db_session, id, mover_atletas_para)
@@ -1,4 +1,4 @@
-from typing import Annotated, Optional
+from typing import Annotated
 
 from pydantic import UUID4, Field
 from workout_api.contrib.schemas import BaseSchema
@@ -12,4 +12,5 @@ class CategoriaOut(CategoriaIn):
     id: Annotated[UUID4, Field(description='Identificador da categoria')]
 
 class CategoriaUpdate(BaseSchema):
-     nome: Annotated[Optional[str], Field(None, description='Nome da categoria', example='Scale', max_length=10)] 
\ No newline at end of file
+     # Opcional, mas não anulável: o default None só vale quando o campo é omitido
+     nome: Annotated[str, Field(None, description='Nome da categoria', example='Scale', max_length=10)] 
\ No newline at end of file
@@ -1,18 +1,32 @@
+from typing import Optional
 from uuid import uuid4
-from fastapi import APIRouter, Body, Depends, status, HTTPException
+from fastapi import APIRouter, Body, Depends, Header, Query, Response, status, HTTPException
 from fastapi_pagination import LimitOffsetPage, paginate, LimitOffsetParams 
-from fastapi_pagination.ext.sqlalchemy import paginate
 from pydantic import UUID4
 
-from workout_api.atleta.models import AtletaModel
+from workout_api.alteracoes.feed import registra_alteracoes
+from workout_api.atleta.estatisticas import estatisticas_por
+from workout_api.atleta.schemas import EstatisticaAtletasOut
 from workout_api.centro_treinamento.models import CentroTreinamentoModel
 from workout_api.centro_treinamento.schemas import CentroTreinamentoIn, CentroTreinamentoOut, CentroTreinamentoUpdate
-from workout_api.contrib.dependencies import DatabaseDependency
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import centro_treinamento_cache
+from workout_api.contrib.dependencies import DatabaseDependency, ReadDatabaseDependency, ReadPrimaryDependency
+from workout_api.contrib.http_cache import parse_if_match, version_etag
+from workout_api.contrib.object_cache import CachedObject, cached_object, centro_treinamento_object_cache
+from workout_api.contrib.responses import FastJSONResponse, trusted_response
+from workout_api.contrib.pagination import CursorPage, CursorParams, ListingParams, cursor_paginate, paginate_listing
+from workout_api.contrib.referencias import Referencia, atualiza_referencia, deleta_referencia
 from sqlalchemy.future import select
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
+
+#Edição e remoção compartilhadas com as demais tabelas de referência dos atletas
+CENTRO_TREINAMENTO = Referencia(
+    model=CentroTreinamentoModel, entidade="centro_treinamento", descricao="centro de treinamento", feminino=False,
+    cache=centro_treinamento_cache, object_cache=centro_treinamento_object_cache,
+)
 
 #Cria os centros de treinamento no banco
 @router.post(
@@ -29,7 +43,9 @@ async def post(
         centro_treinamento_model = CentroTreinamentoModel(id=centro_treinamento_id, **centro_treinamento_in.model_dump())
 
         db_session.add(centro_treinamento_model)
+        await registra_alteracoes(db_session, "centro_treinamento", "criado", [(centro_treinamento_id, 1)])
         await db_session.commit()
+        centro_treinamento_cache.invalidate(centro_treinamento_model.nome)
         await db_session.refresh(
             centro_treinamento_model
         )  # Atualiza para obter valores padrão gerados pelo DB (ex: created_at)
@@ -49,38 +65,75 @@ async def post(
     status_code=status.HTTP_200_OK,
     response_model=LimitOffsetPage[CentroTreinamentoOut],
 )
-async def query_all_categories(db_session: DatabaseDependency, params: LimitOffsetParams = Depends()
+async def query_all_categories(db_session: ReadDatabaseDependency, params: ListingParams = Depends()
 ) -> LimitOffsetPage[CentroTreinamentoOut]:
     query = select(CentroTreinamentoModel)
 
-    return await paginate(db_session, query, params)
+    return trusted_response(
+        await paginate_listing(db_session, query, params), response_model=LimitOffsetPage[CentroTreinamentoOut]
+    )
+
+#Consulta paginada por cursor (keyset), sem OFFSET e com contagem opcional
+@router.get(
+    "/cursor",
+    summary="Consultar todos os Centros de Treinamento (paginação por cursor)",
+    status_code=status.HTTP_200_OK,
+    response_model=CursorPage[CentroTreinamentoOut],
+)
+async def query_all_centros_treinamento_cursor(db_session: ReadDatabaseDependency, params: CursorParams = Depends()
+) -> CursorPage[CentroTreinamentoOut]:
+    query = select(CentroTreinamentoModel).order_by(CentroTreinamentoModel.pk_id)
+
+    return await cursor_paginate(db_session, query, params)
     
-#Consulta centro de treinamento pelo ID
+#Estatísticas dos atletas por centro de treinamento (quantidade, médias e divisão por sexo), lidas do resumo pré-calculado
+@router.get(
+    "/estatisticas",
+    summary="Consultar estatísticas dos atletas por centro de treinamento",
+    status_code=status.HTTP_200_OK,
+    response_model=list[EstatisticaAtletasOut],
+)
+async def query_estatisticas_centro_treinamento(
+    db_session: ReadDatabaseDependency, response: Response
+) -> list[EstatisticaAtletasOut]:
+    # Muda a cada escrita em atletas: não herda o Cache-Control longo dos dados de referência
+    response.headers["Cache-Control"] = settings.CACHE_CONTROL_DEFAULT
+
+    return await estatisticas_por(db_session, CentroTreinamentoModel, "centro_treinamento_id")
+
+#Consulta centro de treinamento pelo ID (pelo cache; o banco só é consultado no miss)
 @router.get(
     "/{id}",
     summary="Consultar Centro de Treinamento por ID",
     status_code=status.HTTP_200_OK,
     response_model=CentroTreinamentoOut,
 )
-async def get_category_by_id(id: UUID4, db_session: DatabaseDependency) -> CentroTreinamentoOut:
+async def get_category_by_id(id: UUID4, db_session: DatabaseDependency, ler_primario: ReadPrimaryDependency) -> Response:
+    # Miss lido do primário: o resultado vai para o cache compartilhado
+    async def carrega() -> Optional[CachedObject]:
+        centro_treinamento: CentroTreinamentoModel | None = (
+            (await db_session.execute(select(CentroTreinamentoModel).filter_by(id=id)))
+            .scalars()
+            .first()
+        )
+        if not centro_treinamento:
+            return None
 
-    centro_treinamento: CentroTreinamentoModel | None = (
-        (await db_session.execute(select(CentroTreinamentoModel).filter_by(id=id)))
-        .scalars()
-        .first()
-    )
+        return CachedObject(
+            CentroTreinamentoOut.model_validate(centro_treinamento).model_dump_json().encode(),
+            version_etag(centro_treinamento.version),
+        )
 
-    if not centro_treinamento:
+    item = await cached_object(centro_treinamento_object_cache, id, carrega, ler_primario)
+    if item is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Centro de Treinamento não encontrado no id: {id}",
         )
 
-    return CentroTreinamentoOut.model_validate(
-        centro_treinamento
-    )  
+    return item.response()
 
-#Edita centros de treinamento por ID
+#Edita centros de treinamento por ID com um único UPDATE ... RETURNING
 @router.patch(
     "/{id}",
     summary="Editar o Centro de Treinamento pelo ID",
@@ -88,57 +141,16 @@ async def get_category_by_id(id: UUID4, db_session: DatabaseDependency) -> Centr
     response_model=CentroTreinamentoOut,
 )
 async def patch_centro_treinamento_by_id(
-    id: UUID4, db_session: DatabaseDependency, centro_treinamento_up: CentroTreinamentoUpdate = Body(...)
+    id: UUID4,
+    db_session: DatabaseDependency,
+    response: Response,
+    centro_treinamento_up: CentroTreinamentoUpdate = Body(...),
+    if_match: Optional[str] = Header(None, description='ETag obtido no GET; responde 412 se o centro foi alterado'),
 ) -> CentroTreinamentoOut:
-
-    centro_treinamento: CentroTreinamentoModel | None = (
-        await db_session.execute(select(CentroTreinamentoModel).filter_by(id=id))
-    ).scalars().first()
-
-    if not centro_treinamento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Centro de treinamento não encontrado no id: {id}",
-        )
-
-    
-    # Prepara os dados para atualização
-
-    update_data = centro_treinamento_up.model_dump(exclude_unset=True)
-    
-    # Atualiza os campos do objeto SQLAlchemy
-    for key, value in update_data.items():
-        setattr(centro_treinamento, key, value)
-    
-    try:
-        await db_session.commit()
-        await db_session.refresh(centro_treinamento) # Atualiza o objeto com os dados do DB
-
-        
-        return CentroTreinamentoOut.model_validate(centro_treinamento) 
-    except IntegrityError as e:
-       
-        if "centros_treinamento_nome_key" in str(e.orig): 
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Já existe um centro de treinamento com o nome '{centro_treinamento_up.nome}'."
-            )
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Erro de integridade ao atualizar centro de treinamento: {e.orig}"
-        )
-    except SQLAlchemyError as e:
-        # Captura outros erros do SQLAlchemy (conexão, etc.)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro no banco de dados ao atualizar o centro de treinamento: {e}"
-        )
-    except Exception as e:
-        # Captura qualquer outra exceção inesperada
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ocorreu um erro inesperado ao atualizar o centro de treinamento: {e}"
-        )
+    centro_treinamento = await atualiza_referencia(
+        CENTRO_TREINAMENTO, db_session, response, id, centro_treinamento_up.model_dump(exclude_unset=True), parse_if_match(if_match)
+    )
+    return CentroTreinamentoOut.model_validate(centro_treinamento)
 
 #Deleta centro de treinamento
 @router.delete(
@@ -146,46 +158,11 @@ async def patch_centro_treinamento_by_id(
     summary="Deletar um Centro de Treinamento pelo ID", 
     status_code=status.HTTP_204_NO_CONTENT
 )
-async def delete_centro_treinamento_by_id(id: UUID4, db_session: DatabaseDependency) -> None:
-    # 1. Busca o centro de treinamento pelo ID
-    centro_treinamento: CentroTreinamentoModel | None = (
-        await db_session.execute(select(CentroTreinamentoModel).filter_by(id=id))
-    ).scalars().first()
-
-    # Verifica se o centro de treinamento existe
-    if not centro_treinamento:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Centro de treinamento não encontrado no id: {id}",
-        )
-
-    # 2. Verifica se existem atletas vinculados a este centro de treinamento
-    atletas_vinculados = (
-        await db_session.execute(
-            select(AtletaModel).filter_by(centro_treinamento_id=centro_treinamento.pk_id) 
-        )
-    ).scalars().all()
-
-    # 3. Se houver atletas vinculados, retorna um erro 409 Conflict
-    if atletas_vinculados:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Não é possível deletar o centro de treinamento '{centro_treinamento.nome}' "
-                   f"pois existem {len(atletas_vinculados)} atleta(s) vinculado(s) a ele. "
-                   "Por favor, mova todos os atletas para outro centro de treinamento antes de tentar deletar este."
-        )
-
-    # 4. Se não houver atletas, procede com a deleção
-    try:
-        await db_session.delete(centro_treinamento)
-        await db_session.commit()
-    except SQLAlchemyError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Erro no banco de dados ao deletar o centro de treinamento: {e}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Ocorreu um erro inesperado ao deletar o centro de treinamento: {e}"
-        )
\ No newline at end of file
+async def delete_centro_treinamento_by_id(
+    id: UUID4,
+    db_session: DatabaseDependency,
+    mover_atletas_para: Optional[UUID4] = Query(
+        None, description='Move os atletas para este centro de treinamento antes de deletar'
+    ),
+) -> None:
+    await deleta_referencia(CENTRO_TREINAMENTO, db_session, id, mover_atletas_para)
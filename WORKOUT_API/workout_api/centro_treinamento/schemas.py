@@ -1,4 +1,4 @@
-from typing import Annotated, Optional
+from typing import Annotated
 
 from pydantic import UUID4, Field
 from workout_api.contrib.schemas import BaseSchema
@@ -17,6 +17,7 @@ class CentroTreinamentoOut(CentroTreinamentoIn):
     id: Annotated[UUID4, Field(description='Identificador do centro de treinamento')]
 
 class CentroTreinamentoUpdate(BaseSchema):
-    nome: Annotated[Optional[str], Field(None, description='Nome do centro de treinamento', example='CT King', max_length=20)] 
-    endereco: Annotated[Optional[str], Field(None, description='Endereço do centro de treinamento', example='Rua x, Q02', max_length=60)] 
-    proprietario: Annotated[Optional[str], Field(None, description='Proprietario do centro de treinamento', example='Marcos', max_length=30)] 
\ No newline at end of file
+    # Opcionais, mas não anuláveis: o default None só vale quando o campo é omitido
+    nome: Annotated[str, Field(None, description='Nome do centro de treinamento', example='CT King', max_length=20)] 
+    endereco: Annotated[str, Field(None, description='Endereço do centro de treinamento', example='Rua x, Q02', max_length=60)] 
+    proprietario: Annotated[str, Field(None, description='Proprietario do centro de treinamento', example='Marcos', max_length=30)] 
\ No newline at end of file
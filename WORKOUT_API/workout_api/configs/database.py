@@ -1,15 +1,251 @@
-from typing import AsyncGenerator
+import asyncio
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from itertools import count
+from time import perf_counter, time
+from typing import Any, AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from workout_api.configs.settings import settings
 
 
-engine = create_async_engine(settings.DB_URL, echo=False)
+READ_PRIMARY_HEADER = 'X-Read-Primary'
+READ_PRIMARY_COOKIE = 'read_primary_until'
+
+logger = logging.getLogger(__name__)
+
+
+# --- Pool que mede o tempo de espera por uma conexão (inclui pre-ping e abertura de novas conexões) ---
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def connect(self):
+        inicio = perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            espera = perf_counter() - inicio
+            self.checkouts += 1
+            self.wait_time_total += espera
+            self.wait_time_max = max(self.wait_time_max, espera)
+
+    def metrics(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_time_total": round(self.wait_time_total, 6),
+            "wait_time_avg": round(self.wait_time_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "wait_time_max": round(self.wait_time_max, 6),
+        }
+
+
+# --- Estatísticas das consultas SQL da requisição corrente (preenchidas pelos eventos do engine) ---
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar('query_stats', default=None)
+
+# Totais do processo, expostos em /metrics
+db_totals = {"queries": 0, "time": 0.0, "slow_queries": 0}
+
+
+def _redact(parameters: Any) -> Any:
+    # Nunca registra valores (CPF, nomes...): só a forma dos parâmetros
+    if isinstance(parameters, dict):
+        return {chave: '?' for chave in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'<{len(parameters)} linhas>'
+        return ['?'] * len(parameters)
+    return '?'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._query_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    inicio = getattr(context, '_query_start', None)
+    if inicio is None:
+        return
+    duracao = perf_counter() - inicio
+
+    db_totals["queries"] += 1
+    db_totals["time"] += duracao
+
+    stats = query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_time += duracao
+        if duracao > stats.slowest_time:
+            stats.slowest_time = duracao
+            stats.slowest_statement = statement
+
+    if settings.DB_SLOW_QUERY_MS and duracao * 1000 >= settings.DB_SLOW_QUERY_MS:
+        db_totals["slow_queries"] += 1
+        logger.warning(
+            "Consulta lenta (%.1f ms): %s | parâmetros: %s", duracao * 1000, statement, _redact(parameters)
+        )
+
+
+def _connect_args(url: str) -> dict:
+    if not url.startswith('postgresql+asyncpg'):
+        return {}
+
+    connect_args = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return connect_args
+
+
+# --- Orçamento de conexões: DB_MAX_CONNECTIONS dividido entre os workers da instância ---
+JOBS_POOL_OVERFLOW = 2
+
+
+def conexoes_fixas_por_worker() -> int:
+    # Pool dos jobs e a conexão do LISTEN do feed de alterações, abertos por todo worker
+    listen = settings.ALTERACOES_ENABLED and settings.ALTERACOES_NOTIFY and settings.DB_URL.startswith('postgresql+asyncpg')
+    return settings.JOBS_CONCURRENCY + JOBS_POOL_OVERFLOW + int(listen)
+
+
+#Pool das requisições de cada worker: DB_POOL_SIZE/DB_MAX_OVERFLOW quando definidos, senão a parte do orçamento
+#que sobra para ele (2/3 mantidas abertas, 1/3 de overflow), limitada a 20 + 10
+def pool_por_worker(workers: int) -> tuple[int, int]:
+    livres = settings.DB_MAX_CONNECTIONS // workers - conexoes_fixas_por_worker()
+    pool_size = settings.DB_POOL_SIZE if settings.DB_POOL_SIZE is not None else min(max(livres * 2 // 3, 1), 20)
+    max_overflow = settings.DB_MAX_OVERFLOW if settings.DB_MAX_OVERFLOW is not None else min(max(livres - pool_size, 0), 10)
+    return pool_size, max_overflow
+
+
+# Fora do launcher (ex: uvicorn --reload) SERVER_WORKERS=0 vale como um único processo
+_pool_size, _max_overflow = pool_por_worker(settings.SERVER_WORKERS or 1)
+
+
+def _create_engine(url: str, pool_size: Optional[int] = None, max_overflow: Optional[int] = None) -> AsyncEngine:
+    async_engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedPool,
+        pool_size=_pool_size if pool_size is None else pool_size,
+        max_overflow=_max_overflow if max_overflow is None else max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(url),
+    )
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    return async_engine
+
+
+engine = _create_engine(settings.DB_URL)
 async_session = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+replica_engines = [_create_engine(url) for url in settings.DB_REPLICA_URLS]
+replica_sessions = [
+    sessionmaker(replica, class_=AsyncSession, expire_on_commit=False) for replica in replica_engines
+]
+# Estado de cada réplica, mantido pela verificação periódica (e não por uma sondagem a cada requisição)
+replica_saudavel = [True] * len(replica_engines)
+_round_robin = count()
+
+
+def _marca_replica_indisponivel(indice: int):
+    def handle_error(context) -> None:
+        # Falha ao conectar ou conexão perdida: sai do rodízio já, sem esperar a próxima verificação
+        if (context.connection is None or context.is_disconnect) and replica_saudavel[indice]:
+            logger.warning("Réplica %d indisponível; leituras seguem para as demais ou para o primário", indice)
+            replica_saudavel[indice] = False
+    return handle_error
+
+
+for _indice, _replica in enumerate(replica_engines):
+    event.listen(_replica.sync_engine, "handle_error", _marca_replica_indisponivel(_indice))
+
+
+async def _verifica_replica(indice: int) -> bool:
+    try:
+        async with asyncio.timeout(settings.DB_REPLICA_HEALTH_INTERVAL):
+            async with replica_engines[indice].connect() as conn:
+                await conn.execute(text('SELECT 1'))
+        return True
+    except (SQLAlchemyError, OSError, TimeoutError):
+        return False
+
+
+#Verifica as réplicas a cada DB_REPLICA_HEALTH_INTERVAL e devolve ao rodízio as que voltaram a responder
+async def verifica_replicas() -> None:
+    query_stats.set(None)
+    while True:
+        for indice in range(len(replica_engines)):
+            saudavel = await _verifica_replica(indice)
+            if saudavel != replica_saudavel[indice]:
+                logger.warning("Réplica %d %s", indice, "disponível" if saudavel else "indisponível")
+            replica_saudavel[indice] = saudavel
+        await asyncio.sleep(settings.DB_REPLICA_HEALTH_INTERVAL)
+
+# Pool próprio dos jobs em segundo plano: trabalho pesado não disputa as conexões das requisições
+jobs_engine = _create_engine(settings.DB_URL, pool_size=settings.JOBS_CONCURRENCY, max_overflow=JOBS_POOL_OVERFLOW)
+jobs_session = sessionmaker(jobs_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+#Fábrica de sessões de leitura: uma réplica disponível ou, sem nenhuma, o primário (também usada fora de uma dependência, ex: exportação em streaming)
+def read_sessionmaker() -> sessionmaker:
+    disponiveis = [i for i, saudavel in enumerate(replica_saudavel) if saudavel]
+    if not disponiveis:
+        return async_session
+    if settings.DB_REPLICA_STRATEGY == 'least_connections':
+        return replica_sessions[min(disponiveis, key=lambda i: replica_engines[i].pool.checkedout())]
+    return replica_sessions[disponiveis[next(_round_robin) % len(disponiveis)]]
+
+
+def must_read_primary(request: Request) -> bool:
+    # Read-your-writes: header explícito ou janela curta (cookie) após uma escrita do mesmo cliente
+    if request.headers.get(READ_PRIMARY_HEADER, '').lower() in ('1', 'true'):
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time()
+    except ValueError:
+        return False
+
+
 async def get_session() -> AsyncGenerator:
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+#Sessão somente leitura: usa uma réplica disponível quando configurada, senão o primário.
+#A conexão só é aberta na primeira consulta (sem sondar a réplica a cada requisição)
+async def get_read_session(request: Request) -> AsyncGenerator:
+    fabrica = async_session if must_read_primary(request) else read_sessionmaker()
+    async with fabrica() as session:
+        yield session
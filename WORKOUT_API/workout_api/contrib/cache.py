@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Hashable, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from workout_api.configs.settings import settings
+
+
+# --- Cache LRU com tempo de vida, para tabelas pequenas e raramente alteradas ---
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._dados: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, chave: Hashable) -> Optional[Any]:
+        item = self._dados.get(chave)
+        if item is None or item[1] < monotonic():
+            self._dados.pop(chave, None)
+            self.misses += 1
+            return None
+
+        self._dados.move_to_end(chave)
+        self.hits += 1
+        return item[0]
+
+    def set(self, chave: Hashable, valor: Any) -> None:
+        self._dados[chave] = (valor, monotonic() + self.ttl)
+        self._dados.move_to_end(chave)
+        while len(self._dados) > self.maxsize:
+            self._dados.popitem(last=False)
+
+    def invalidate(self, *chaves: Hashable) -> None:
+        for chave in chaves:
+            self._dados.pop(chave, None)
+
+    def clear(self) -> None:
+        self._dados.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._dados)}
+
+
+categoria_cache = TTLCache(settings.LOOKUP_CACHE_MAXSIZE, settings.LOOKUP_CACHE_TTL)
+centro_treinamento_cache = TTLCache(settings.LOOKUP_CACHE_MAXSIZE, settings.LOOKUP_CACHE_TTL)
+
+
+#Resolve vários nomes para pk_id, consultando o banco apenas para os que não estão no cache
+async def resolve_pk_ids(db_session: AsyncSession, model, cache: TTLCache, nomes: Iterable[str]) -> dict[str, int]:
+    encontrados: dict[str, int] = {}
+    faltantes = set()
+    for nome in set(nomes):
+        pk_id = cache.get(nome)
+        if pk_id is None:
+            faltantes.add(nome)
+        else:
+            encontrados[nome] = pk_id
+
+    if faltantes:
+        resultado = await db_session.execute(
+            select(model.nome, model.pk_id).where(model.nome.in_(faltantes))
+        )
+        for nome, pk_id in resultado.all():
+            cache.set(nome, pk_id)
+            encontrados[nome] = pk_id
+
+    return encontrados
+
+
+#Resolve um único nome para pk_id (None se não existir)
+async def resolve_pk_id(db_session: AsyncSession, model, cache: TTLCache, nome: str) -> Optional[int]:
+    return (await resolve_pk_ids(db_session, model, cache, [nome])).get(nome)
@@ -0,0 +1,186 @@
+import zlib
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.settings import settings
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele o br não é oferecido
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional; sem ele o zstd não é oferecido
+    zstandard = None
+
+
+# Tipos de conteúdo que valem a compressão (SSE fica de fora: cada evento precisa chegar na hora)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/problem+json", "text/csv", "text/plain", "text/html")
+
+
+class _Gzip:
+    def __init__(self) -> None:
+        # wbits=31: formato gzip (cabeçalho + CRC), não o zlib cru
+        self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, dados: bytes) -> bytes:
+        return self._obj.compress(dados)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _Brotli:
+    def __init__(self) -> None:
+        self._obj = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, dados: bytes) -> bytes:
+        return self._obj.process(dados)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self) -> None:
+        self._obj = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, dados: bytes) -> bytes:
+        return self._obj.compress(dados)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+# Codificações disponíveis, na ordem de preferência do servidor para empates de q
+ENCODERS: dict[str, Callable] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _Zstd
+if brotli is not None:
+    ENCODERS["br"] = _Brotli
+ENCODERS["gzip"] = _Gzip
+
+
+def compress(encoding: str, dados: bytes) -> bytes:
+    compressor = ENCODERS[encoding]()
+    return compressor.compress(dados) + compressor.finish()
+
+
+#Escolhe a codificação pelo Accept-Encoding (maior q; empate decidido pela ordem de ENCODERS)
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+
+    pesos: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        nome, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        pesos[nome.strip().lower()] = q
+
+    melhor, melhor_q = None, 0.0
+    for encoding in ENCODERS:
+        q = pesos.get(encoding, pesos.get("*", 0.0))
+        if q > melhor_q:
+            melhor, melhor_q = encoding, q
+    return melhor
+
+
+def _compressible(headers: Headers) -> bool:
+    return headers.get("content-type", "").split(";")[0].strip() in COMPRESSIBLE_TYPES and "content-encoding" not in headers
+
+
+# --- Middleware ASGI: compressão negociada (zstd/br/gzip) acima de um tamanho mínimo ---
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        inicio: Message | None = None
+        repassar = False
+        compressor = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal inicio, repassar, compressor
+            if repassar:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if message["status"] in (204, 304) or not _compressible(headers):
+                    repassar = True
+                    await send(message)
+                    return
+                # A representação varia com o Accept-Encoding mesmo quando esta resposta sai sem compressão
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    repassar = True
+                    await send(message)
+                    return
+                inicio = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                # Resposta inteira em uma mensagem: abaixo do mínimo não compensa o custo
+                if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                    repassar = True
+                    await send(inicio)
+                    await send(message)
+                    return
+
+                headers = MutableHeaders(raw=inicio["headers"])
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["content-length"]
+                # O corpo comprimido não é o mesmo byte a byte: um ETag forte vira fraco
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                compressor = ENCODERS[encoding]()
+
+                if not more_body:
+                    corpo = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(corpo))
+                    await send(inicio)
+                    await send({"type": "http.response.body", "body": corpo})
+                    return
+
+                # Streaming (ex: exportação): comprime pedaço a pedaço, sem Content-Length
+                await send(inicio)
+
+            # Cada pedaço sai decodificável na hora (flush de sincronização), em vez de ficar retido no compressor
+            corpo = compressor.compress(body)
+            if not more_body:
+                corpo += compressor.finish()
+            elif body:
+                corpo += compressor.flush()
+            if corpo or not more_body:
+                await send({"type": "http.response.body", "body": corpo, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,114 @@
+import hashlib
+import re
+from typing import Optional
+
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.settings import settings
+
+
+# Uma entity-tag da lista do If-Match: "valor" ou W/"valor" (o ETag das versões nunca contém vírgula)
+_ENTITY_TAG = re.compile(r'\s*(W/)?"([^"]*)"\s*')
+
+# Prefixos com dados quase estáticos, que podem ser guardados por CDN/clientes
+REFERENCE_PREFIXES = ("/categorias", "/centro_treinamento")
+
+
+def _etag(corpo: bytes) -> str:
+    return f'W/"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+
+
+def _if_none_match(valor: str, etag: str) -> bool:
+    if valor.strip() == "*":
+        return True
+    # Comparação fraca: ignora o prefixo W/
+    alvo = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == alvo for tag in valor.split(","))
+
+
+#ETag forte a partir das versões das linhas que compõem a representação (a primeira é a do próprio recurso)
+def version_etag(*versoes: int) -> str:
+    return '"' + ".".join(str(versao) for versao in versoes) + '"'
+
+
+#Extrai as versões aceitas pelo header If-Match (None quando ausente ou "*"). Comparação forte (RFC 9110):
+#tags fracas (W/) e tags que não são deste servidor nunca casam, e a lista casa se qualquer uma das tags casar.
+#Uma lista vazia não casa com nada (412)
+def parse_if_match(if_match: Optional[str]) -> Optional[list[int]]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+
+    versoes = []
+    for tag in if_match.split(","):
+        casamento = _ENTITY_TAG.fullmatch(tag)
+        if casamento is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Header If-Match inválido: {if_match}",
+            )
+        fraca, valor = casamento.groups()
+        versao = valor.split(".")[0]
+        if not fraca and versao.isdigit():
+            versoes.append(int(versao))
+    return versoes
+
+
+# --- Middleware ASGI: ETag, GET condicional (304) e Cache-Control para respostas JSON ---
+class ETagMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        cache_control = (
+            settings.CACHE_CONTROL_REFERENCE if scope["path"].startswith(REFERENCE_PREFIXES) else settings.CACHE_CONTROL_DEFAULT
+        )
+        inicio: Message | None = None
+        repassar = False
+        corpo: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal inicio, repassar
+            if repassar:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                # Só bufferiza JSON 200; streaming (exportação, SSE) e erros passam direto
+                if message["status"] != 200 or not headers.get("content-type", "").startswith("application/json"):
+                    repassar = True
+                    await send(message)
+                    return
+                inicio = message
+                return
+
+            corpo.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(corpo)
+            headers = MutableHeaders(raw=inicio["headers"])
+            # Respeita o ETag definido pelo endpoint (ex: baseado na coluna version)
+            etag = headers.get("etag") or _etag(body)
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = cache_control
+
+            if if_none_match and _if_none_match(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            await send(inicio)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,21 @@
 from uuid import uuid4
-from sqlalchemy import UUID
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy import UUID, Integer
+from sqlalchemy.orm import DeclarativeBase, Mapped, declared_attr, mapped_column
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
 
-class BaseModel(DeclarativeBase):
-    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), default=uuid4, nullable=False)
\ No newline at end of file
+# Base declarativa sem colunas comuns (mesmo metadata): tabelas internas como jobs e alteracoes
+class Base(DeclarativeBase):
+    pass
+
+
+class BaseModel(Base):
+    __abstract__ = True
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), default=uuid4, nullable=False, unique=True, index=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default='1')
+
+    # Controle de concorrência otimista: o ORM inclui "version = :v" em UPDATE/DELETE e incrementa a versão
+    @declared_attr.directive
+    def __mapper_args__(cls) -> dict:
+        return {"version_id_col": cls.version}
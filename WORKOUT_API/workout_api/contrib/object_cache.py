@@ -0,0 +1,293 @@
+import asyncio
+import logging
+from time import monotonic
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import Response
+
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import TTLCache
+
+try:
+    from redis import asyncio as redis
+except ImportError:  # redis é opcional; sem ele só há os backends em memória
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Representação já serializada de um GET /{id}: corpo JSON + ETag ---
+class CachedObject(NamedTuple):
+    body: bytes
+    etag: str
+
+    def to_bytes(self) -> bytes:
+        # O ETag nunca contém quebra de linha: ela separa os dois campos no backend compartilhado
+        return self.etag.encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, dados: bytes) -> "CachedObject":
+        etag, _, body = dados.partition(b"\n")
+        return cls(body, etag.decode())
+
+    def response(self) -> Response:
+        return Response(content=self.body, media_type="application/json", headers={"ETag": self.etag})
+
+
+# --- Backends da camada compartilhada (valores em bytes, com tempo de vida) ---
+class MemoryBackend:
+    """Substituto local do backend compartilhado (testes e desenvolvimento com um único processo)."""
+
+    def __init__(self) -> None:
+        self._dados: dict[str, tuple[bytes, float]] = {}
+
+    async def get(self, chave: str) -> Optional[bytes]:
+        item = self._dados.get(chave)
+        if item is None or item[1] < monotonic():
+            self._dados.pop(chave, None)
+            return None
+        return item[0]
+
+    async def get_many(self, chaves: list[str]) -> list[Optional[bytes]]:
+        return [await self.get(chave) for chave in chaves]
+
+    async def set(self, chave: str, valor: bytes, ttl: float) -> None:
+        self._dados[chave] = (valor, monotonic() + ttl)
+
+    async def set_many(self, itens: dict[str, bytes], ttl: float) -> None:
+        for chave, valor in itens.items():
+            await self.set(chave, valor, ttl)
+
+    async def delete(self, *chaves: str) -> None:
+        for chave in chaves:
+            self._dados.pop(chave, None)
+
+    async def clear(self, prefixo: str) -> None:
+        for chave in [chave for chave in self._dados if chave.startswith(prefixo)]:
+            del self._dados[chave]
+
+
+class RedisBackend:
+    """Backend compartilhado entre workers/instâncias (pacote redis)."""
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("OBJECT_CACHE_BACKEND_URL aponta para o Redis, mas o pacote 'redis' não está instalado.")
+        self._cliente = redis.from_url(url)
+
+    async def get(self, chave: str) -> Optional[bytes]:
+        return await self._cliente.get(chave)
+
+    async def get_many(self, chaves: list[str]) -> list[Optional[bytes]]:
+        return await self._cliente.mget(chaves)
+
+    async def set(self, chave: str, valor: bytes, ttl: float) -> None:
+        await self._cliente.set(chave, valor, px=int(ttl * 1000))
+
+    async def set_many(self, itens: dict[str, bytes], ttl: float) -> None:
+        # Um único round trip (pipeline) em vez de um SET por chave
+        async with self._cliente.pipeline(transaction=False) as pipe:
+            for chave, valor in itens.items():
+                pipe.set(chave, valor, px=int(ttl * 1000))
+            await pipe.execute()
+
+    async def delete(self, *chaves: str) -> None:
+        if chaves:
+            await self._cliente.unlink(*chaves)
+
+    async def clear(self, prefixo: str) -> None:
+        # SCAN incremental: não bloqueia o Redis como o KEYS; usado só em renomeações (raras)
+        lote = []
+        async for chave in self._cliente.scan_iter(match=f"{prefixo}*", count=1000):
+            lote.append(chave)
+            if len(lote) >= 1000:
+                await self._cliente.unlink(*lote)
+                lote = []
+        if lote:
+            await self._cliente.unlink(*lote)
+
+
+def backend_from_url(url: str):
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"OBJECT_CACHE_BACKEND_URL não suportada: {url}")
+
+
+# --- Cache em duas camadas (LRU local + backend compartilhado) com single-flight por chave ---
+class ObjectCache:
+    def __init__(self, namespace: str, backend=None) -> None:
+        self.namespace = namespace
+        self.backend = backend
+        self.local = TTLCache(settings.OBJECT_CACHE_LOCAL_MAXSIZE, settings.OBJECT_CACHE_LOCAL_TTL)
+        self.shared_hits = 0
+        self.coalesced = 0
+        self._em_voo: dict[str, asyncio.Future] = {}
+        self._invalidacoes = 0
+
+    def _chave(self, id) -> str:
+        return f"{self.namespace}:{id}"
+
+    async def _backend(self, operacao: str, *args):
+        # Falha no backend compartilhado não derruba a requisição: segue como cache miss
+        try:
+            return await getattr(self.backend, operacao)(*args)
+        except Exception as e:
+            logger.warning("Falha no cache compartilhado (%s %s): %s", operacao, self.namespace, e)
+            return None
+
+    async def _carrega(self, chave: str, loader: Callable[[], Awaitable[Optional[CachedObject]]]) -> Optional[CachedObject]:
+        if self.backend is not None:
+            dados = await self._backend("get", chave)
+            if dados is not None:
+                self.shared_hits += 1
+                item = CachedObject.from_bytes(dados)
+                self.local.set(chave, item)
+                return item
+
+        invalidacoes = self._invalidacoes
+        item = await loader()
+        # Inexistentes não são guardados; se houve escrita durante a carga, o valor lido pode já estar velho
+        if item is None or invalidacoes != self._invalidacoes:
+            return item
+
+        self.local.set(chave, item)
+        if self.backend is not None:
+            await self._backend("set", chave, item.to_bytes(), settings.OBJECT_CACHE_TTL)
+        return item
+
+    #Devolve a representação em cache ou carrega pelo loader; falhas simultâneas da mesma chave viram uma única carga
+    async def get_or_load(self, id, loader: Callable[[], Awaitable[Optional[CachedObject]]]) -> Optional[CachedObject]:
+        chave = self._chave(id)
+        item = self.local.get(chave)
+        if item is not None:
+            return item
+
+        voo = self._em_voo.get(chave)
+        if voo is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(voo)
+            except asyncio.CancelledError:
+                if not voo.cancelled():
+                    raise
+                # A requisição que carregava foi cancelada (ex: cliente desconectou): carrega por conta própria
+                return await self.get_or_load(id, loader)
+
+        voo = asyncio.get_running_loop().create_future()
+        # Evita o aviso de exceção não lida quando ninguém estava esperando
+        voo.add_done_callback(lambda futuro: futuro.cancelled() or futuro.exception())
+        self._em_voo[chave] = voo
+        try:
+            item = await self._carrega(chave, loader)
+        except asyncio.CancelledError:
+            voo.cancel()
+            raise
+        except Exception as e:
+            voo.set_exception(e)
+            raise
+        finally:
+            self._em_voo.pop(chave, None)
+
+        voo.set_result(item)
+        return item
+
+    #Versão para vários IDs (ex: GET /atleta/batch): as falhas são carregadas juntas por loader_many
+    async def get_many_or_load(
+        self, ids: list, loader_many: Callable[[list], Awaitable[dict]]
+    ) -> dict:
+        resultado: dict = {}
+        faltantes = []
+        for id in ids:
+            item = self.local.get(self._chave(id))
+            if item is None:
+                faltantes.append(id)
+            else:
+                resultado[id] = item
+
+        if faltantes and self.backend is not None:
+            dados = await self._backend("get_many", [self._chave(id) for id in faltantes])
+            if dados is not None:
+                restantes = []
+                for id, valor in zip(faltantes, dados):
+                    if valor is None:
+                        restantes.append(id)
+                        continue
+                    self.shared_hits += 1
+                    resultado[id] = CachedObject.from_bytes(valor)
+                    self.local.set(self._chave(id), resultado[id])
+                faltantes = restantes
+
+        if not faltantes:
+            return resultado
+
+        invalidacoes = self._invalidacoes
+        carregados = await loader_many(faltantes)
+        novos = {}
+        for id in faltantes:
+            resultado[id] = item = carregados.get(id)
+            if item is not None and invalidacoes == self._invalidacoes:
+                self.local.set(self._chave(id), item)
+                novos[self._chave(id)] = item.to_bytes()
+
+        if novos and self.backend is not None:
+            await self._backend("set_many", novos, settings.OBJECT_CACHE_TTL)
+        return resultado
+
+    #Grava a representação recém-escrita (write-through), ex: após o POST
+    async def set(self, id, item: CachedObject) -> None:
+        chave = self._chave(id)
+        self.local.set(chave, item)
+        if self.backend is not None:
+            await self._backend("set", chave, item.to_bytes(), settings.OBJECT_CACHE_TTL)
+
+    #Remove as representações alteradas; chamar depois do commit
+    async def invalidate(self, *ids) -> None:
+        self._invalidacoes += 1
+        chaves = [self._chave(id) for id in ids]
+        self.local.invalidate(*chaves)
+        if self.backend is not None and chaves:
+            await self._backend("delete", *chaves)
+
+    #Descarta o namespace inteiro (ex: renomeação de categoria muda a representação de todos os seus atletas)
+    async def clear(self) -> None:
+        self._invalidacoes += 1
+        self.local.clear()
+        if self.backend is not None:
+            await self._backend("clear", f"{self.namespace}:")
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "shared_hits": self.shared_hits, "coalesced": self.coalesced}
+
+
+#Responde pelo cache (se OBJECT_CACHE_ENABLED) ou direto pelo loader; None quando o registro não existe.
+#O loader deve ler do primário: o que ele devolve vai para a camada compartilhada, e uma réplica atrasada gravaria
+#ali uma versão anterior à última escrita (já invalidada) por OBJECT_CACHE_TTL. ignora_cache=True (read-your-writes)
+#vai direto ao loader, sem o LRU local de cada worker, que só é invalidado no worker que fez a escrita
+async def cached_object(
+    cache: ObjectCache, id, loader: Callable[[], Awaitable[Optional[CachedObject]]], ignora_cache: bool = False
+) -> Optional[CachedObject]:
+    if not settings.OBJECT_CACHE_ENABLED or ignora_cache:
+        return await loader()
+    return await cache.get_or_load(id, loader)
+
+
+#Versão de cached_object para vários IDs; o dicionário devolvido tem None para os inexistentes
+async def cached_objects(
+    cache: ObjectCache, ids: list, loader_many: Callable[[list], Awaitable[dict]], ignora_cache: bool = False
+) -> dict:
+    if not settings.OBJECT_CACHE_ENABLED or ignora_cache:
+        carregados = await loader_many(ids)
+        return {id: carregados.get(id) for id in ids}
+    return await cache.get_many_or_load(ids, loader_many)
+
+
+# Um namespace por recurso; o backend compartilhado (se houver) é o mesmo para todos
+_backend = backend_from_url(settings.OBJECT_CACHE_BACKEND_URL)
+atleta_object_cache = ObjectCache("workout:atleta", _backend)
+categoria_object_cache = ObjectCache("workout:categoria", _backend)
+centro_treinamento_object_cache = ObjectCache("workout:centro_treinamento", _backend)
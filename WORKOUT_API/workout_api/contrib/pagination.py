@@ -0,0 +1,206 @@
+import asyncio
+import base64
+import logging
+from time import monotonic
+from typing import Annotated, Generic, Literal, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query, status
+from fastapi_pagination import LimitOffsetPage, LimitOffsetParams
+from fastapi_pagination.bases import RawParams
+from fastapi_pagination.ext.sqlalchemy import apaginate
+from pydantic import BaseModel, Field
+from sqlakeyset import BadBookmark, serialize_bookmark, unserialize_bookmark
+from sqlakeyset.asyncio import select_page
+from sqlalchemy import Join, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from workout_api.configs.database import async_session
+from workout_api.configs.settings import settings
+from workout_api.contrib.cache import TTLCache
+
+
+T = TypeVar('T')
+
+
+# --- Parâmetros de paginação por cursor (keyset) ---
+class CursorParams(BaseModel):
+    size: int = Query(50, ge=1, le=500, description='Quantidade de itens por página')
+    cursor: Optional[str] = Query(None, description='Token opaco de próxima/anterior página')
+    include_total: bool = Query(False, description='Inclui o total de registros (executa COUNT)')
+
+
+# --- Página de resultados paginada por cursor ---
+class CursorPage(BaseModel, Generic[T]):
+    items: Sequence[T]
+    next_cursor: Annotated[Optional[str], Field(None, description='Token para a próxima página')]
+    previous_cursor: Annotated[Optional[str], Field(None, description='Token para a página anterior')]
+    total: Annotated[Optional[int], Field(None, description='Total de registros, se solicitado')]
+
+
+def _encode_cursor(bookmark: str) -> str:
+    return base64.urlsafe_b64encode(bookmark.encode()).decode().rstrip('=')
+
+
+#Decodifica o cursor recebido; ValueError (inclui binascii.Error e UnicodeDecodeError) se estiver malformado
+def _decode_cursor(cursor: str) -> str:
+    padding = '=' * (-len(cursor) % 4)
+    # urlsafe_b64decode ignora caracteres fora do alfabeto; validate=True os recusa
+    bookmark = base64.b64decode(cursor + padding, altchars=b'-_', validate=True).decode()
+    if not bookmark:
+        raise ValueError("Cursor sem keyset")
+    return bookmark
+
+
+#Pagina a consulta por keyset. A query DEVE estar ordenada por uma chave única e indexada (ex: pk_id)
+async def cursor_paginate(db_session: AsyncSession, query: Select, params: CursorParams) -> dict:
+    try:
+        marker = unserialize_bookmark(_decode_cursor(params.cursor)) if params.cursor else None
+    except (BadBookmark, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor de paginação inválido: {params.cursor}",
+        )
+
+    page = await select_page(db_session, query, per_page=params.size, page=marker)
+
+    total = None
+    if params.include_total:
+        # A contagem só é feita quando pedida explicitamente, evitando o COUNT(*) em toda página
+        total = (
+            await db_session.execute(
+                select(func.count()).select_from(query.order_by(None).subquery())
+            )
+        ).scalar_one()
+
+    paging = page.paging
+    return {
+        "items": [row[0] for row in page],
+        "next_cursor": _encode_cursor(serialize_bookmark(paging.next)) if paging.has_next else None,
+        "previous_cursor": _encode_cursor(serialize_bookmark(paging.previous)) if paging.has_previous else None,
+        "total": total,
+    }
+
+
+# --- Listagens limit/offset com modo de cálculo do total configurável ---
+TotalMode = Literal['exact', 'estimated', 'cached', 'none']
+
+
+class ListingParams(LimitOffsetParams):
+    total_mode: Optional[TotalMode] = Query(
+        None, description='Cálculo do total: exact, estimated, cached ou none (padrão: LISTING_TOTAL_MODE)'
+    )
+
+    @property
+    def resolved_total_mode(self) -> TotalMode:
+        return self.total_mode or settings.LISTING_TOTAL_MODE
+
+    def to_raw_params(self) -> RawParams:
+        # Só deixa o fastapi-pagination executar o COUNT(*) exato quando pedido
+        raw_params = super().to_raw_params()
+        raw_params.include_total = self.resolved_total_mode == 'exact'
+        return raw_params
+
+
+# Totais em cache por consulta; entradas vencidas continuam servindo enquanto são recalculadas em segundo plano
+logger = logging.getLogger(__name__)
+
+_totais = TTLCache(maxsize=1024, ttl=settings.LISTING_TOTAL_CACHE_TTL * 10)
+_atualizacoes: dict[str, asyncio.Task] = {}
+
+
+def _count_query(query: Select) -> Select:
+    return select(func.count()).select_from(query.order_by(None).subquery())
+
+
+def _chave_total(count_query: Select) -> str:
+    compilado = count_query.compile()
+    return f"{compilado}|{sorted(compilado.params.items())!r}"
+
+
+async def _atualiza_total(chave: str, count_query: Select) -> None:
+    try:
+        async with async_session() as session:
+            total = (await session.execute(count_query)).scalar_one()
+        _totais.set(chave, (total, monotonic()))
+    finally:
+        _atualizacoes.pop(chave, None)
+
+
+def _registra_falha_total(tarefa: asyncio.Task) -> None:
+    # Ninguém aguarda a atualização em segundo plano: sem isto a falha só apareceria como aviso no coletor de lixo
+    if not tarefa.cancelled() and tarefa.exception() is not None:
+        logger.error("Falha ao recalcular o total em cache da listagem", exc_info=tarefa.exception())
+
+
+async def cached_total(db_session: AsyncSession, query: Select) -> int:
+    count_query = _count_query(query)
+    chave = _chave_total(count_query)
+
+    item = _totais.get(chave)
+    if item is None:
+        total = (await db_session.execute(count_query)).scalar_one()
+        _totais.set(chave, (total, monotonic()))
+        return total
+
+    total, calculado_em = item
+    if monotonic() - calculado_em > settings.LISTING_TOTAL_CACHE_TTL and chave not in _atualizacoes:
+        tarefa = asyncio.create_task(_atualiza_total(chave, count_query))
+        tarefa.add_done_callback(_registra_falha_total)
+        _atualizacoes[chave] = tarefa
+    return total
+
+
+#Tabela principal da consulta: a da esquerda dos JOINs (as listagens só juntam referências N:1, que não mudam
+#a contagem). None quando não há uma única origem que seja tabela (ex: subconsulta)
+def _tabela_base(query: Select) -> Optional[Table]:
+    origens = query.get_final_froms()
+    if len(origens) != 1:
+        return None
+    origem = origens[0]
+    while isinstance(origem, Join):
+        origem = origem.left
+    return origem if isinstance(origem, Table) else None
+
+
+async def estimated_total(db_session: AsyncSession, query: Select) -> int:
+    # reltuples só vale para a tabela inteira no PostgreSQL; nos demais casos usa o total em cache
+    if db_session.get_bind().dialect.name != 'postgresql' or query.whereclause is not None:
+        return await cached_total(db_session, query)
+
+    tabela = _tabela_base(query)
+    if tabela is None:
+        return await cached_total(db_session, query)
+    estimativa = (
+        await db_session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:tabela)"),
+            {"tabela": tabela.fullname},
+        )
+    ).scalar()
+
+    # -1 indica tabela ainda não analisada (sem estatísticas)
+    if estimativa is None or estimativa < 0:
+        return await cached_total(db_session, query)
+    return estimativa
+
+
+#Calcula o total da consulta conforme o modo escolhido (None quando desativado)
+async def listing_total(db_session: AsyncSession, query: Select, modo: TotalMode) -> Optional[int]:
+    if modo == 'exact':
+        return (await db_session.execute(_count_query(query))).scalar_one()
+    if modo == 'estimated':
+        return await estimated_total(db_session, query)
+    if modo == 'cached':
+        return await cached_total(db_session, query)
+    return None
+
+
+#Pagina por limit/offset e preenche o total conforme o modo escolhido
+async def paginate_listing(db_session: AsyncSession, query: Select, params: ListingParams) -> LimitOffsetPage:
+    page = await apaginate(db_session, query, params)
+
+    modo = params.resolved_total_mode
+    if modo != 'exact':
+        # No modo exact o COUNT(*) já foi feito pelo fastapi-pagination
+        page.total = await listing_total(db_session, query, modo)
+    return page
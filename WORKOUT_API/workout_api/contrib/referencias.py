@@ -0,0 +1,237 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, Response, status
+from pydantic import UUID4
+from sqlalchemy import delete, func, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from workout_api.alteracoes.feed import registra_alteracoes
+from workout_api.atleta.models import AtletaModel
+from workout_api.contrib.cache import TTLCache
+from workout_api.contrib.http_cache import version_etag
+from workout_api.contrib.object_cache import ObjectCache, atleta_object_cache
+
+
+# --- Tabelas de referência dos atletas (categorias e centros de treinamento): edição e remoção ---
+@dataclass(frozen=True)
+class Referencia:
+    model: type
+    entidade: str  # Nome no feed de alterações e prefixo da FK em atletas (categoria -> categoria_id)
+    descricao: str  # Nome usado nas mensagens (categoria, centro de treinamento)
+    feminino: bool
+    cache: TTLCache
+    object_cache: ObjectCache
+
+    @property
+    def coluna_atleta(self):
+        return getattr(AtletaModel, f"{self.entidade}_id")
+
+    # Flexões de gênero das mensagens: a/o, uma/um, esta/este, ela/ele
+    @property
+    def _o(self) -> str:
+        return "a" if self.feminino else "o"
+
+    @property
+    def _um(self) -> str:
+        return "uma" if self.feminino else "um"
+
+    @property
+    def _este(self) -> str:
+        return "esta" if self.feminino else "este"
+
+    @property
+    def _ele(self) -> str:
+        return "ela" if self.feminino else "ele"
+
+    @property
+    def titulo(self) -> str:
+        return self.descricao.capitalize()
+
+    def nao_encontrado(self, id) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{self.titulo} não encontrad{self._o} no id: {id}",
+        )
+
+
+#Identifica a coluna da restrição violada: 'nome' (unique) ou None para as demais
+def _constraint_violada(referencia: Referencia, e: IntegrityError) -> Optional[str]:
+    tabela = referencia.model.__tablename__
+    # asyncpg guarda o nome na exceção original (__cause__); psycopg, em diag
+    nome = getattr(e.orig.__cause__, "constraint_name", None) or getattr(
+        getattr(e.orig, "diag", None), "constraint_name", None
+    )
+    if nome:
+        # Nome padrão do PostgreSQL: categorias_nome_key, centros_treinamento_nome_key
+        return "nome" if nome == f"{tabela}_nome_key" else None
+
+    return "nome" if f"{tabela}.nome" in str(e.orig).lower() else None
+
+
+#Edita o registro com um único UPDATE ... RETURNING, condicionado às versões do If-Match
+async def atualiza_referencia(
+    referencia: Referencia,
+    db_session: AsyncSession,
+    response: Response,
+    id: UUID4,
+    update_data: dict,
+    versoes: Optional[list[int]],
+):
+    model = referencia.model
+    o = referencia._o
+
+    # Condiciona o UPDATE à versão informada no If-Match e incrementa a versão
+    stmt = (
+        update(model)
+        .where(model.id == id)
+        .values(**update_data, version=model.version + 1)
+        .returning(*model.__table__.c)
+        .execution_options(synchronize_session=False)
+    )
+    if versoes is not None:
+        stmt = stmt.where(model.version.in_(versoes))
+
+    try:
+        registro = (await db_session.execute(stmt)).first()
+        if registro is not None:
+            await registra_alteracoes(db_session, referencia.entidade, "alterado", [(id, registro.version)])
+        await db_session.commit()
+    except IntegrityError as e:
+        await db_session.rollback()
+        if _constraint_violada(referencia, e) == "nome":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Já existe {referencia._um} {referencia.descricao} com o nome '{update_data['nome']}'."
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Erro de integridade ao atualizar {o} {referencia.descricao}: {e.orig}"
+        )
+    except SQLAlchemyError as e:
+        # Captura outros erros do SQLAlchemy (conexão, etc.)
+        await db_session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro no banco de dados ao atualizar {o} {referencia.descricao}: {e}"
+        )
+
+    # Nenhuma linha atualizada: o registro não existe ou a versão informada está desatualizada
+    if registro is None:
+        existe = (
+            await db_session.execute(select(select(model.pk_id).filter_by(id=id).exists()))
+        ).scalar()
+        if not existe:
+            raise referencia.nao_encontrado(id)
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{o.upper()} {referencia.descricao} {id} foi alterad{o} por outra requisição. "
+                   f"Consulte-{o} novamente e reenvie a alteração.",
+        )
+
+    if "nome" in update_data:
+        # O nome anterior não volta no RETURNING; renomeações são raras, então descarta o cache inteiro
+        referencia.cache.clear()
+
+    # A representação (e o ETag) dos atletas inclui os dados de categoria/centro: descarta também os atletas
+    await referencia.object_cache.invalidate(id)
+    await atleta_object_cache.clear()
+
+    response.headers["ETag"] = version_etag(registro.version)
+    return registro
+
+#Deleta o registro se não houver atletas vinculados, opcionalmente movendo-os antes para `mover_atletas_para`
+async def deleta_referencia(
+    referencia: Referencia,
+    db_session: AsyncSession,
+    id: UUID4,
+    mover_atletas_para: Optional[UUID4],
+) -> None:
+    model = referencia.model
+    coluna_atleta = referencia.coluna_atleta
+    o = referencia._o
+
+    # 1. Se pedido, move todos os atletas para o destino com um único UPDATE em lote (na mesma transação)
+    if mover_atletas_para is not None:
+        if mover_atletas_para == id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"O destino dos atletas deve ser diferente d{o} {referencia.descricao} a ser deletad{o}.",
+            )
+
+        destino_pk = (
+            await db_session.execute(select(model.pk_id).filter_by(id=mover_atletas_para))
+        ).scalar()
+        if destino_pk is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{referencia.titulo} de destino não encontrad{o} no id: {mover_atletas_para}",
+            )
+
+        movidos = (
+            await db_session.execute(
+                update(AtletaModel)
+                .where(coluna_atleta == select(model.pk_id).filter_by(id=id).scalar_subquery())
+                .values({coluna_atleta: destino_pk, AtletaModel.version: AtletaModel.version + 1})
+                .returning(AtletaModel.id, AtletaModel.version)
+                .execution_options(synchronize_session=False)
+            )
+        ).all()
+
+    # 2. Deleta somente se não houver atletas vinculados, em um único DELETE ... WHERE NOT EXISTS ... RETURNING
+    vinculados = select(AtletaModel.pk_id).where(coluna_atleta == model.pk_id)
+    stmt = (
+        delete(model)
+        .where(model.id == id, ~vinculados.exists())
+        .returning(model.nome, model.version)
+        .execution_options(synchronize_session=False)
+    )
+
+    try:
+        removido = (await db_session.execute(stmt)).first()
+        if removido is not None:
+            if mover_atletas_para is not None:
+                await registra_alteracoes(db_session, "atleta", "alterado", movidos)
+            await registra_alteracoes(db_session, referencia.entidade, "removido", [(id, removido.version)])
+            await db_session.commit()
+            referencia.cache.invalidate(removido.nome)
+            await referencia.object_cache.invalidate(id)
+            if mover_atletas_para is not None:
+                await atleta_object_cache.clear()
+            return
+        await db_session.rollback()
+    except IntegrityError:
+        # Um atleta foi vinculado entre o UPDATE e o DELETE
+        await db_session.rollback()
+    except SQLAlchemyError as e:
+        # Captura erros relacionados ao SQLAlchemy (ex: problemas de conexão, deadlock)
+        await db_session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro no banco de dados ao deletar {o} {referencia.descricao}: {e}"
+        )
+
+    # 3. Nada foi deletado: diferencia registro inexistente de registro com atletas vinculados
+    registro = (
+        await db_session.execute(
+            select(
+                model.nome,
+                select(func.count()).where(coluna_atleta == model.pk_id).scalar_subquery(),
+            )
+            .filter_by(id=id)
+        )
+    ).first()
+
+    if not registro:
+        raise referencia.nao_encontrado(id)
+
+    nome, total_vinculados = registro
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Não é possível deletar {o} {referencia.descricao} '{nome}' "
+               f"pois existem {total_vinculados} atleta(s) vinculado(s) a {referencia._ele}. "
+               f"Por favor, mova todos os atletas para outr{o} {referencia.descricao} antes de tentar deletar {referencia._este} "
+               "(ou informe mover_atletas_para)."
+    )
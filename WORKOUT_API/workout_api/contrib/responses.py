@@ -0,0 +1,54 @@
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from workout_api.configs.settings import settings
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usa o json da biblioteca padrão
+    orjson = None
+
+
+def _default(valor: Any) -> Any:
+    # Chamado só para tipos que o serializador não conhece (no orjson, UUID e datetime já são nativos)
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json")
+    return jsonable_encoder(valor)
+
+
+# --- Resposta JSON rápida: modelos Pydantic pelo serializador do pydantic-core, o resto pelo orjson ---
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            # Serializa direto para bytes, sem passar por dict + json.dumps
+            return content.model_dump_json().encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _adapter(tipo: Any) -> TypeAdapter:
+    return TypeAdapter(tipo)
+
+
+#Responde sem a revalidação + json.dumps do response_model (se JSON_TRUSTED_OUTPUT estiver ativo).
+#Com response_model, o conteúdo (ex: página com objetos do ORM) é validado uma única vez a partir dos atributos
+def trusted_response(content: Any, response: Optional[Response] = None, response_model: Any = None) -> Any:
+    if not settings.JSON_TRUSTED_OUTPUT:
+        return content
+
+    if response_model is not None:
+        content = _adapter(response_model).validate_python(content, from_attributes=True)
+
+    rapida = FastJSONResponse(content)
+    if response is not None and "etag" in response.headers:
+        # Headers definidos no parâmetro Response não são copiados quando o endpoint devolve a própria Response
+        rapida.headers["ETag"] = response.headers["etag"]
+    return rapida
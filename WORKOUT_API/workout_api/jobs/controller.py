@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, status
+from pydantic import UUID4
+
+from workout_api.contrib.responses import FastJSONResponse
+from workout_api.jobs.fila import job_queue
+from workout_api.jobs.schemas import JobOut
+
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+#Consulta o estado e o progresso de um job em segundo plano
+@router.get(
+    "/{id}",
+    summary="Consultar Job pelo ID",
+    status_code=status.HTTP_200_OK,
+    response_model=JobOut,
+)
+async def get_job_by_id(id: UUID4) -> JobOut:
+    job = await job_queue.obtem(id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job não encontrado no id: {id}",
+        )
+
+    return JobOut.model_validate(job)
+
+#Cancela um job: se pendente, na hora; se em execução, ao terminar o bloco atual (as alterações já gravadas permanecem)
+@router.delete(
+    "/{id}",
+    summary="Cancelar um Job pelo ID",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobOut,
+)
+async def cancel_job_by_id(id: UUID4) -> JobOut:
+    job = await job_queue.cancela(id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job não encontrado no id: {id}",
+        )
+    if job.status in ("concluido", "falhou"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"O job {id} já foi finalizado ({job.status}) e não pode ser cancelado.",
+        )
+
+    return JobOut.model_validate(job)
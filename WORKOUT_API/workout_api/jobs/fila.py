@@ -0,0 +1,392 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID, uuid4
+
+from fastapi import status
+from sqlalchemy import event, insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from workout_api.configs.database import jobs_session
+from workout_api.configs.settings import settings
+from workout_api.contrib.responses import FastJSONResponse
+from workout_api.jobs.models import JobModel
+from workout_api.jobs.schemas import JobOut
+
+
+logger = logging.getLogger(__name__)
+
+STATUS_FINAIS = ("concluido", "falhou", "cancelado")
+
+
+class JobCancelado(Exception):
+    """Levantada por ContextoJob.progresso quando o cancelamento do job foi pedido."""
+
+
+class JobPerdido(Exception):
+    """Levantada quando o lease do job expirou e outro worker o assumiu (tentativa diferente da desta execução)."""
+
+
+# --- Registro de um job (backend memory; no backend database as linhas da tabela jobs têm os mesmos campos) ---
+@dataclass
+class Job:
+    tipo: str
+    parametros: dict
+    id: UUID = field(default_factory=uuid4)
+    status: str = "pendente"
+    feito: int = 0
+    total: Optional[int] = None
+    tentativas: int = 0
+    resultado: Optional[dict] = None
+    erro: Optional[str] = None
+    cancelamento_solicitado: bool = False
+    retomada: Optional[dict] = None
+    criado_em: datetime = field(default_factory=datetime.now)
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    disponivel_em: datetime = field(default_factory=datetime.now)
+
+
+# --- Backend memory: jobs do próprio processo, perdidos ao reiniciar ---
+class MemoryJobStore:
+    def __init__(self) -> None:
+        self._jobs: dict[UUID, Job] = {}
+
+    def _descarta_antigos(self) -> None:
+        finalizados = [job.id for job in self._jobs.values() if job.status in STATUS_FINAIS]
+        for id in finalizados[: max(len(finalizados) - settings.JOBS_HISTORY, 0)]:
+            del self._jobs[id]
+
+    async def cria(self, job: Job) -> Job:
+        self._descarta_antigos()
+        self._jobs[job.id] = job
+        return job
+
+    async def obtem(self, id: UUID) -> Optional[Job]:
+        return self._jobs.get(id)
+
+    async def claim(self) -> Optional[Job]:
+        agora = datetime.now()
+        for job in self._jobs.values():
+            if job.status == "pendente" and job.disponivel_em <= agora:
+                job.status, job.iniciado_em, job.tentativas = "executando", agora, job.tentativas + 1
+                return job
+        return None
+
+    async def atualiza(self, id: UUID, **campos) -> None:
+        job = self._jobs[id]
+        for campo, valor in campos.items():
+            setattr(job, campo, valor)
+
+    def _em_execucao(self, id: UUID, tentativa: int) -> Optional[Job]:
+        job = self._jobs.get(id)
+        return job if job is not None and job.status == "executando" and job.tentativas == tentativa else None
+
+    async def progresso(self, id: UUID, tentativa: int, feito: int, total: Optional[int]) -> bool:
+        job = self._em_execucao(id, tentativa)
+        if job is None:
+            raise JobPerdido()
+        job.feito = feito
+        if total is not None:
+            job.total = total
+        return job.cancelamento_solicitado
+
+    async def heartbeat(self, id: UUID, tentativa: int) -> bool:
+        return self._em_execucao(id, tentativa) is not None
+
+    async def registra_retomada(self, db_session: AsyncSession, id: UUID, tentativa: int, retomada: dict) -> None:
+        if self._em_execucao(id, tentativa) is None:
+            raise JobPerdido()
+
+        # Sem a tabela jobs, o ponto de retomada só vale depois que o bloco for confirmado
+        def confirma(session) -> None:
+            job = self._em_execucao(id, tentativa)
+            if job is not None:
+                job.retomada = retomada
+
+        event.listen(db_session.sync_session, "after_commit", confirma, once=True)
+
+    async def cancela(self, id: UUID) -> Optional[Job]:
+        job = self._jobs.get(id)
+        if job is not None and job.status == "pendente":
+            job.status, job.concluido_em = "cancelado", datetime.now()
+        elif job is not None and job.status == "executando":
+            job.cancelamento_solicitado = True
+        return job
+
+
+# --- Backend database: tabela jobs, visível a todos os workers e retomada após reinícios ---
+class DatabaseJobStore:
+    def __init__(self, session_factory: sessionmaker) -> None:
+        self._session = session_factory
+        self._colunas = JobModel.__table__.c
+
+    async def _executa(self, stmt):
+        async with self._session() as db_session:
+            # Direto na conexão (Core): só as instruções com RETURNING/SELECT devolvem linhas
+            resultado = await (await db_session.connection()).execute(stmt)
+            linha = resultado.first() if resultado.returns_rows else None
+            await db_session.commit()
+            return linha
+
+    async def cria(self, job: Job) -> Job:
+        valores = {campo: getattr(job, campo) for campo in Job.__dataclass_fields__}
+        await self._executa(insert(JobModel).values(**valores))
+        return job
+
+    async def obtem(self, id: UUID):
+        return await self._executa(select(*self._colunas).where(JobModel.id == id))
+
+    async def claim(self):
+        agora = datetime.now()
+        # Pendentes disponíveis ou 'executando' sem sinal de vida (worker que caiu); SKIP LOCKED evita disputa entre workers
+        proximo = (
+            select(JobModel.pk_id)
+            .where(
+                or_(
+                    (JobModel.status == "pendente") & (JobModel.disponivel_em <= agora),
+                    (JobModel.status == "executando")
+                    & (JobModel.heartbeat_em < agora - timedelta(seconds=settings.JOBS_LEASE_TIMEOUT)),
+                )
+            )
+            .order_by(JobModel.pk_id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        return await self._executa(
+            update(JobModel)
+            .where(JobModel.pk_id == proximo)
+            .values(status="executando", iniciado_em=agora, heartbeat_em=agora, tentativas=JobModel.tentativas + 1)
+            .returning(*self._colunas)
+        )
+
+    async def atualiza(self, id: UUID, **campos) -> None:
+        await self._executa(update(JobModel).where(JobModel.id == id).values(**campos))
+
+    def _em_execucao(self, id: UUID, tentativa: int):
+        # A tentativa identifica o dono do lease: o claim de outro worker a incrementa
+        return update(JobModel).where(
+            JobModel.id == id, JobModel.status == "executando", JobModel.tentativas == tentativa
+        )
+
+    async def progresso(self, id: UUID, tentativa: int, feito: int, total: Optional[int]) -> bool:
+        valores = {"feito": feito, "heartbeat_em": datetime.now()}
+        if total is not None:
+            valores["total"] = total
+        linha = await self._executa(
+            self._em_execucao(id, tentativa).values(**valores).returning(JobModel.cancelamento_solicitado)
+        )
+        if linha is None:
+            raise JobPerdido()
+        return linha.cancelamento_solicitado
+
+    async def heartbeat(self, id: UUID, tentativa: int) -> bool:
+        linha = await self._executa(
+            self._em_execucao(id, tentativa).values(heartbeat_em=datetime.now()).returning(JobModel.pk_id)
+        )
+        return linha is not None
+
+    async def registra_retomada(self, db_session: AsyncSession, id: UUID, tentativa: int, retomada: dict) -> None:
+        # Na transação do bloco: o ponto de retomada é confirmado junto com as alterações, e um worker que perdeu
+        # o lease desfaz o bloco em vez de gravá-lo de novo
+        resultado = await (await db_session.connection()).execute(
+            self._em_execucao(id, tentativa).values(retomada=retomada)
+        )
+        if resultado.rowcount == 0:
+            raise JobPerdido()
+
+    async def cancela(self, id: UUID):
+        # Pendente: cancela na hora. Executando: sinaliza, e o job para no próximo registro de progresso
+        linha = await self._executa(
+            update(JobModel)
+            .where(JobModel.id == id, JobModel.status == "pendente")
+            .values(status="cancelado", concluido_em=datetime.now())
+            .returning(*self._colunas)
+        )
+        if linha is None:
+            linha = await self._executa(
+                update(JobModel)
+                .where(JobModel.id == id, JobModel.status == "executando")
+                .values(cancelamento_solicitado=True)
+                .returning(*self._colunas)
+            )
+        return linha or await self.obtem(id)
+
+
+# --- Contexto entregue às tarefas: sessão do pool dos jobs, registro de progresso e ponto de retomada ---
+class ContextoJob:
+    def __init__(self, store, job) -> None:
+        self.id = job.id
+        self.tentativa = job.tentativas
+        # Último ponto registrado por uma tentativa anterior (None na primeira execução)
+        self.retomada: Optional[dict] = job.retomada
+        self._store = store
+
+    def session(self):
+        return jobs_session()
+
+    #Registra o progresso; levanta JobCancelado se o cancelamento foi pedido (chamar entre transações).
+    #No último registro, com o trabalho já gravado, use cancelavel=False
+    async def progresso(self, feito: int, total: Optional[int] = None, cancelavel: bool = True) -> None:
+        if await self._store.progresso(self.id, self.tentativa, feito, total) and cancelavel:
+            raise JobCancelado()
+
+    #Grava, na transação do bloco e antes do commit, de onde uma nova tentativa deve continuar.
+    #Levanta JobPerdido se outro worker assumiu o job
+    async def registra_retomada(self, db_session: AsyncSession, retomada: dict) -> None:
+        await self._store.registra_retomada(db_session, self.id, self.tentativa, retomada)
+
+
+Tarefa = Callable[[ContextoJob, dict], Awaitable[Optional[dict]]]
+
+
+# --- Fila de jobs: concorrência limitada (JOBS_CONCURRENCY por worker), novas tentativas e cancelamento ---
+class JobQueue:
+    def __init__(self) -> None:
+        self.store = None
+        self._tarefas: dict[str, Tarefa] = {}
+        self._workers: list[asyncio.Task] = []
+        self._novo = asyncio.Event()
+        # Resultado de cada execução ('nova_tentativa' = falhou e voltou para a fila), exposto em /metrics
+        self.execucoes = {"concluido": 0, "nova_tentativa": 0, "falhou": 0, "cancelado": 0, "perdido": 0}
+
+    #Registra a função que executa um tipo de job
+    def tarefa(self, tipo: str) -> Callable[[Tarefa], Tarefa]:
+        def registra(funcao: Tarefa) -> Tarefa:
+            self._tarefas[tipo] = funcao
+            return funcao
+        return registra
+
+    def _store(self):
+        if self.store is None:
+            self.store = DatabaseJobStore(jobs_session) if settings.JOBS_BACKEND == "database" else MemoryJobStore()
+        return self.store
+
+    async def start(self) -> None:
+        self._store()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(settings.JOBS_CONCURRENCY)]
+
+    async def stop(self) -> None:
+        # Jobs interrompidos voltam para 'pendente' (no backend database, outro worker retoma)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enfileira(self, tipo: str, parametros: dict) -> Job:
+        job = await self._store().cria(Job(tipo=tipo, parametros=parametros))
+        self._novo.set()
+        return job
+
+    async def obtem(self, id: UUID):
+        return await self._store().obtem(id)
+
+    async def cancela(self, id: UUID):
+        return await self._store().cancela(id)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await self.store.claim()
+            except Exception:
+                logger.exception("Falha ao buscar o próximo job")
+                job = None
+
+            if job is None:
+                self._novo.clear()
+                try:
+                    await asyncio.wait_for(self._novo.wait(), settings.JOBS_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Uma falha ao registrar o desfecho (ex.: banco fora do ar) não pode derrubar o worker; o job fica
+            # 'executando' e, no backend database, volta para a fila quando o lease expira
+            try:
+                await self._executa(job)
+            except Exception:
+                logger.exception("Falha ao executar o job %s (%s)", job.id, job.tipo)
+
+    async def _heartbeat(self, job) -> None:
+        # Mantém o job como vivo mesmo em passos longos sem registro de progresso. Retorna quando o lease foi perdido
+        # (outro worker assumiu o job) ou não pôde ser renovado antes de expirar, e então a execução é interrompida
+        intervalo = settings.JOBS_LEASE_TIMEOUT / 3
+        renovado = time.monotonic()
+        while True:
+            await asyncio.sleep(intervalo)
+            try:
+                if not await self.store.heartbeat(job.id, job.tentativas):
+                    logger.warning("Job %s assumido por outro worker", job.id)
+                    return
+                renovado = time.monotonic()
+            except Exception:
+                logger.exception("Falha ao renovar o lease do job %s", job.id)
+                if time.monotonic() - renovado + intervalo >= settings.JOBS_LEASE_TIMEOUT:
+                    logger.warning("Lease do job %s expira antes da próxima renovação; interrompendo", job.id)
+                    return
+
+    async def _executa(self, job) -> None:
+        tarefa = self._tarefas.get(job.tipo)
+        if tarefa is None:
+            await self.store.atualiza(
+                job.id, status="falhou", erro=f"Tipo de job desconhecido: {job.tipo}", concluido_em=datetime.now()
+            )
+            return
+
+        execucao = asyncio.create_task(tarefa(ContextoJob(self.store, job), job.parametros))
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await asyncio.wait((execucao, heartbeat), return_when=asyncio.FIRST_COMPLETED)
+            if not execucao.done():
+                # Lease perdido: o bloco em andamento é desfeito e o registro do job fica com quem o assumiu
+                execucao.cancel()
+                await asyncio.gather(execucao, return_exceptions=True)
+                raise JobPerdido()
+            resultado = execucao.result()
+        except JobCancelado:
+            self.execucoes["cancelado"] += 1
+            await self.store.atualiza(job.id, status="cancelado", concluido_em=datetime.now())
+        except JobPerdido:
+            self.execucoes["perdido"] += 1
+            logger.warning("Job %s (%s) interrompido: lease perdido na tentativa %s", job.id, job.tipo, job.tentativas)
+        except asyncio.CancelledError:
+            execucao.cancel()
+            await asyncio.gather(execucao, return_exceptions=True)
+            await self.store.atualiza(job.id, status="pendente", tentativas=job.tentativas - 1)
+            raise
+        except Exception as e:
+            logger.exception("Falha no job %s (%s), tentativa %s", job.id, job.tipo, job.tentativas)
+            if job.tentativas <= settings.JOBS_MAX_RETRIES:
+                self.execucoes["nova_tentativa"] += 1
+                espera = settings.JOBS_RETRY_BACKOFF * 2 ** (job.tentativas - 1)
+                await self.store.atualiza(
+                    job.id, status="pendente", erro=str(e), disponivel_em=datetime.now() + timedelta(seconds=espera)
+                )
+            else:
+                self.execucoes["falhou"] += 1
+                await self.store.atualiza(job.id, status="falhou", erro=str(e), concluido_em=datetime.now())
+        else:
+            self.execucoes["concluido"] += 1
+            await self.store.atualiza(
+                job.id, status="concluido", resultado=resultado, erro=None, concluido_em=datetime.now()
+            )
+        finally:
+            heartbeat.cancel()
+
+
+job_queue = JobQueue()
+
+
+#Resposta 202 de uma operação enviada para a fila, apontando para o acompanhamento em /jobs/{id}
+def job_aceito(job: Any) -> FastJSONResponse:
+    return FastJSONResponse(
+        JobOut.model_validate(job),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/jobs/{job.id}"},
+    )
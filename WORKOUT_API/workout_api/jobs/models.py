@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import JSON, Boolean, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from workout_api.contrib.models import Base
+
+
+# --- Jobs em segundo plano (backend database da fila; ver migração e4b6c8d0f2a5) ---
+# Base sem version: a fila atualiza os jobs por UPDATE direto (status, progresso, heartbeat) e não usa o
+# controle de concorrência otimista do ORM
+class JobModel(Base):
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Busca do próximo job a executar (status + quando fica disponível)
+        Index('ix_jobs_status_disponivel_em', 'status', 'disponivel_em'),
+    )
+
+    pk_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Identificador público do job (GET /jobs/{id})
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), nullable=False, unique=True, index=True)
+    tipo: Mapped[str] = mapped_column(String(50), nullable=False)
+    status: Mapped[str] = mapped_column(String(12), nullable=False)
+    parametros: Mapped[dict] = mapped_column(JSON().with_variant(JSONB, 'postgresql'), nullable=False)
+    feito: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[Optional[int]] = mapped_column(Integer)
+    tentativas: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    resultado: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB, 'postgresql'))
+    erro: Mapped[Optional[str]] = mapped_column(Text)
+    cancelamento_solicitado: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Ponto de retomada da tarefa (ex.: último pk_id confirmado), gravado na mesma transação de cada bloco
+    retomada: Mapped[Optional[dict]] = mapped_column(JSON().with_variant(JSONB, 'postgresql'))
+    criado_em: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    iniciado_em: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    concluido_em: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    disponivel_em: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    heartbeat_em: Mapped[Optional[datetime]] = mapped_column(DateTime)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Annotated, Any, Literal, Optional
+
+from pydantic import UUID4, Field
+
+from workout_api.contrib.schemas import BaseSchema
+
+
+StatusJob = Literal['pendente', 'executando', 'concluido', 'falhou', 'cancelado']
+
+
+# --- Schema de Saída (estado e progresso de um job em segundo plano) ---
+class JobOut(BaseSchema):
+    id: Annotated[UUID4, Field(description='Identificador do job')]
+    tipo: Annotated[str, Field(description='Operação executada', example='atletas.lote.atualizar')]
+    status: Annotated[StatusJob, Field(description='Situação do job', example='executando')]
+    feito: Annotated[int, Field(description='Itens já processados', example=3000)]
+    total: Annotated[Optional[int], Field(None, description='Total de itens, quando conhecido', example=12000)]
+    tentativas: Annotated[int, Field(description='Execuções iniciadas (inclui as novas tentativas)', example=1)]
+    resultado: Annotated[Optional[dict[str, Any]], Field(None, description='Resultado do job concluído')]
+    erro: Annotated[Optional[str], Field(None, description='Erro da última tentativa que falhou')]
+    cancelamento_solicitado: Annotated[bool, Field(description='Cancelamento pedido e ainda não atendido pelo job')]
+    criado_em: Annotated[datetime, Field(description='Data de criação do job')]
+    iniciado_em: Annotated[Optional[datetime], Field(None, description='Início da última tentativa')]
+    concluido_em: Annotated[Optional[datetime], Field(None, description='Data de término (concluído, falhou ou cancelado)')]
@@ -1,15 +1,62 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from time import time
+
+from fastapi import FastAPI, Request
 from fastapi_pagination import add_pagination, set_page, LimitOffsetPage
+from workout_api.alteracoes.feed import alteracoes_feed
+from workout_api.configs.database import READ_PRIMARY_COOKIE, engine, jobs_engine, replica_engines, verifica_replicas
+from workout_api.configs.settings import settings
+from workout_api.contrib.compression import CompressionMiddleware
+from workout_api.contrib.http_cache import ETagMiddleware
+from workout_api.jobs.fila import job_queue
+from workout_api.metrics.middleware import QueryTimingMiddleware
 from workout_api.routers import api_router 
 
-app = FastAPI(title='WorkoutApi')
+#Inicia a fila de jobs, a limpeza das alterações antigas e a verificação das réplicas do worker; ao encerrar, para as três e o feed de alterações e fecha as conexões dos pools em vez de abandoná-las
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    alteracoes_feed.inicia_limpeza()
+    verificacao = asyncio.create_task(verifica_replicas()) if replica_engines else None
+    yield
+    if verificacao is not None:
+        verificacao.cancel()
+        await asyncio.gather(verificacao, return_exceptions=True)
+    await job_queue.stop()
+    await alteracoes_feed.stop()
+    await jobs_engine.dispose()
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+
+
+app = FastAPI(title='WorkoutApi', lifespan=lifespan)
 
 set_page(LimitOffsetPage) 
 add_pagination(app)       
 
 app.include_router(api_router)
+app.add_middleware(ETagMiddleware)
+app.add_middleware(CompressionMiddleware)  # Externo ao ETag: o ETag é calculado sobre o corpo sem compressão
+app.add_middleware(QueryTimingMiddleware)  # Externo ao ETag: mede a requisição inteira
+
+
+#Após uma escrita bem-sucedida, direciona as leituras do cliente ao primário por uma janela curta
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if replica_engines and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(time() + settings.DB_READ_YOUR_WRITES_WINDOW),
+            max_age=max(int(settings.DB_READ_YOUR_WRITES_WINDOW), 1),
+            httponly=True,
+        )
+    return response
 
 
+# Apenas desenvolvimento (reload, um processo); em produção use: python -m workout_api.server
 if __name__ == '__main__':
     import uvicorn
-    uvicorn.run("workout_api.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("workout_api.main:app", host="0.0.0.0", port=8000, reload=True) 
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+
+from workout_api.alteracoes.feed import alteracoes_feed
+from workout_api.atleta.carregador import atleta_loader
+from workout_api.configs.database import db_totals, engine, jobs_engine, replica_engines
+from workout_api.contrib.object_cache import atleta_object_cache, categoria_object_cache, centro_treinamento_object_cache
+from workout_api.jobs.fila import job_queue
+from workout_api.metrics.middleware import requests_total, route_totals
+
+
+router = APIRouter()
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{nome}="{valor}"' for nome, valor in labels.items()) + "}"
+
+
+#Métricas do processo no formato texto do Prometheus (requisições, consultas SQL por rota e pool)
+@router.get(
+    "",
+    summary="Consultar métricas (formato Prometheus)",
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
+)
+async def get_prometheus_metrics() -> PlainTextResponse:
+    linhas = [
+        "# HELP workout_http_requests_total Requisições HTTP atendidas.",
+        "# TYPE workout_http_requests_total counter",
+    ]
+    for (method, route, status_code), total in sorted(requests_total.items()):
+        linhas.append(f"workout_http_requests_total{_labels(method=method, route=route, status=status_code)} {total}")
+
+    series = [
+        ("workout_http_request_duration_seconds_sum", "duration", "Tempo total das requisições (segundos)."),
+        ("workout_http_request_duration_seconds_count", "count", "Quantidade de requisições cronometradas."),
+        ("workout_db_queries_total", "queries", "Consultas SQL executadas pelas requisições."),
+        ("workout_db_query_duration_seconds_sum", "db_time", "Tempo total das consultas SQL das requisições (segundos)."),
+    ]
+    for nome, chave, ajuda in series:
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} counter"]
+        for (method, route), totais in sorted(route_totals.items()):
+            linhas.append(f"{nome}{_labels(method=method, route=route)} {totais[chave]:g}")
+
+    linhas += [
+        "# HELP workout_db_slow_queries_total Consultas acima de DB_SLOW_QUERY_MS.",
+        "# TYPE workout_db_slow_queries_total counter",
+        f"workout_db_slow_queries_total {db_totals['slow_queries']}",
+    ]
+
+    pools = [("primary", engine.pool.metrics())]
+    pools += [(f"replica{i}", replica.pool.metrics()) for i, replica in enumerate(replica_engines)]
+    pools.append(("jobs", jobs_engine.pool.metrics()))
+    for chave in ("checked_out", "overflow", "checkouts", "timeouts", "wait_time_total"):
+        nome = f"workout_db_pool_{chave}"
+        linhas.append(f"# TYPE {nome} {'gauge' if chave in ('checked_out', 'overflow') else 'counter'}")
+        for pool, metricas in pools:
+            linhas.append(f"{nome}{_labels(pool=pool)} {metricas[chave]}")
+
+    caches = [atleta_object_cache, categoria_object_cache, centro_treinamento_object_cache]
+    for chave, tipo, ajuda in (
+        ("hits", "counter", "Acertos no LRU local do cache de GET /{id}."),
+        ("shared_hits", "counter", "Acertos na camada compartilhada do cache de GET /{id}."),
+        ("misses", "counter", "Falhas no LRU local do cache de GET /{id}."),
+        ("coalesced", "counter", "Falhas que aguardaram a carga já em andamento da mesma chave (single-flight)."),
+        ("size", "gauge", "Entradas no LRU local do cache de GET /{id}."),
+    ):
+        nome = f"workout_object_cache_{chave}"
+        linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"]
+        for cache in caches:
+            linhas.append(f"{nome}{_labels(cache=cache.namespace)} {cache.stats()[chave]}")
+
+    linhas += [
+        "# HELP workout_id_batch_total Consultas agrupadas de atleta por ID (uma por lote).",
+        "# TYPE workout_id_batch_total counter",
+        f"workout_id_batch_total {atleta_loader.lotes}",
+        "# HELP workout_id_batch_ids_total IDs atendidos pelas consultas agrupadas.",
+        "# TYPE workout_id_batch_ids_total counter",
+        f"workout_id_batch_ids_total {atleta_loader.ids_agrupados}",
+        "# HELP workout_jobs_total Execuções de jobs em segundo plano deste worker, por resultado.",
+        "# TYPE workout_jobs_total counter",
+    ]
+    for status_job, total in job_queue.execucoes.items():
+        linhas.append(f"workout_jobs_total{_labels(status=status_job)} {total}")
+
+    feed = alteracoes_feed.stats()
+    linhas += [
+        "# HELP workout_alteracoes_assinantes Conexões abertas em GET /alteracoes/stream neste worker.",
+        "# TYPE workout_alteracoes_assinantes gauge",
+        f"workout_alteracoes_assinantes {feed['assinantes']}",
+        "# HELP workout_alteracoes_eventos_total Alterações lidas do banco e publicadas para os consumidores.",
+        "# TYPE workout_alteracoes_eventos_total counter",
+        f"workout_alteracoes_eventos_total {feed['eventos']}",
+        "# HELP workout_alteracoes_lacunas_total Números de sequência pulados após ALTERACOES_GAP_TIMEOUT sem commit.",
+        "# TYPE workout_alteracoes_lacunas_total counter",
+        f"workout_alteracoes_lacunas_total {feed['lacunas']}",
+    ]
+
+    return PlainTextResponse("\n".join(linhas) + "\n", media_type="text/plain; version=0.0.4")
+
+#Retorna a utilização do pool de conexões deste processo, para dimensionar DB_POOL_SIZE/DB_MAX_OVERFLOW
+@router.get(
+    "/pool",
+    summary="Consultar métricas do pool de conexões",
+    status_code=status.HTTP_200_OK,
+)
+async def get_pool_metrics() -> dict:
+    return {
+        **engine.pool.metrics(),
+        "replicas": [replica.pool.metrics() for replica in replica_engines],
+        "jobs": jobs_engine.pool.metrics(),
+    }
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from time import perf_counter
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from workout_api.configs.database import QueryStats, query_stats
+from workout_api.configs.settings import settings
+
+
+# Agregados por rota (template do path, não o path real, para manter a cardinalidade baixa)
+requests_total: dict[tuple[str, str, int], int] = defaultdict(int)
+route_totals: dict[tuple[str, str], dict[str, float]] = defaultdict(
+    lambda: {"count": 0, "duration": 0.0, "queries": 0, "db_time": 0.0}
+)
+
+
+def _server_timing(stats: QueryStats, duracao: float) -> str:
+    valor = f'app;dur={duracao * 1000:.1f}, db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries"'
+    if stats.count:
+        valor += f', db-slowest;dur={stats.slowest_time * 1000:.1f}'
+    return valor
+
+
+def _observe(method: str, route: str, status_code: int, duracao: float, stats: QueryStats) -> None:
+    requests_total[(method, route, status_code)] += 1
+    totais = route_totals[(method, route)]
+    totais["count"] += 1
+    totais["duration"] += duracao
+    totais["queries"] += stats.count
+    totais["db_time"] += stats.total_time
+
+
+# --- Middleware ASGI: quantidade e tempo das consultas SQL por requisição (Server-Timing e /metrics) ---
+class QueryTimingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        inicio = perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    # Nas respostas comuns o handler já terminou aqui; em streaming vale o que rodou até o início
+                    MutableHeaders(scope=message).append("Server-Timing", _server_timing(stats, perf_counter() - inicio))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats.reset(token)
+            route = scope.get("route")
+            _observe(
+                scope["method"], route.path if route is not None else "<sem rota>", status_code, perf_counter() - inicio, stats
+            )
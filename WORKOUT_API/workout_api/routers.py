@@ -1,9 +1,15 @@
 from fastapi import APIRouter
+from workout_api.alteracoes.controller import router as alteracoes
 from workout_api.atleta.controller import router as atleta
 from workout_api.categorias.controller import router as categorias
 from workout_api.centro_treinamento.controller import router as centro_treinamento
+from workout_api.jobs.controller import router as jobs
+from workout_api.metrics.controller import router as metrics
 
 api_router = APIRouter()
 api_router.include_router(atleta, prefix='/atleta', tags=['atletas']) 
 api_router.include_router(categorias, prefix='/categorias', tags=['categorias'])
-api_router.include_router(centro_treinamento, prefix='/centro_treinamento', tags=['centro_treinamento'])
\ No newline at end of file
+api_router.include_router(centro_treinamento, prefix='/centro_treinamento', tags=['centro_treinamento'])
+api_router.include_router(jobs, prefix='/jobs', tags=['jobs'])
+api_router.include_router(alteracoes, prefix='/alteracoes', tags=['alteracoes'])
+api_router.include_router(metrics, prefix='/metrics', tags=['metrics'])
@@ -0,0 +1,54 @@
+import os
+from importlib.util import find_spec
+
+import uvicorn
+
+from workout_api.configs.database import conexoes_fixas_por_worker, pool_por_worker
+from workout_api.configs.settings import settings
+
+
+def cpus_disponiveis() -> int:
+    # Respeita o cpuset do contêiner (sched_getaffinity) quando disponível
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+#Servidor de produção: vários workers, uvloop/httptools quando instalados, sem reload
+def main() -> None:
+    workers = settings.SERVER_WORKERS or cpus_disponiveis()
+    if workers > 1 and settings.JOBS_BACKEND == "memory":
+        # Cada worker teria a própria fila: GET /jobs/{id} responderia 404 nos workers que não criaram o job
+        raise SystemExit(
+            f"JOBS_BACKEND=memory exige um único worker (SERVER_WORKERS=1); com {workers} workers use JOBS_BACKEND=database."
+        )
+
+    pool_size, max_overflow = pool_por_worker(workers)
+    conexoes = workers * (pool_size + max_overflow + conexoes_fixas_por_worker())
+    if conexoes > settings.DB_MAX_CONNECTIONS:
+        # Acima do max_connections os workers falham ao conectar sob carga, não na subida
+        raise SystemExit(
+            f"{workers} workers abririam até {conexoes} conexões, acima de DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}: "
+            "reduza SERVER_WORKERS, JOBS_CONCURRENCY ou DB_POOL_SIZE/DB_MAX_OVERFLOW, ou aumente DB_MAX_CONNECTIONS."
+        )
+    # Os workers derivam o próprio pool do número efetivo de workers
+    os.environ["SERVER_WORKERS"] = str(workers)
+
+    uvicorn.run(
+        "workout_api.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN,
+        access_log=settings.SERVER_ACCESS_LOG,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()